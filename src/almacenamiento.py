@@ -1,20 +1,32 @@
 import os
 import csv
-from typing import List, Dict, Tuple, Any, Optional
+import sys
+import json
+import time
+import threading
+from array import array
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import List, Dict, Tuple, Any, Optional, Iterator, Iterable, Callable, Sequence
+from modelo_libro import Libro
+from fsc_jerarquia import CSV_HEADERS
+from diario_cambios import DiarioCambios, Operacion, Fila, CambioFila, aplicar_operacion, aplicar_operaciones, diferencias_filas
+from bloqueos import BloqueoArbol, bloqueo_archivo
+from instantanea_catalogo import abrir_instantanea, escribir_instantanea
+from registro_cambios import RegistroCambios
 
 # --- LECTURA RECURSIVA OBLIGATORIA (Fase 2, Punto 2) ---
 
-def leer_csv_a_diccionarios(ruta_csv: str, niveles_jerarquia: Dict[str, str]) -> List[Dict]:
-    """Lee un CSV y lo convierte en lista de diccionarios, incluyendo la jerarquía."""
-    libros_list = []
-    
+def _leer_filas_csv(ruta_csv: str) -> List[Tuple[str, int]]:
+    """Lee las filas válidas (Título, Páginas) de un items.csv."""
+    filas = []
+
     try:
         with open(ruta_csv, "r", encoding="utf-8") as f:
             reader = csv.reader(f)
             headers = next(reader, None) # Saltar encabezado (Título, Páginas)
-            
+
             if not headers or len(headers) < 2:
-                return libros_list
+                return filas
 
             for fila in reader:
                 if len(fila) >= 2:
@@ -22,44 +34,57 @@ def leer_csv_a_diccionarios(ruta_csv: str, niveles_jerarquia: Dict[str, str]) ->
                         paginas_int = int(fila[1])
                     except ValueError:
                         continue # Ignorar fila si las páginas no son un número
-                        
-                    # Crear el diccionario (el patrón de datos exigido)
-                    libros_list.append({
-                        "genero": niveles_jerarquia['genero'], 
-                        "autor": niveles_jerarquia['autor'], 
-                        "anio": niveles_jerarquia['anio'],
-                        "titulo": fila[0],
-                        "paginas": paginas_int,
-                        # ID simple para identificación en CRUD
-                        "id": f"{niveles_jerarquia['genero']}/{niveles_jerarquia['autor']}/{fila[0]}", 
-                        "ruta_csv": ruta_csv # Para saber dónde sobrescribir
-                    })
-                        
+                    filas.append((fila[0], paginas_int))
+
     except FileNotFoundError:
-        pass 
+        pass
     except OSError:
-        pass 
-        
-    return libros_list
+        pass
+
+    return filas
+
 
+def _filas_a_libros(ruta_csv: str, niveles_jerarquia: Dict[str, str], filas: List[Tuple[str, int]]) -> List[Libro]:
+    """Convierte filas (Título, Páginas) en libros con su jerarquía."""
+    genero = sys.intern(niveles_jerarquia['genero'])
+    autor = sys.intern(niveles_jerarquia['autor'])
+    anio = sys.intern(niveles_jerarquia['anio'])
+    ruta_csv = sys.intern(ruta_csv) # Para saber dónde sobrescribir
+    return [Libro(genero, autor, anio, titulo, paginas, ruta_csv) for titulo, paginas in filas]
 
-def consolidar_libros_recursivamente(ruta_actual: str, lista_global: List[Dict]) -> List[Dict]:
+
+def leer_csv_a_diccionarios(ruta_csv: str, niveles_jerarquia: Dict[str, str]) -> List[Libro]:
     """
-    Función recursiva OBLIGATORIA (Fase 2) para recorrer la jerarquía y consolidar los datos.
+    Lee un CSV y lo convierte en lista de libros (vista de diccionario), incluyendo la jerarquía.
+    Incluye los cambios del diario que todavía no se volcaron al archivo.
     """
-    
+    return _filas_a_libros(ruta_csv, niveles_jerarquia, _aplicar_diario(ruta_csv, _leer_filas_csv(ruta_csv)))
+
+
+def niveles_desde_ruta(ruta_csv: str) -> Optional[Dict[str, str]]:
+    """Obtiene los 3 niveles (Genero/Autor/Anio) a partir de la ruta de un items.csv."""
+    partes = ruta_csv.split(os.sep)
+    if len(partes) < 4:
+        return None
+    return {
+        'genero': partes[-4],
+        'autor': partes[-3],
+        'anio': partes[-2],
+    }
+
+
+def iterar_libros_recursivamente(ruta_actual: str) -> Iterator[Libro]:
+    """
+    Generador recursivo que recorre la jerarquía y va entregando los libros
+    a medida que lee cada items.csv (no arma la lista completa).
+    """
+
     # 1. Caso Base 1: Encontrar el archivo CSV
     if os.path.basename(ruta_actual) == "items.csv":
-        partes = ruta_actual.split(os.sep)
         # Tomamos los 3 niveles (Genero/Autor/Anio) antes de items.csv
-        if len(partes) >= 4:
-            niveles_jerarquia = {
-                'genero': partes[-4],
-                'autor': partes[-3],
-                'anio': partes[-2],
-            }
-            libros_csv = leer_csv_a_diccionarios(ruta_actual, niveles_jerarquia)
-            lista_global.extend(libros_csv)
+        niveles_jerarquia = niveles_desde_ruta(ruta_actual)
+        if niveles_jerarquia:
+            yield from leer_csv_a_diccionarios(ruta_actual, niveles_jerarquia)
         return
 
     # Caso Base 2: Si es un archivo que no es items.csv
@@ -68,20 +93,1205 @@ def consolidar_libros_recursivamente(ruta_actual: str, lista_global: List[Dict])
 
     # 2. Paso Recursivo: Si es un directorio
     try:
-        elementos = os.listdir(ruta_actual)
+        elementos = sorted(os.listdir(ruta_actual)) # Orden determinista
     except Exception:
         return
-        
+
     for elemento in elementos:
         ruta_hijo = os.path.join(ruta_actual, elemento)
-        consolidar_libros_recursivamente(ruta_hijo, lista_global)
+        yield from iterar_libros_recursivamente(ruta_hijo)
 
+
+def consolidar_libros_recursivamente(ruta_actual: str, lista_global: List[Libro]) -> List[Libro]:
+    """
+    Función recursiva OBLIGATORIA (Fase 2) para recorrer la jerarquía y consolidar los datos.
+    Es un envoltorio que materializa el generador recursivo en lista_global.
+    """
+    lista_global.extend(iterar_libros_recursivamente(ruta_actual))
     return lista_global
 
 
+# --- MOTOR DE ESCANEO ITERATIVO (os.scandir + pool de hilos) ---
+# Recorre el mismo árbol que la función recursiva, en el mismo orden, pero sin
+# recursión (no hay límite de profundidad) y usando el tipo que ya trae cada
+# DirEntry en lugar de un os.path.isfile() extra por nodo.
+
+HILOS_ESCANEO = min(32, (os.cpu_count() or 1) + 4)
+TAMANIO_LOTE_ESCANEO = 64 # items.csv por tarea del pool
+
+
+def recorrer_items_csv(base_path: str) -> Iterator[str]:
+    """Genera las rutas de todos los items.csv del árbol (orden alfabético, en profundidad)."""
+    if os.path.basename(base_path) == "items.csv":
+        yield base_path
+        return
+
+    pila = [base_path]
+    visitados = set() # (st_dev, st_ino) de enlaces simbólicos ya recorridos, evita ciclos
+
+    while pila:
+        ruta_dir = pila.pop()
+        try:
+            with os.scandir(ruta_dir) as it:
+                entradas = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+
+        subdirectorios = []
+        for entrada in entradas:
+            if entrada.name == "items.csv":
+                yield entrada.path
+                continue
+            try:
+                if not entrada.is_dir():
+                    continue
+                if entrada.is_symlink():
+                    st = entrada.stat()
+                    if (st.st_dev, st.st_ino) in visitados:
+                        continue
+                    visitados.add((st.st_dev, st.st_ino))
+            except OSError:
+                continue
+            subdirectorios.append(entrada.path)
+
+        # Apilar al revés para procesar los hijos en orden alfabético
+        pila.extend(reversed(subdirectorios))
+
+
+def _leer_csv_por_ruta(ruta_csv: str) -> List[Libro]:
+    """Lee un items.csv deduciendo su jerarquía desde la ruta."""
+    niveles_jerarquia = niveles_desde_ruta(ruta_csv)
+    if not niveles_jerarquia:
+        return []
+    return leer_csv_a_diccionarios(ruta_csv, niveles_jerarquia)
+
+
+def _leer_lote_csv(rutas: List[str]) -> List[Libro]:
+    """Lee un lote de items.csv (agrupar reduce el costo de coordinación del pool)."""
+    libros: List[Libro] = []
+    for ruta_csv in rutas:
+        libros.extend(_leer_csv_por_ruta(ruta_csv))
+    return libros
+
+
+def escanear_catalogo(base_path: str, hilos: int = HILOS_ESCANEO) -> List[Libro]:
+    """
+    Equivalente a consolidar_libros_recursivamente(base_path, []) usando el
+    recorrido iterativo y un pool de hilos para parsear los CSV.
+    """
+    with _candado_catalogo, _bloqueo_arbol(base_path):
+        _sincronizar_diarios_cargados()
+        return _escanear_catalogo(base_path, hilos)
+
+
+def _escanear_catalogo(base_path: str, hilos: int) -> List[Libro]:
+    rutas = list(recorrer_items_csv(base_path))
+    lista_global: List[Libro] = []
+
+    if hilos <= 1 or len(rutas) <= TAMANIO_LOTE_ESCANEO:
+        return _leer_lote_csv(rutas)
+
+    lotes = [rutas[i:i + TAMANIO_LOTE_ESCANEO] for i in range(0, len(rutas), TAMANIO_LOTE_ESCANEO)]
+    # executor.map respeta el orden de entrada: el resultado es determinista
+    with ThreadPoolExecutor(max_workers=hilos) as executor:
+        for libros_lote in executor.map(_leer_lote_csv, lotes):
+            lista_global.extend(libros_lote)
+    return lista_global
+
+
+# --- ESCANEO MULTIPROCESO POR GÉNERO (catálogos muy grandes) ---
+# El parseo con el módulo csv es intensivo en CPU y el GIL limita a los hilos.
+# Se reparte el primer nivel de la jerarquía (carpetas de género) entre procesos.
+# Cada proceso devuelve lotes compactos (títulos + array de páginas por CSV),
+# mucho más baratos de serializar que un diccionario por libro.
+
+PROCESOS_ESCANEO = os.cpu_count() or 1
+UMBRAL_CSV_PROCESOS = 2000 # Con menos items.csv no compensa levantar procesos
+
+# (ruta, títulos, páginas): las páginas en un array("q") (int64 en todas las
+# plataformas: "l" es de 32 bits en Windows y los CSV editados a mano pueden
+# traer números grandes o negativos)
+LoteCompacto = Tuple[str, Tuple[str, ...], Sequence[int]]
+
+
+def _columna_paginas(filas: List[Tuple[str, int]]) -> Sequence[int]:
+    try:
+        return array("q", (p for _, p in filas))
+    except OverflowError:
+        return [p for _, p in filas] # Alguna no entra en int64: se manda sin empaquetar
+
+
+def _parsear_lote_compacto(rutas: List[str]) -> List[LoteCompacto]:
+    """Trabajo de cada proceso: parsea sus items.csv y devuelve (ruta, títulos, páginas)."""
+    lotes = []
+    for ruta_csv in rutas:
+        filas = _leer_filas_csv(ruta_csv)
+        lotes.append((ruta_csv, tuple(t for t, _ in filas), _columna_paginas(filas)))
+    return lotes
+
+
+def _repartir_por_genero(base_path: str, rutas: List[str], procesos: int) -> List[List[str]]:
+    """Agrupa las rutas por carpeta de género y balancea los grupos entre procesos."""
+    por_genero: Dict[str, List[str]] = {}
+    for ruta_csv in rutas:
+        genero = os.path.relpath(ruta_csv, base_path).split(os.sep, 1)[0]
+        por_genero.setdefault(genero, []).append(ruta_csv)
+
+    # Reparto voraz: el género más grande va al proceso con menos carga
+    shards: List[List[str]] = [[] for _ in range(min(procesos, len(por_genero)))]
+    for grupo in sorted(por_genero.values(), key=len, reverse=True):
+        min(shards, key=len).extend(grupo)
+    return [shard for shard in shards if shard]
+
+
+def parsear_csv_en_procesos(base_path: str, rutas: List[str], procesos: int = PROCESOS_ESCANEO) -> Dict[str, List[Tuple[str, int]]]:
+    """
+    Parsea los items.csv indicados y devuelve {ruta_csv: filas}.
+    Vuelve al modo serial si el árbol es chico o hay un solo proceso/género.
+    """
+    shards = _repartir_por_genero(base_path, rutas, procesos) if procesos > 1 else []
+    if len(rutas) < UMBRAL_CSV_PROCESOS or len(shards) < 2:
+        return {ruta_csv: _leer_filas_csv(ruta_csv) for ruta_csv in rutas}
+
+    resultado: Dict[str, List[Tuple[str, int]]] = {}
+    with ProcessPoolExecutor(max_workers=len(shards)) as executor:
+        for lotes in executor.map(_parsear_lote_compacto, shards):
+            for ruta_csv, titulos, paginas in lotes:
+                resultado[ruta_csv] = list(zip(titulos, paginas))
+    return resultado
+
+
+def escanear_catalogo_procesos(base_path: str, procesos: int = PROCESOS_ESCANEO) -> List[Libro]:
+    """Equivalente a escanear_catalogo() repartiendo el parseo entre procesos."""
+    with _candado_catalogo, _bloqueo_arbol(base_path):
+        _sincronizar_diarios_cargados()
+        rutas = list(recorrer_items_csv(base_path))
+        filas_por_ruta = parsear_csv_en_procesos(base_path, rutas, procesos)
+
+        # Se rearma en el orden del recorrido: mismo resultado que la versión serial
+        lista_global: List[Libro] = []
+        for ruta_csv in rutas:
+            niveles_jerarquia = niveles_desde_ruta(ruta_csv)
+            if niveles_jerarquia:
+                filas = _aplicar_diario(ruta_csv, filas_por_ruta[ruta_csv])
+                lista_global.extend(_filas_a_libros(ruta_csv, niveles_jerarquia, filas))
+        return lista_global
+
+
+# --- LECTURA EN FLUJO (generador perezoso sobre el recorrido iterativo) ---
+
+def iterar_libros(base_path: str) -> Iterator[Libro]:
+    """
+    Genera los libros del catálogo a medida que recorre el árbol, en el mismo
+    orden que escanear_catalogo(). Usa las filas del manifiesto de los CSV que
+    no cambiaron y parsea el resto al vuelo. Si quien consume deja de pedir
+    libros, no se lee ningún items.csv más. En una sesión en caliente no se
+    recorre el árbol: los libros salen del manifiesto en memoria.
+    """
+    base = os.path.abspath(base_path)
+    if _en_caliente(base):
+        yield from _iterar_libros_en_caliente(base)
+        return
+    archivos = _cargar_manifiesto(base)["archivos"]
+
+    for ruta_csv in recorrer_items_csv(base):
+        niveles_jerarquia = niveles_desde_ruta(ruta_csv)
+        if not niveles_jerarquia:
+            continue
+
+        # Los bloqueos cubren cada items.csv (no el yield): una compactación, de
+        # este u otro proceso, puede volcar el diario entre un CSV y otro, pero
+        # nunca entre leer el CSV y aplicarle el diario
+        with _candado_catalogo, _bloqueo_arbol(base):
+            _sincronizar_diario(base)
+            entrada = archivos.get(os.path.relpath(ruta_csv, base))
+            filas = None
+            if entrada is not None:
+                try:
+                    stat = os.stat(ruta_csv)
+                    if entrada["tamanio"] == stat.st_size and entrada["mtime_ns"] == stat.st_mtime_ns:
+                        filas = entrada["filas"]
+                except OSError:
+                    continue
+            if filas is None:
+                filas = _leer_filas_csv(ruta_csv)
+            filas = _aplicar_diario(ruta_csv, filas)
+
+        yield from _filas_a_libros(ruta_csv, niveles_jerarquia, filas)
+
+
+def _iterar_libros_en_caliente(base: str) -> Iterator[Libro]:
+    claves = revalidar_en_caliente(base)
+    archivos = _cargar_manifiesto(base)["archivos"]
+    diario = _obtener_diario(base)
+    for clave in claves:
+        ruta_csv = os.path.join(base, clave)
+        # Como en el recorrido: el diario se aplica a cada CSV con el bloqueo tomado
+        with _candado_catalogo, _bloqueo_arbol(base):
+            _sincronizar_diario(base)
+            entrada = archivos.get(clave)
+            if entrada is None:
+                continue # Lo eliminó una compactación mientras se consumían los anteriores
+            operaciones = diario.operaciones_de(clave)
+            filas = aplicar_operaciones(entrada["filas"], operaciones) if operaciones else entrada["filas"]
+        yield from _filas_a_libros(ruta_csv, niveles_desde_ruta(ruta_csv), filas)
+
+
+# --- MANIFIESTO PERSISTENTE DEL CATÁLOGO (CACHÉ DE LECTURA) ---
+# Guarda, por cada items.csv, su tamaño, su mtime y las filas ya parseadas.
+# Así cada acción del menú solo vuelve a leer los CSV que cambiaron.
+# En disco son dos archivos: el manifiesto completo (JSON, con una marca) y
+# un archivo de entradas al que cada guardado solo agrega una línea con las
+# entradas de los items.csv que cambiaron. Al cargar se aplican las entradas
+# sobre el manifiesto si su encabezado lleva la misma marca. El manifiesto se
+# reescribe (con marca nueva) cuando las entradas ya pesan más que él. Es solo
+# una caché: cada entrada se valida con el tamaño y el mtime del items.csv,
+# así que perder una línea (por ej. si otro proceso reescribió a la vez) solo
+# obliga a volver a leer ese CSV.
 
+VERSION_MANIFIESTO = 1
+_manifiestos_en_memoria: Dict[str, Dict[str, Any]] = {}
+# base -> tamaño del manifiesto completo en disco (para decidir cuándo reescribirlo)
+_tamanios_manifiesto: Dict[str, int] = {}
 
 
+def ruta_auxiliar(base_path: str, nombre: str) -> str:
+    """Ruta de un archivo auxiliar del catálogo, guardado junto a la carpeta de datos."""
+    base = os.path.abspath(base_path)
+    return os.path.join(os.path.dirname(base), f".{os.path.basename(base)}_{nombre}")
+
+
+def ruta_manifiesto(base_path: str) -> str:
+    """Devuelve la ruta del manifiesto, guardado junto a la carpeta de datos."""
+    return ruta_auxiliar(base_path, "manifiesto.json")
+
+
+def ruta_entradas_manifiesto(base_path: str) -> str:
+    """Devuelve la ruta del archivo de entradas agregadas al manifiesto."""
+    return ruta_auxiliar(base_path, "manifiesto_entradas.jsonl")
+
+
+def _mtime_manifiesto(base: str) -> Optional[int]:
+    """mtime más nuevo entre el manifiesto y su archivo de entradas (None si no hay ninguno)."""
+    mtimes = []
+    for ruta in (ruta_manifiesto(base), ruta_entradas_manifiesto(base)):
+        try:
+            mtimes.append(os.stat(ruta).st_mtime_ns)
+        except OSError:
+            continue
+    return max(mtimes, default=None)
+
+
+def _base_desde_ruta_csv(ruta_csv: str) -> str:
+    """Sube los 4 niveles (items.csv/anio/autor/genero) hasta la carpeta base."""
+    base = os.path.abspath(ruta_csv)
+    for _ in range(4):
+        base = os.path.dirname(base)
+    return base
+
+
+def _cargar_manifiesto(base_path: str) -> Dict[str, Any]:
+    """
+    Obtiene el manifiesto desde memoria o, si no está, desde disco: de la
+    instantánea binaria si es más nueva que el manifiesto JSON, si no del JSON.
+    """
+    base = os.path.abspath(base_path)
+    manifiesto = _manifiestos_en_memoria.get(base)
+    if manifiesto is not None:
+        return manifiesto
+
+    manifiesto = _manifiesto_desde_instantanea(base)
+    if manifiesto is None:
+        manifiesto = {"version": VERSION_MANIFIESTO, "generacion": 0, "archivos": {}}
+        try:
+            with open(ruta_manifiesto(base), "r", encoding="utf-8") as f:
+                datos = json.load(f)
+                tamanio = os.fstat(f.fileno()).st_size
+            if datos.get("version") == VERSION_MANIFIESTO and isinstance(datos.get("archivos"), dict):
+                manifiesto = datos
+                _tamanios_manifiesto[base] = tamanio
+                _aplicar_entradas_manifiesto(base, manifiesto)
+        except (OSError, ValueError):
+            pass # Sin manifiesto (o corrupto): se reconstruye en el próximo escaneo
+
+    _manifiestos_en_memoria[base] = manifiesto
+    return manifiesto
+
+
+def _marca_entradas(encabezado: bytes) -> Optional[str]:
+    """Marca del manifiesto al que pertenece el archivo de entradas (de su primera línea)."""
+    try:
+        return json.loads(encabezado)["manifiesto"] if encabezado.endswith(b"\n") else None
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def _aplicar_entradas_manifiesto(base: str, manifiesto: Dict[str, Any]):
+    """Aplica sobre el manifiesto las entradas agregadas después de escribirlo (si son de él)."""
+    try:
+        with open(ruta_entradas_manifiesto(base), "rb") as f:
+            if manifiesto.get("marca") is None or _marca_entradas(f.readline()) != manifiesto["marca"]:
+                return # Entradas de un manifiesto anterior: el actual ya las incluye
+            datos = f.read()
+    except OSError:
+        return
+
+    archivos = manifiesto["archivos"]
+    # Una última línea sin '\n' es una escritura cortada: se ignora
+    for linea in datos[:datos.rfind(b"\n") + 1].splitlines():
+        try:
+            guardado = json.loads(linea)
+            generacion, entradas = guardado["generacion"], guardado["archivos"]
+            for clave, entrada in entradas.items():
+                if entrada is None:
+                    archivos.pop(clave, None) # El CSV fue eliminado
+                else:
+                    archivos[clave] = entrada
+        except (ValueError, KeyError, TypeError, AttributeError):
+            continue
+        manifiesto["generacion"] = generacion
+
+
+def guardar_json_atomico(ruta: str, datos: Any, default: Optional[Callable[[Any], Any]] = None) -> bool:
+    """Escribe un JSON de forma atómica (archivo temporal + os.replace)."""
+    ruta_tmp = ruta + ".tmp"
+    try:
+        # json.dumps (y no json.dump) usa el codificador en C: mucho más rápido
+        texto = json.dumps(datos, ensure_ascii=False, separators=(",", ":"), default=default)
+        with open(ruta_tmp, "w", encoding="utf-8") as f:
+            f.write(texto)
+        os.replace(ruta_tmp, ruta)
+        return True
+    except OSError:
+        return False
+
+
+def _guardar_manifiesto(base_path: str, manifiesto: Dict[str, Any], claves: Iterable[str]):
+    """
+    Persiste las entradas de esos items.csv (las que ya no están en el
+    manifiesto se guardan como eliminadas) con una nueva generación:
+    O(entradas cambiadas), salvo cuando toca reescribir el manifiesto entero.
+    """
+    base = os.path.abspath(base_path)
+    # Basada en el reloj para que dos procesos no repitan el mismo número
+    manifiesto["generacion"] = max(manifiesto.get("generacion", 0) + 1, time.time_ns())
+    archivos = manifiesto["archivos"]
+    # Las filas que vienen de la instantánea (FilasInstantanea) se guardan como listas
+    linea = json.dumps(
+        {"generacion": manifiesto["generacion"], "archivos": {clave: archivos.get(clave) for clave in claves}},
+        ensure_ascii=False, separators=(",", ":"), default=list,
+    ) + "\n"
+    if not _agregar_entradas_manifiesto(base, manifiesto, linea.encode("utf-8")):
+        _reescribir_manifiesto(base, manifiesto)
+
+
+def _agregar_entradas_manifiesto(base: str, manifiesto: Dict[str, Any], linea: bytes) -> bool:
+    """
+    Agrega la línea al archivo de entradas. Devuelve False (hay que reescribir
+    el manifiesto) si el archivo no es de este manifiesto, quedó cortado, o si
+    con la línea las entradas pesarían más que el manifiesto completo.
+    """
+    if manifiesto.get("marca") is None:
+        return False
+    try:
+        with open(ruta_entradas_manifiesto(base), "a+b") as f:
+            f.seek(0)
+            if _marca_entradas(f.readline()) != manifiesto["marca"]:
+                return False # Otro proceso reescribió el manifiesto
+            tamanio = f.seek(0, os.SEEK_END)
+            f.seek(tamanio - 1)
+            if f.read(1) != b"\n" or tamanio + len(linea) > _tamanios_manifiesto.get(base, 0):
+                return False
+            f.write(linea) # Modo 'a': siempre al final, aunque otro proceso también agregue
+        return True
+    except OSError:
+        return False
+
+
+def _reescribir_manifiesto(base: str, manifiesto: Dict[str, Any]):
+    """Escribe el manifiesto completo con una marca nueva y empieza un archivo de entradas vacío."""
+    manifiesto["marca"] = os.urandom(8).hex()
+    # El manifiesto es solo una caché: si no se puede escribir, se sigue sin él
+    if not guardar_json_atomico(ruta_manifiesto(base), manifiesto, default=list):
+        return
+    ruta_entradas = ruta_entradas_manifiesto(base)
+    try:
+        _tamanios_manifiesto[base] = os.path.getsize(ruta_manifiesto(base))
+        with open(ruta_entradas + ".tmp", "wb") as f:
+            f.write((json.dumps({"manifiesto": manifiesto["marca"]}) + "\n").encode("utf-8"))
+        os.replace(ruta_entradas + ".tmp", ruta_entradas)
+    except OSError:
+        pass
+    _persistir_estructuras(base)
+
+
+# base -> generación del manifiesto con la que se guardaron las estructuras persistentes
+_generaciones_persistidas: Dict[str, int] = {}
+
+
+def _persistir_estructuras(base: str):
+    """
+    Guarda las estructuras derivadas persistentes con la generación actual del
+    manifiesto (una sola vez por generación). Se llama al reescribir el
+    manifiesto y al compactar el diario, no en cada guardado.
+    """
+    if _obtener_diario(base).cantidad:
+        return # Con cambios pendientes en el diario, lo persistido quedaría desactualizado
+    generacion = _cargar_manifiesto(base).get("generacion", 0)
+    if _generaciones_persistidas.get(base) == generacion:
+        return
+    for estructura in _estructuras_derivadas.get(base, {}).values():
+        persistir = getattr(estructura, "persistir", None)
+        if persistir:
+            persistir(base, generacion)
+    _generaciones_persistidas[base] = generacion
+
+
+def _entrada_manifiesto(ruta_csv: str, stat: os.stat_result, filas: Optional[List[Tuple[str, int]]] = None) -> Dict[str, Any]:
+    """Arma la entrada del manifiesto de un items.csv (lo parsea si no se pasan las filas)."""
+    if filas is None:
+        filas = _leer_filas_csv(ruta_csv)
+    return {
+        "tamanio": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "filas": [list(fila) for fila in filas],
+    }
+
+
+def _listar_items_csv(base_path: str) -> List[Tuple[str, os.stat_result]]:
+    """Lista (en orden determinista) todos los items.csv del árbol con su stat."""
+    encontrados = []
+    for ruta_csv in recorrer_items_csv(base_path):
+        try:
+            encontrados.append((ruta_csv, os.stat(ruta_csv)))
+        except OSError:
+            continue
+    return encontrados
+
+
+def revalidar_catalogo(base_path: str) -> List[Tuple[str, str]]:
+    """
+    Sincroniza el manifiesto con el disco: parsea solo los items.csv nuevos o
+    modificados, descarta los eliminados y avisa a las estructuras derivadas.
+    Devuelve [(ruta_csv, clave)] en el orden del recorrido.
+    """
+    base = os.path.abspath(base_path)
+    with _candado_catalogo, _bloqueo_arbol(base):
+        _sincronizar_diario(base)
+        return _revalidar_catalogo(base)
+
+
+def _revalidar_catalogo(base: str) -> List[Tuple[str, str]]:
+    _obtener_registro_cambios(base).novedades() # Lo anotado hasta acá lo cubre este recorrido
+    manifiesto = _cargar_manifiesto(base)
+    archivos = manifiesto["archivos"]
+    vistos = set()
+
+    en_orden: List[Tuple[str, str]] = []
+    a_parsear: List[Tuple[str, str, os.stat_result]] = []
+
+    for ruta_csv, stat in _listar_items_csv(base):
+        if not niveles_desde_ruta(ruta_csv):
+            continue
+
+        clave = os.path.relpath(ruta_csv, base)
+        vistos.add(clave)
+        en_orden.append((ruta_csv, clave))
+        entrada = archivos.get(clave)
+        if entrada is None or entrada["tamanio"] != stat.st_size or entrada["mtime_ns"] != stat.st_mtime_ns:
+            a_parsear.append((clave, ruta_csv, stat))
+
+    anteriores = {clave: archivos.get(clave) for clave, _, _ in a_parsear}
+
+    # Solo los CSV nuevos o modificados se parsean (en paralelo)
+    if len(a_parsear) >= UMBRAL_CSV_PROCESOS and PROCESOS_ESCANEO > 1:
+        filas_por_ruta = parsear_csv_en_procesos(base, [ruta for _, ruta, _ in a_parsear])
+        for clave, ruta_csv, stat in a_parsear:
+            archivos[clave] = _entrada_manifiesto(ruta_csv, stat, filas_por_ruta[ruta_csv])
+    elif a_parsear:
+        with ThreadPoolExecutor(max_workers=HILOS_ESCANEO) as executor:
+            entradas = executor.map(lambda t: _entrada_manifiesto(t[1], t[2]), a_parsear)
+            for (clave, _, _), entrada in zip(a_parsear, entradas):
+                archivos[clave] = entrada
+
+    for clave, ruta_csv, _ in a_parsear:
+        entrada_vieja = anteriores[clave]
+        _notificar_diferencias(base, ruta_csv, entrada_vieja["filas"] if entrada_vieja else [], archivos[clave]["filas"])
+
+    # Quitar del manifiesto los CSV que ya no existen
+    eliminadas = [clave for clave in archivos if clave not in vistos]
+    for clave in eliminadas:
+        entrada_vieja = archivos.pop(clave)
+        _notificar_diferencias(base, os.path.join(base, clave), entrada_vieja["filas"], [])
+
+    if a_parsear or eliminadas:
+        _guardar_manifiesto(base, manifiesto, [clave for clave, _, _ in a_parsear] + eliminadas)
+
+    _revisiones_completas[base] = (manifiesto, time.monotonic())
+    return en_orden
+
+
+def cargar_catalogo(base_path: str) -> List[Libro]:
+    """
+    Devuelve la lista consolidada de libros usando el manifiesto como caché.
+    Solo se vuelven a parsear los items.csv cuyo tamaño o mtime cambió (en
+    una sesión en caliente, sin recorrer el árbol).
+    """
+    base = os.path.abspath(base_path)
+    with _candado_catalogo, _bloqueo_arbol(base):
+        claves = revalidar_en_caliente(base)
+        archivos = _cargar_manifiesto(base)["archivos"]
+
+        lista_libros: List[Libro] = []
+        for clave in claves:
+            ruta_csv = os.path.join(base, clave)
+            filas = _aplicar_diario(ruta_csv, archivos[clave]["filas"])
+            lista_libros.extend(_filas_a_libros(ruta_csv, niveles_desde_ruta(ruta_csv), filas))
+        return lista_libros
 
 
+def actualizar_manifiesto_csv(ruta_csv: str):
+    """Refresca en el manifiesto la entrada de un items.csv recién escrito o eliminado."""
+    actualizar_manifiesto_csvs([ruta_csv])
 
+
+def actualizar_manifiesto_csvs(rutas_csv: Iterable[str]):
+    """
+    Refresca varias entradas del manifiesto (CSV escritos o eliminados) y lo
+    guarda una sola vez por base: pensado para escrituras en lote.
+    """
+    por_base: Dict[str, List[str]] = {}
+    for ruta_csv in rutas_csv:
+        por_base.setdefault(_base_desde_ruta_csv(ruta_csv), []).append(ruta_csv)
+
+    for base, rutas in por_base.items():
+        with _candado_catalogo:
+            manifiesto = _cargar_manifiesto(base)
+            claves = []
+            for ruta_csv in rutas:
+                clave = os.path.relpath(os.path.abspath(ruta_csv), base)
+                claves.append(clave)
+                ruta_csv = os.path.join(base, clave) # Misma forma de ruta que produce el recorrido
+                entrada_vieja = manifiesto["archivos"].get(clave)
+
+                try:
+                    entrada_nueva = _entrada_manifiesto(ruta_csv, os.stat(ruta_csv))
+                    manifiesto["archivos"][clave] = entrada_nueva
+                except OSError:
+                    entrada_nueva = None
+                    manifiesto["archivos"].pop(clave, None) # El CSV fue eliminado
+
+                _notificar_diferencias(base, ruta_csv, entrada_vieja["filas"] if entrada_vieja else [],
+                                       entrada_nueva["filas"] if entrada_nueva else [])
+            _guardar_manifiesto(base, manifiesto, claves)
+
+
+# --- CATÁLOGO EN CALIENTE (la sesión no vuelve a recorrer el árbol) ---
+# Una vez revisado el árbol completo, el manifiesto en memoria es el catálogo
+# de la sesión. Para saber si cambió algo alcanza con dos stat: el del diario
+# (altas, modificaciones y bajas) y el del registro de cambios, donde quien
+# crea, reemplaza o elimina un items.csv anota cuál (ver registro_cambios).
+# Solo se vuelven a mirar esos items.csv. Lo que el registro no ve (un CSV
+# editado a mano) se detecta con un recorrido completo cada
+# INTERVALO_REVISION_COMPLETA segundos.
+
+INTERVALO_REVISION_COMPLETA = 60.0
+_candado_registros = threading.Lock()
+_registros_cambios: Dict[str, RegistroCambios] = {}
+# base -> (manifiesto revisado, time.monotonic() del último recorrido completo)
+_revisiones_completas: Dict[str, Tuple[Dict[str, Any], float]] = {}
+
+
+def ruta_registro_cambios(base_path: str) -> str:
+    return ruta_auxiliar(base_path, "cambios.log")
+
+
+def _obtener_registro_cambios(base: str) -> RegistroCambios:
+    # Candado propio: se anota también desde _obtener_diario, que ya tiene _candado_diarios
+    with _candado_registros:
+        registro = _registros_cambios.get(base)
+        if registro is None:
+            registro = _registros_cambios[base] = RegistroCambios(ruta_registro_cambios(base))
+        return registro
+
+
+def _anotar_cambios(base: str, claves: Iterable[str]):
+    """Anota en el registro los items.csv que se acaban de crear, reemplazar o eliminar."""
+    try:
+        _obtener_registro_cambios(base).anotar(claves)
+    except OSError:
+        pass # El CSV ya está escrito: los demás procesos lo verán en su próximo recorrido completo
+
+
+def _claves_en_orden(archivos: Dict[str, Any]) -> List[str]:
+    """Claves del manifiesto en el mismo orden que recorrer_items_csv (alfabético por nivel)."""
+    return sorted(archivos, key=lambda clave: clave.split(os.sep))
+
+
+def _en_caliente(base: str) -> bool:
+    revision = _revisiones_completas.get(base)
+    return revision is not None and revision[0] is _manifiestos_en_memoria.get(base)
+
+
+def _revalidar_claves(base: str, claves: Iterable[str]):
+    """Revalida solo esos items.csv: los que cambiaron de tamaño o mtime se vuelven a leer."""
+    archivos = _cargar_manifiesto(base)["archivos"]
+    cambiados = []
+    for clave in claves:
+        ruta_csv = os.path.join(base, clave)
+        if not niveles_desde_ruta(ruta_csv):
+            continue
+        entrada = archivos.get(clave)
+        try:
+            stat = os.stat(ruta_csv)
+        except OSError:
+            if entrada is not None:
+                cambiados.append(ruta_csv) # Eliminado
+            continue
+        if entrada is None or entrada["tamanio"] != stat.st_size or entrada["mtime_ns"] != stat.st_mtime_ns:
+            cambiados.append(ruta_csv)
+    if cambiados:
+        actualizar_manifiesto_csvs(cambiados)
+
+
+def _revalidar_en_caliente(base: str) -> Optional[List[str]]:
+    """
+    Pone al día el manifiesto sin recorrer el árbol si la sesión ya está en
+    caliente; si no (o si el registro no alcanza), con un recorrido completo,
+    y en ese caso devuelve las claves de los items.csv en el orden del recorrido.
+    """
+    novedades = _obtener_registro_cambios(base).novedades()
+    revision = _revisiones_completas.get(base)
+    if (novedades is None or not _en_caliente(base)
+            or time.monotonic() - revision[1] >= INTERVALO_REVISION_COMPLETA):
+        return [clave for _, clave in _revalidar_catalogo(base)]
+    if novedades:
+        _revalidar_claves(base, novedades)
+    return None
+
+
+def revalidar_en_caliente(base_path: str) -> List[str]:
+    """
+    Como revalidar_catalogo, pero en una sesión que ya cargó el catálogo solo
+    mira el diario, el registro de cambios y los items.csv anotados en él.
+    Devuelve las claves de los items.csv en el orden del recorrido.
+    """
+    base = os.path.abspath(base_path)
+    with _candado_catalogo, _bloqueo_arbol(base):
+        # Primero el diario: un alta que crea su items.csv lo anota antes de escribir en el diario
+        _sincronizar_diario(base)
+        claves = _revalidar_en_caliente(base)
+        return claves if claves is not None else _claves_en_orden(_cargar_manifiesto(base)["archivos"])
+
+
+# --- INSTANTÁNEA BINARIA DEL MANIFIESTO (ver instantanea_catalogo) ---
+# Para despliegues de solo lectura: la instantánea guarda las mismas filas
+# del disco que el manifiesto, pero se abre con mmap sin parsear nada. Si es
+# más nueva que el manifiesto JSON, el manifiesto arranca desde ella; la
+# revalidación compara igual tamaño y mtime de cada items.csv, así que los
+# que cambiaron después de exportarla se vuelven a leer del árbol.
+
+def ruta_instantanea(base_path: str) -> str:
+    return ruta_auxiliar(base_path, "instantanea.bin")
+
+
+def _manifiesto_desde_instantanea(base: str) -> Optional[Dict[str, Any]]:
+    """Manifiesto con las filas de la instantánea, o None si no hay o el JSON es más nuevo."""
+    try:
+        mtime_instantanea = os.stat(ruta_instantanea(base)).st_mtime_ns
+    except OSError:
+        return None
+    mtime_manifiesto = _mtime_manifiesto(base)
+    if mtime_manifiesto is not None and mtime_manifiesto > mtime_instantanea:
+        return None # El catálogo cambió después de exportar la instantánea
+
+    instantanea = abrir_instantanea(ruta_instantanea(base))
+    if instantanea is None:
+        return None
+    archivos = {
+        clave: {"tamanio": tamanio, "mtime_ns": mtime_ns, "filas": filas}
+        for clave, tamanio, mtime_ns, filas in instantanea.archivos()
+    }
+    return {"version": VERSION_MANIFIESTO, "generacion": instantanea.generacion, "archivos": archivos}
+
+
+def exportar_instantanea(base_path: str) -> Tuple[str, int]:
+    """
+    Empaqueta el árbol (las filas de disco de cada items.csv, sin el diario,
+    que se sigue aplicando al leer) en la instantánea binaria.
+    Devuelve (ruta, cantidad de libros).
+    """
+    base = os.path.abspath(base_path)
+    with _candado_catalogo, _bloqueo_arbol(base):
+        _sincronizar_diario(base)
+        en_orden = _revalidar_catalogo(base)
+        manifiesto = _cargar_manifiesto(base)
+        archivos = manifiesto["archivos"]
+        entradas = [
+            (clave, archivos[clave]["tamanio"], archivos[clave]["mtime_ns"], archivos[clave]["filas"])
+            for _, clave in en_orden
+        ]
+        escribir_instantanea(ruta_instantanea(base), manifiesto.get("generacion", 0), entradas)
+    return ruta_instantanea(base), sum(len(filas) for _, _, _, filas in entradas)
+
+
+# --- DIARIO DE CAMBIOS Y COMPACTACIÓN ---
+# Las altas, modificaciones y bajas se agregan al diario (ver diario_cambios):
+# escribir en un items.csv de 10 filas o de 100.000 cuesta lo mismo. Los
+# lectores de este módulo aplican el diario sobre las filas del disco, y las
+# estructuras derivadas reflejan siempre "filas del manifiesto + diario".
+# La compactación vuelca el diario a los items.csv con un plan de rehacer:
+#   1. escribe cada items.csv nuevo en un temporal (con fsync),
+#   2. guarda el plan: a partir de acá la compactación se da por hecha,
+#   3. reemplaza los items.csv con os.replace y quita del diario lo volcado,
+#   4. borra el plan.
+# Si el programa se corta antes del paso 2, el diario sigue valiendo tal cual;
+# si se corta después, al volver a abrir el catálogo se termina el plan.
+
+UMBRAL_COMPACTACION = 1000 # Operaciones en el diario que disparan una compactación en segundo plano
+SUFIJO_TEMPORAL_COMPACTACION = ".compactando"
+
+# Protege manifiesto, diario y estructuras derivadas de la compactación en segundo plano
+_candado_catalogo = threading.RLock()
+# Protege solo el registro de diarios (se consulta desde los hilos de escaneo)
+_candado_diarios = threading.Lock()
+_diarios: Dict[str, DiarioCambios] = {}
+_compactaciones_en_curso: set = set()
+# Bloqueos entre procesos (ver 'bloqueos'): árbol -> hoja -> diario
+_bloqueos_arbol: Dict[str, BloqueoArbol] = {}
+
+
+def _bloqueo_arbol(base_path: str, exclusivo: bool = False):
+    """Bloqueo de la carpeta base (se debe tener el candado del catálogo)."""
+    base = os.path.abspath(base_path)
+    bloqueo = _bloqueos_arbol.get(base)
+    if bloqueo is None:
+        bloqueo = _bloqueos_arbol[base] = BloqueoArbol(base)
+    return bloqueo.tomar(exclusivo)
+
+
+def _bloqueo_hoja(ruta_csv: str):
+    """Bloqueo exclusivo de la carpeta genero/autor/anio de un items.csv."""
+    return bloqueo_archivo(os.path.dirname(os.path.abspath(ruta_csv)))
+
+
+def _bloqueo_diario(base: str):
+    return bloqueo_archivo(ruta_auxiliar(base, "diario.lock"))
+
+
+def ruta_diario(base_path: str) -> str:
+    """Ruta del diario de cambios, guardado junto a la carpeta de datos."""
+    return ruta_auxiliar(base_path, "diario.jsonl")
+
+
+def _ruta_plan_compactacion(base: str) -> str:
+    return ruta_auxiliar(base, "compactacion.json")
+
+
+def _obtener_diario(base: str) -> DiarioCambios:
+    """Diario de la base: se carga una vez, terminando antes una compactación interrumpida."""
+    with _candado_diarios:
+        diario = _diarios.get(base)
+        if diario is None:
+            diario = DiarioCambios(ruta_diario(base))
+            with _bloqueo_diario(base):
+                _ejecutar_plan_compactacion(base, diario)
+                diario.sincronizar()
+            _diarios[base] = diario
+        return diario
+
+
+def _aplicar_diario(ruta_csv: str, filas: List[Any]) -> List[Any]:
+    """Filas vigentes de un items.csv: las del disco (o del manifiesto) más su diario."""
+    base = _base_desde_ruta_csv(ruta_csv)
+    diario = _obtener_diario(base)
+    if not diario.cantidad:
+        return filas
+    operaciones = diario.operaciones_de(os.path.relpath(os.path.abspath(ruta_csv), base))
+    return aplicar_operaciones(filas, operaciones) if operaciones else filas
+
+
+def _sincronizar_diario(base: str):
+    """Incorpora lo que otro proceso agregó al diario y avisa a las estructuras derivadas."""
+    diario = _obtener_diario(base)
+    cambiadas = diario.sincronizar()
+    if not cambiadas or not _estructuras_derivadas.get(base):
+        return
+
+    archivos = _cargar_manifiesto(base)["archivos"]
+    for clave, operaciones_viejas in cambiadas.items():
+        filas_disco = archivos[clave]["filas"] if clave in archivos else []
+        filas = aplicar_operaciones(filas_disco, operaciones_viejas)
+        operaciones = diario.operaciones_de(clave)
+        if operaciones[:len(operaciones_viejas)] == operaciones_viejas:
+            # Caso común: el otro proceso agregó operaciones al final y cada una trae su cambio
+            cambios = [aplicar_operacion(filas, operacion) for operacion in operaciones[len(operaciones_viejas):]]
+            _notificar_cambio_csv(base, os.path.join(base, clave), [cambio for cambio in cambios if cambio])
+        else:
+            # El diario se reescribió (compactación de otro proceso): se compara antes y después
+            _notificar_cambio_csv(base, os.path.join(base, clave),
+                                  diferencias_filas(filas, aplicar_operaciones(filas_disco, operaciones)))
+
+
+def _sincronizar_diarios_cargados():
+    for base in list(_diarios):
+        _sincronizar_diario(base)
+
+
+def registrar_cambio(ruta_csv: str, operacion: Operacion):
+    """
+    Registra un alta, modificación o baja de un items.csv en el diario (una
+    línea al final, sin reescribir el CSV) y actualiza las estructuras derivadas.
+    En un alta, si el items.csv no existe se crea solo con el encabezado (su
+    carpeta ya tiene que existir).
+    """
+    base = _base_desde_ruta_csv(ruta_csv)
+    clave = os.path.relpath(os.path.abspath(ruta_csv), base)
+    ruta_csv = os.path.join(base, clave)
+    diario = _obtener_diario(base)
+
+    # El bloqueo del árbol impide que una compactación elimine el CSV en el medio
+    with _candado_catalogo, _bloqueo_arbol(base):
+        if operacion["op"] == "alta" and not os.path.exists(ruta_csv):
+            with _bloqueo_hoja(ruta_csv):
+                _crear_items_csv(ruta_csv)
+
+        with _bloqueo_diario(base):
+            _sincronizar_diario(base)
+            cambio = None
+            if _estructuras_derivadas.get(base):
+                # El cambio de esta operación (una fila) es lo único que reciben las estructuras
+                entrada = _cargar_manifiesto(base)["archivos"].get(clave)
+                cambio = aplicar_operacion(
+                    aplicar_operaciones(entrada["filas"] if entrada else [], diario.operaciones_de(clave)), operacion)
+            diario.anexar(clave, operacion)
+
+        if cambio is not None:
+            _notificar_cambio_csv(base, ruta_csv, [cambio])
+
+        if diario.cantidad >= UMBRAL_COMPACTACION:
+            compactar_en_segundo_plano(base)
+
+
+def _filas_en_disco(base: str, clave: str) -> List[Any]:
+    """Filas del items.csv en disco: las del manifiesto si no cambió (mismo tamaño y mtime), si no, parseadas."""
+    ruta_csv = os.path.join(base, clave)
+    entrada = _cargar_manifiesto(base)["archivos"].get(clave)
+    if entrada is not None:
+        try:
+            stat = os.stat(ruta_csv)
+        except OSError:
+            return []
+        if entrada["tamanio"] == stat.st_size and entrada["mtime_ns"] == stat.st_mtime_ns:
+            return entrada["filas"]
+    return _leer_filas_csv(ruta_csv)
+
+
+def leer_filas_items_csv(ruta_csv: str) -> List[Any]:
+    """
+    Filas vigentes (título, páginas) de un items.csv (disco + diario), leídas
+    con el bloqueo compartido del árbol: una foto consistente aunque otro
+    proceso compacte. Si el CSV no cambió se usan las filas del manifiesto.
+    """
+    base = _base_desde_ruta_csv(ruta_csv)
+    clave = os.path.relpath(os.path.abspath(ruta_csv), base)
+    with _candado_catalogo, _bloqueo_arbol(base):
+        _sincronizar_diario(base)
+        return _aplicar_diario(os.path.join(base, clave), _filas_en_disco(base, clave))
+
+
+def leer_items_csv(ruta_csv: str) -> List[Libro]:
+    """Libros vigentes de un items.csv (ver leer_filas_items_csv)."""
+    niveles_jerarquia = niveles_desde_ruta(ruta_csv)
+    if not niveles_jerarquia:
+        return []
+    return _filas_a_libros(ruta_csv, niveles_jerarquia, leer_filas_items_csv(ruta_csv))
+
+
+def _crear_items_csv(ruta_csv: str):
+    """Crea un items.csv solo con el encabezado (si otro proceso lo creó antes, no hace nada)."""
+    try:
+        with open(ruta_csv, "x", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerow(CSV_HEADERS)
+    except FileExistsError:
+        return
+    base = _base_desde_ruta_csv(ruta_csv)
+    _anotar_cambios(base, [os.path.relpath(os.path.abspath(ruta_csv), base)])
+
+
+def _escribir_csv_temporal(ruta_tmp: str, filas: List[Fila]):
+    with open(ruta_tmp, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADERS)
+        writer.writerows(filas)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _ejecutar_plan_compactacion(base: str, diario: DiarioCambios, plan: Optional[Dict[str, List[str]]] = None):
+    """Pasos 3 y 4 de la compactación. Sin plan, retoma el que haya quedado en disco."""
+    ruta_plan = _ruta_plan_compactacion(base)
+    if plan is None:
+        try:
+            with open(ruta_plan, "r", encoding="utf-8") as f:
+                plan = json.load(f)
+        except (OSError, ValueError):
+            return # No hay compactación pendiente
+
+    # Cada paso se puede repetir sin riesgo si el programa se corta otra vez
+    for clave in plan["reemplazar"]:
+        ruta_csv = os.path.join(base, clave)
+        if os.path.exists(ruta_csv + SUFIJO_TEMPORAL_COMPACTACION):
+            os.replace(ruta_csv + SUFIJO_TEMPORAL_COMPACTACION, ruta_csv)
+    for clave in plan["eliminar"]:
+        try:
+            os.remove(os.path.join(base, clave))
+        except FileNotFoundError:
+            pass
+    _anotar_cambios(base, plan["reemplazar"] + plan["eliminar"])
+
+    diario.sincronizar()
+    diario.descartar(plan["reemplazar"] + plan["eliminar"])
+    os.remove(ruta_plan)
+
+
+def _volcar_a_disco(base: str, filas_por_clave: Dict[str, List[Fila]]):
+    """
+    Deja cada items.csv indicado con esas filas (sin filas, lo elimina), quita
+    sus operaciones del diario y actualiza manifiesto y estructuras derivadas.
+    """
+    diario = _obtener_diario(base)
+    manifiesto = _cargar_manifiesto(base)
+    archivos = manifiesto["archivos"]
+    anteriores = {
+        clave: aplicar_operaciones(archivos[clave]["filas"] if clave in archivos else [], diario.operaciones_de(clave))
+        for clave in filas_por_clave
+    }
+
+    # 1. Temporales  2. Plan (con fsync: es el punto de confirmación)
+    plan: Dict[str, List[str]] = {"reemplazar": [], "eliminar": []}
+    for clave, filas in filas_por_clave.items():
+        if filas:
+            _escribir_csv_temporal(os.path.join(base, clave) + SUFIJO_TEMPORAL_COMPACTACION, filas)
+            plan["reemplazar"].append(clave)
+        else:
+            plan["eliminar"].append(clave)
+
+    ruta_plan = _ruta_plan_compactacion(base)
+    with open(ruta_plan + ".tmp", "w", encoding="utf-8") as f:
+        f.write(json.dumps(plan, ensure_ascii=False))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(ruta_plan + ".tmp", ruta_plan)
+
+    # 3. y 4.
+    _ejecutar_plan_compactacion(base, diario, plan)
+
+    for clave, filas in filas_por_clave.items():
+        ruta_csv = os.path.join(base, clave)
+        try:
+            archivos[clave] = _entrada_manifiesto(ruta_csv, os.stat(ruta_csv), filas)
+        except OSError:
+            archivos.pop(clave, None)
+        # En una compactación el contenido vigente no cambia: no hay diferencias que avisar
+        _notificar_diferencias(base, ruta_csv, anteriores[clave], filas)
+    _guardar_manifiesto(base, manifiesto, filas_por_clave)
+    _persistir_estructuras(base)
+
+
+def compactar_diario(base_path: str) -> int:
+    """
+    Vuelca el diario a los items.csv (cada uno se reescribe una sola vez, de
+    forma atómica) y lo vacía. Devuelve cuántas operaciones se volcaron.
+    """
+    base = os.path.abspath(base_path)
+    diario = _obtener_diario(base)
+    # Cambio estructural: bloqueo exclusivo del árbol (espera a escritores y lectores)
+    with _candado_catalogo, _bloqueo_arbol(base, exclusivo=True), _bloqueo_diario(base):
+        _sincronizar_diario(base)
+        # Con el árbol bloqueado en exclusivo nadie está anotando: se puede vaciar el registro
+        _obtener_registro_cambios(base).reiniciar_si_grande()
+        cantidad = diario.cantidad
+        if not cantidad:
+            _persistir_estructuras(base) # Lo que se haya revalidado desde el último guardado
+            return 0
+
+        filas_por_clave = {
+            clave: aplicar_operaciones(_leer_filas_csv(os.path.join(base, clave)), operaciones)
+            for clave, operaciones in diario.operaciones.items()
+        }
+        _volcar_a_disco(base, filas_por_clave)
+        return cantidad
+
+
+def compactar_en_segundo_plano(base_path: str):
+    """Lanza compactar_diario en un hilo aparte (uno por base a la vez)."""
+    base = os.path.abspath(base_path)
+    with _candado_diarios:
+        if base in _compactaciones_en_curso:
+            return
+        _compactaciones_en_curso.add(base)
+
+    def compactar():
+        try:
+            compactar_diario(base)
+        except OSError:
+            pass # El diario sigue siendo válido: se reintenta en la próxima compactación
+        finally:
+            with _candado_diarios:
+                _compactaciones_en_curso.discard(base)
+
+    threading.Thread(target=compactar, name="compactacion-diario", daemon=True).start()
+
+
+def reescribir_csv(ruta_csv: str, filas: List[Fila]):
+    """
+    Reemplaza de forma atómica todo el contenido de un items.csv (sin filas, lo
+    elimina) y descarta las operaciones que tenía pendientes en el diario.
+    """
+    base = _base_desde_ruta_csv(ruta_csv)
+    clave = os.path.relpath(os.path.abspath(ruta_csv), base)
+    _obtener_diario(base)
+    with _candado_catalogo, _bloqueo_arbol(base), _bloqueo_hoja(ruta_csv), _bloqueo_diario(base):
+        _sincronizar_diario(base)
+        _volcar_a_disco(base, {clave: list(filas)})
+
+
+def transformar_csv(ruta_csv: str, transformar: Callable[[List[Fila]], List[Fila]]):
+    """
+    Lee las filas vigentes de un items.csv (disco + diario), las pasa por
+    'transformar' y las escribe con reescribir_csv, todo con los bloqueos
+    tomados: otro proceso no puede cambiar el CSV entre la lectura y la escritura.
+    """
+    base = _base_desde_ruta_csv(ruta_csv)
+    clave = os.path.relpath(os.path.abspath(ruta_csv), base)
+    ruta_csv = os.path.join(base, clave)
+    _obtener_diario(base)
+    with _candado_catalogo, _bloqueo_arbol(base), _bloqueo_hoja(ruta_csv), _bloqueo_diario(base):
+        _sincronizar_diario(base)
+        filas = _aplicar_diario(ruta_csv, _leer_filas_csv(ruta_csv))
+        _volcar_a_disco(base, {clave: list(transformar(filas))})
+
+
+def transformar_csvs(base_path: str, transformaciones: Dict[str, Callable[[List[Fila]], List[Fila]]]):
+    """
+    transformar_csv para varios items.csv de la misma base ({ruta_csv:
+    transformar}): los bloqueos se toman una vez y todos se escriben en un
+    solo volcado, con un solo guardado del manifiesto y de las estructuras
+    (llamar a transformar_csv por archivo los guarda una vez por cada uno).
+    Como la compactación, reescribe muchos CSV: toma el árbol en exclusivo.
+    """
+    base = os.path.abspath(base_path)
+    if not transformaciones:
+        return
+    _obtener_diario(base)
+    with _candado_catalogo, _bloqueo_arbol(base, exclusivo=True), _bloqueo_diario(base):
+        _sincronizar_diario(base)
+        filas_por_clave: Dict[str, List[Fila]] = {}
+        for ruta_csv, transformar in transformaciones.items():
+            clave = os.path.relpath(os.path.abspath(ruta_csv), base)
+            ruta_csv = os.path.join(base, clave)
+            filas_por_clave[clave] = list(transformar(_aplicar_diario(ruta_csv, _leer_filas_csv(ruta_csv))))
+        _volcar_a_disco(base, filas_por_clave)
+
+
+def agregar_filas_csv(ruta_csv: str, filas: List[Fila], sincronizar: bool = True):
+    """
+    Agrega filas al final de un items.csv (lo crea si no existe) escribiendo
+    una copia completa y reemplazándolo con os.replace: quien lo lee al mismo
+    tiempo ve el archivo anterior o el nuevo, nunca una fila a medias.
+    Pensada para altas masivas; no pasa por el diario ni actualiza el manifiesto
+    (sí lo anota en el registro de cambios).
+    Con sincronizar=False se omite el fsync de la copia (más rápido, pero ante
+    un corte de energía el archivo podría no quedar completo en disco).
+    """
+    base = _base_desde_ruta_csv(ruta_csv)
+    ruta_tmp = ruta_csv + ".tmp"
+    with _candado_catalogo, _bloqueo_arbol(base), _bloqueo_hoja(ruta_csv):
+        try:
+            with open(ruta_csv, "r", encoding="utf-8", newline="") as f:
+                contenido = f.read()
+        except FileNotFoundError:
+            contenido = ""
+
+        with open(ruta_tmp, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            if contenido:
+                f.write(contenido if contenido.endswith("\n") else contenido + "\r\n")
+            else:
+                writer.writerow(CSV_HEADERS)
+            writer.writerows(filas)
+            if sincronizar:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(ruta_tmp, ruta_csv)
+        _anotar_cambios(base, [os.path.relpath(os.path.abspath(ruta_csv), base)])
+
+
+# --- ESTRUCTURAS DERIVADAS EN MEMORIA (árbol, índices, estadísticas) ---
+# Se construyen una vez a partir del catálogo y luego se actualizan fila a
+# fila: cada vez que el manifiesto detecta o registra un cambio en un
+# items.csv se llama a estructura.aplicar_cambios_csv(ruta_csv, cambios) con
+# solo las filas que cambiaron, como libros (ver CambioFila en diario_cambios).
+# Una operación del diario es un solo cambio; cuando se reemplaza un items.csv
+# entero se comparan las filas de antes y de después (diferencias_filas).
+# Los libros 'anteriores' son copias (iguales por valor) de los que había.
+# Si la estructura tiene persistir(base, generacion), se guarda al reescribir
+# el manifiesto y al compactar el diario (ver _persistir_estructuras); al reabrir el programa se recupera con 'cargar_persistida' si
+# corresponde a la misma generación del manifiesto.
+
+_estructuras_derivadas: Dict[str, Dict[str, Any]] = {}
+
+
+def obtener_estructura(base_path: str, nombre: str, constructor: Callable[[List[Libro]], Any],
+                       cargar_persistida: Optional[Callable[[str, int], Any]] = None) -> Any:
+    """Devuelve la estructura derivada 'nombre' del catálogo, construyéndola la primera vez."""
+    base = os.path.abspath(base_path)
+    with _candado_catalogo:
+        registro = _estructuras_derivadas.setdefault(base, {})
+
+        # Versión guardada en disco: válida solo si es de la generación actual del
+        # manifiesto y no quedaron cambios del diario sin volcar (no la incluyen)
+        if nombre not in registro and cargar_persistida and not _obtener_diario(base).cantidad:
+            estructura = cargar_persistida(base, _cargar_manifiesto(base).get("generacion", 0))
+            if estructura is not None:
+                registro[nombre] = estructura
+
+        if nombre in registro:
+            # Aplica los cambios hechos por otros procesos (ver CATÁLOGO EN CALIENTE)
+            with _bloqueo_arbol(base):
+                _sincronizar_diario(base)
+                _revalidar_en_caliente(base)
+            return registro[nombre]
+
+        estructura = constructor(cargar_catalogo(base))
+        registro[nombre] = estructura
+        persistir = getattr(estructura, "persistir", None)
+        if persistir and not _obtener_diario(base).cantidad:
+            persistir(base, _cargar_manifiesto(base).get("generacion", 0))
+        return estructura
+
+
+def _notificar_cambio_csv(base: str, ruta_csv: str, cambios: List[CambioFila]):
+    """Avisa a las estructuras derivadas de la base qué filas de un items.csv cambiaron."""
+    registro = _estructuras_derivadas.get(base)
+    niveles_jerarquia = niveles_desde_ruta(ruta_csv)
+    if not registro or not niveles_jerarquia or not cambios:
+        return
+
+    def libro(fila: Optional[Fila]) -> Optional[Libro]:
+        return None if fila is None else _filas_a_libros(ruta_csv, niveles_jerarquia, [fila])[0]
+
+    cambios_libros = [(posicion, libro(anterior), libro(nueva)) for posicion, anterior, nueva in cambios]
+    for estructura in registro.values():
+        estructura.aplicar_cambios_csv(ruta_csv, cambios_libros)
+
+
+def _notificar_diferencias(base: str, ruta_csv: str, filas_disco_viejas: List[Any], filas_disco_nuevas: List[Any]):
+    """
+    Avisa de un items.csv reemplazado: compara sus filas vigentes (las del
+    disco más el diario) de antes y de después. Sin estructuras no compara nada.
+    """
+    if _estructuras_derivadas.get(base):
+        _notificar_cambio_csv(base, ruta_csv, diferencias_filas(
+            _aplicar_diario(ruta_csv, filas_disco_viejas), _aplicar_diario(ruta_csv, filas_disco_nuevas)))
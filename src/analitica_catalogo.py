@@ -0,0 +1,256 @@
+# --- ANÁLISIS DEL CATÁLOGO EN COLUMNAS (NumPy, con respaldo en Python puro) ---
+# estadisticas() muestra los agregados que se mantienen al día libro a libro;
+# este módulo calcula de una vez el resto: percentiles e histograma de páginas
+# y, por género, autor y año, cantidad, total, promedio, mediana, mínimo y
+# máximo de páginas. El catálogo se carga en columnas: páginas y año como
+# enteros, género y autor como códigos de categoría (índices en la lista de
+# valores distintos). Los agregados por grupo salen de un solo ordenamiento
+# por (grupo, páginas): cada grupo queda contiguo y su mínimo, máximo y
+# mediana son posiciones fijas dentro del tramo, sin bucles por libro.
+# Sin NumPy se usan las mismas columnas con bucles de Python (mismo informe).
+# Uso (desde la raíz del repositorio):
+#   python src/analitica_catalogo.py                  # informe en pantalla
+#   python src/analitica_catalogo.py --json -         # informe en JSON por stdout
+#   python src/analitica_catalogo.py --json informe.json --barras 20
+import os
+import sys
+import json
+import argparse
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from modelo_libro import Libro
+from motores_almacenamiento import MOTORES, crear_motor, ERRORES_ALMACENAMIENTO
+
+PERCENTILES = (10, 25, 50, 75, 90, 95, 99)
+BARRAS_HISTOGRAMA = 10
+GRUPOS_EN_PANTALLA = 10
+BASE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "data"))
+
+
+class TablaCatalogo:
+    """
+    El catálogo en columnas: paginas, anios, generos y autores (códigos) con
+    un valor por libro; los nombres de cada código están en
+    nombres_generos / nombres_autores. Con NumPy las columnas son ndarray
+    (sin copiar: se ven sobre los array de la carga); si no, array de enteros.
+    """
+
+    def __init__(self, libros: Iterable[Libro], usar_numpy: bool = True):
+        self.con_numpy = usar_numpy and np is not None
+        self.nombres_generos: List[str] = []
+        self.nombres_autores: List[str] = []
+        codigos_generos: Dict[str, int] = {}
+        codigos_autores: Dict[str, int] = {}
+        paginas, anios, generos, autores = array("q"), array("q"), array("q"), array("q")
+
+        for libro in libros:
+            codigo_genero = codigos_generos.get(libro.genero)
+            if codigo_genero is None:
+                codigo_genero = codigos_generos[libro.genero] = len(self.nombres_generos)
+                self.nombres_generos.append(libro.genero)
+            codigo_autor = codigos_autores.get(libro.autor)
+            if codigo_autor is None:
+                codigo_autor = codigos_autores[libro.autor] = len(self.nombres_autores)
+                self.nombres_autores.append(libro.autor)
+            paginas.append(libro.paginas)
+            anios.append(libro.anio_num)
+            generos.append(codigo_genero)
+            autores.append(codigo_autor)
+
+        if self.con_numpy:
+            self.paginas, self.anios, self.generos, self.autores = (
+                np.frombuffer(columna, dtype=np.int64) for columna in (paginas, anios, generos, autores))
+        else:
+            self.paginas, self.anios, self.generos, self.autores = paginas, anios, generos, autores
+
+    def __len__(self) -> int:
+        return len(self.paginas)
+
+
+# --- Agregados (cada uno con su versión NumPy y su versión en Python) ---
+
+def _percentil(ordenados: Sequence[int], q: float) -> float:
+    """Percentil con interpolación lineal (el método por defecto de numpy.percentile)."""
+    posicion = (len(ordenados) - 1) * q / 100
+    abajo = int(posicion)
+    arriba = min(abajo + 1, len(ordenados) - 1)
+    return ordenados[abajo] + (ordenados[arriba] - ordenados[abajo]) * (posicion - abajo)
+
+
+def resumen_paginas(tabla: TablaCatalogo) -> Dict[str, Any]:
+    """Mínimo, máximo, promedio y PERCENTILES de las páginas (tabla no vacía)."""
+    if tabla.con_numpy:
+        paginas = tabla.paginas
+        minimo, maximo, total = int(paginas.min()), int(paginas.max()), int(paginas.sum())
+        percentiles = np.percentile(paginas, PERCENTILES).tolist()
+    else:
+        ordenadas = sorted(tabla.paginas)
+        minimo, maximo, total = ordenadas[0], ordenadas[-1], sum(ordenadas)
+        percentiles = [_percentil(ordenadas, q) for q in PERCENTILES]
+    return {
+        "min": minimo,
+        "max": maximo,
+        "promedio": round(total / len(tabla), 2),
+        "percentiles": {f"p{q}": round(valor, 2) for q, valor in zip(PERCENTILES, percentiles)},
+    }
+
+
+def histograma_paginas(tabla: TablaCatalogo, barras: int = BARRAS_HISTOGRAMA) -> List[Dict[str, int]]:
+    """Cantidad de libros por rango de páginas: hasta 'barras' rangos enteros del mismo ancho."""
+    if tabla.con_numpy:
+        minimo, maximo = int(tabla.paginas.min()), int(tabla.paginas.max())
+    else:
+        minimo, maximo = min(tabla.paginas), max(tabla.paginas)
+    ancho = -(-(maximo - minimo + 1) // barras) # Redondeo hacia arriba: el máximo entra en la última barra
+    usadas = (maximo - minimo) // ancho + 1
+
+    if tabla.con_numpy:
+        cantidades = np.bincount((tabla.paginas - minimo) // ancho, minlength=usadas).tolist()
+    else:
+        cantidades = [0] * usadas
+        for paginas in tabla.paginas:
+            cantidades[(paginas - minimo) // ancho] += 1
+    return [{"desde": minimo + i * ancho, "hasta": minimo + (i + 1) * ancho - 1, "cantidad": cantidad}
+            for i, cantidad in enumerate(cantidades)]
+
+
+def agregar_por_grupo(tabla: TablaCatalogo, codigos: Sequence[int], claves: Sequence[Any]) -> List[Dict[str, Any]]:
+    """
+    Agregados de páginas por código de grupo (codigos[i] es el grupo del
+    libro i, claves[c] el nombre del grupo c; todos los grupos tienen libros).
+    """
+    if tabla.con_numpy:
+        cantidad = np.bincount(codigos, minlength=len(claves))
+        # Por grupo y, dentro del grupo, por páginas: un solo sort de enteros grupo * base + páginas
+        minimo_global = int(tabla.paginas.min())
+        base = int(tabla.paginas.max()) - minimo_global + 1
+        if len(claves) * base < 2 ** 62:
+            ordenadas = np.sort(codigos * base + (tabla.paginas - minimo_global)) % base + minimo_global
+        else:
+            ordenadas = tabla.paginas[np.lexsort((tabla.paginas, codigos))]
+        inicio = np.cumsum(cantidad) - cantidad
+        total = np.add.reduceat(ordenadas, inicio)
+        minimo = ordenadas[inicio]
+        maximo = ordenadas[inicio + cantidad - 1]
+        mediana = (ordenadas[inicio + (cantidad - 1) // 2] + ordenadas[inicio + cantidad // 2]) / 2
+        columnas = zip(cantidad.tolist(), total.tolist(), mediana.tolist(), minimo.tolist(), maximo.tolist())
+    else:
+        por_grupo: List[List[int]] = [[] for _ in claves]
+        for codigo, paginas in zip(codigos, tabla.paginas):
+            por_grupo[codigo].append(paginas)
+        columnas = []
+        for valores in por_grupo:
+            valores.sort()
+            n = len(valores)
+            columnas.append((n, sum(valores), (valores[(n - 1) // 2] + valores[n // 2]) / 2, valores[0], valores[-1]))
+
+    return [{"clave": clave, "cantidad": n, "paginas_total": total, "promedio": round(total / n, 2),
+             "mediana": mediana, "min": minimo, "max": maximo}
+            for clave, (n, total, mediana, minimo, maximo) in zip(claves, columnas)]
+
+
+def codigos_de_anio(tabla: TablaCatalogo):
+    """(años distintos en orden, código de cada libro): el año no viene codificado como género y autor."""
+    if tabla.con_numpy:
+        anios, codigos = np.unique(tabla.anios, return_inverse=True)
+        return anios.tolist(), codigos
+    anios = sorted(set(tabla.anios))
+    posicion = {anio: i for i, anio in enumerate(anios)}
+    return anios, [posicion[anio] for anio in tabla.anios]
+
+
+def informe_analitico(tabla: TablaCatalogo, barras: int = BARRAS_HISTOGRAMA) -> Dict[str, Any]:
+    """Informe completo apto para JSON. Los grupos de género y autor van de más a menos libros; los años en orden."""
+    if not len(tabla):
+        return {"calculado_con": "numpy" if tabla.con_numpy else "python", "total_libros": 0}
+
+    def por_cantidad(grupos: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return sorted(grupos, key=lambda grupo: (-grupo["cantidad"], grupo["clave"]))
+
+    anios, codigos_anio = codigos_de_anio(tabla)
+    return {
+        "calculado_con": "numpy" if tabla.con_numpy else "python",
+        "total_libros": len(tabla),
+        "paginas": resumen_paginas(tabla),
+        "histograma_paginas": histograma_paginas(tabla, barras),
+        "por_genero": por_cantidad(agregar_por_grupo(tabla, tabla.generos, tabla.nombres_generos)),
+        "por_autor": por_cantidad(agregar_por_grupo(tabla, tabla.autores, tabla.nombres_autores)),
+        "por_anio": agregar_por_grupo(tabla, codigos_anio, anios),
+    }
+
+
+# --- Presentación ---
+
+def _mostrar_grupos(titulo: str, grupos: List[Dict[str, Any]], limite: Optional[int]):
+    print(f"\n{titulo}:")
+    print(f"  {'':<28}{'libros':>8}{'prom.':>9}{'mediana':>9}{'mín':>7}{'máx':>7}")
+    for grupo in grupos[:limite]:
+        print(f"  {str(grupo['clave'])[:27]:<28}{grupo['cantidad']:>8}{grupo['promedio']:>9.1f}"
+              f"{grupo['mediana']:>9.1f}{grupo['min']:>7}{grupo['max']:>7}")
+    if limite is not None and len(grupos) > limite:
+        print(f"  ... y {len(grupos) - limite} más")
+
+
+def mostrar_informe(informe: Dict[str, Any], limite: Optional[int] = GRUPOS_EN_PANTALLA):
+    """Imprime el informe (limite: grupos por desglose; None = todos)."""
+    if not informe["total_libros"]:
+        print("\nNo hay libros registrados para analizar.")
+        return
+
+    paginas = informe["paginas"]
+    print(f"\n📈 ANÁLISIS DEL CATÁLOGO ({informe['total_libros']} libros, calculado con {informe['calculado_con']})\n")
+    print(f"📄 Páginas: mínimo {paginas['min']}, máximo {paginas['max']}, promedio {paginas['promedio']:.2f}")
+    print("   Percentiles: " + ", ".join(f"{q} = {valor:g}" for q, valor in paginas["percentiles"].items()))
+
+    print("\nHistograma de páginas:")
+    mayor = max(barra["cantidad"] for barra in informe["histograma_paginas"])
+    for barra in informe["histograma_paginas"]:
+        largo = round(30 * barra["cantidad"] / mayor) if mayor else 0
+        print(f"  {barra['desde']:>6}-{barra['hasta']:<6} {'█' * largo} {barra['cantidad']}")
+
+    _mostrar_grupos("Por género", informe["por_genero"], limite)
+    _mostrar_grupos("Por autor", informe["por_autor"], limite)
+    _mostrar_grupos("Por año", informe["por_anio"], None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Percentiles, histograma y desgloses de páginas del catálogo")
+    parser.add_argument("--base", default=BASE_PATH, help="Carpeta de datos del árbol de CSV")
+    parser.add_argument("--motor", choices=MOTORES, default=os.environ.get("BIBLIOTECA_MOTOR", "csv").lower())
+    parser.add_argument("--sqlite", default=None, help="Archivo de la base SQLite (por defecto, junto a la carpeta de datos)")
+    parser.add_argument("--barras", type=int, default=BARRAS_HISTOGRAMA, help="Barras del histograma de páginas")
+    parser.add_argument("--mostrar", type=int, default=GRUPOS_EN_PANTALLA, help="Grupos de género y autor en pantalla")
+    parser.add_argument("--json", metavar="RUTA", default=None, help="Guardar el informe en JSON ('-' para stdout)")
+    parser.add_argument("--sin-numpy", action="store_true", help="Calcular con Python puro aunque NumPy esté instalado")
+    args = parser.parse_args()
+    if args.barras < 1:
+        parser.error("--barras debe ser positivo")
+
+    motor = crear_motor(args.motor, args.base, args.sqlite)
+    try:
+        informe = informe_analitico(TablaCatalogo(motor.recorrer(), usar_numpy=not args.sin_numpy), args.barras)
+    except ERRORES_ALMACENAMIENTO as e:
+        print(f"❌ Error del almacenamiento: {e}", file=sys.stderr)
+        return
+    finally:
+        motor.cerrar()
+
+    if args.json == "-":
+        json.dump(informe, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return
+    mostrar_informe(informe, args.mostrar)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(informe, f, ensure_ascii=False, indent=2)
+        print(f"\n📝 Informe guardado en {args.json}")
+
+
+if __name__ == "__main__":
+    main()
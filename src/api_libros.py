@@ -1,12 +1,19 @@
 import requests
-import json
-import unicodedata
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from fsc_guardado import guardar_libro, validar_entrada_libro
-from difflib import SequenceMatcher
+# normalizar_texto y son_similares viven en 'similitud' (se reexportan desde acá)
+from similitud import normalizar_texto, son_similares, rankear
+from cliente_api import API_URL, obtener_cliente # API_URL se reexporta (antes se definía acá)
 
-
-API_URL = "https://www.googleapis.com/books/v1/volumes"
+MAX_RESULTADOS_API = 25 # Resultados por defecto de mostrar_libros_api
+LIMITE_RESULTADOS_API = 400
+UMBRAL_SIMILITUD_API = 0.4 # Más permisivo que en el catálogo: la API ya filtró por la consulta
+# Parámetros fijos de mostrar_libros_api
+FILTROS_BUSQUEDA_API = {
+    "printType": "books",
+    "langRestrict": "es",
+    #"key":"API KEY ACÁ"
+}
 
 
 
@@ -14,16 +21,6 @@ API_URL = "https://www.googleapis.com/books/v1/volumes"
 # UTILIDADES
 # -------------------------------
 
-def son_similares(a: str, b: str, umbral: float = 0.4) -> bool:
-    """
-    Determina si dos cadenas son similares según un umbral (0 a 1).
-    Permite búsquedas tolerantes a errores ortográficos.
-    """
-    a_norm, b_norm = a.lower().strip(), b.lower().strip()
-    similitud = SequenceMatcher(None, a_norm, b_norm).ratio()
-    return similitud >= umbral
-
-
 def limpiar_dato(valor):
     """Evita errores con campos faltantes o vacíos."""
     return valor if valor not in [None, "", " "] else "Desconocido"
@@ -33,68 +30,55 @@ def limpiar_dato(valor):
 # API GOOGLE BOOKS
 # -------------------------------
 
+def libro_de_volumen(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Datos del libro de un volumen de la API, o None si no tiene páginas o año válidos."""
+    info = item.get("volumeInfo", {})
+    try:
+        paginas = int(info.get("pageCount", 0))
+        anio = int(info.get("publishedDate", "0")[:4])
+    except (ValueError, TypeError):
+        return None
+    if paginas <= 0 or anio <= 0:
+        return None
+    return {
+        "genero": limpiar_dato((info.get("categories") or ["General"])[0]),
+        "autor": ", ".join(info.get("authors") or ["Desconocido"]),
+        "anio": anio,
+        "titulo": limpiar_dato(info.get("title")),
+        "paginas": paginas
+    }
+
+
+def candidatos_api(nombre_libro: str, items: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    Libros válidos de los volúmenes con título parecido, de más a menos
+    parecido, en una sola pasada. Si ninguno se parece devuelve todos los
+    válidos en el orden de la API (respaldo). El bool indica si son parecidos.
+    """
+    libros = (libro for libro in map(libro_de_volumen, items) if libro is not None)
+    respaldo: List[Dict[str, Any]] = []
+    similares = rankear(nombre_libro, libros, lambda libro: libro["titulo"], UMBRAL_SIMILITUD_API, descartados=respaldo)
+    if similares:
+        return [libro for libro, _ in similares], True
+    return respaldo, False
+
+
 def obtener_libros_api(nombre_libro: str):
     """
     Consulta la API de Google Books y devuelve una lista de coincidencias válidas.
     Ignora los libros que no tienen páginas o año.
     """
     try:
-        response = requests.get(API_URL, params={"q": nombre_libro, "maxResults": 15})
-        data = response.json()
+        # Sesión compartida (con timeout y reintentos); las búsquedas repetidas salen de la caché
+        data = obtener_cliente().consultar({"q": nombre_libro, "maxResults": 15})
 
         if "items" not in data:
             print("❌ No se encontraron resultados en la API.")
             return []
 
-        resultados_validos = []
-
-        for item in data["items"]:
-            info = item.get("volumeInfo", {})
-            titulo = limpiar_dato(info.get("title"))
-            autor = ", ".join(info.get("authors", ["Desconocido"]))
-            genero = limpiar_dato(info.get("categories", ["General"])[0])
-            paginas = info.get("pageCount", 0)
-            anio = info.get("publishedDate", "0")[:4]
-
-            # Validar campos numéricos
-            try:
-                paginas = int(paginas)
-                anio = int(anio)
-                if paginas <= 0 or anio <= 0:
-                    continue  # Saltar si no tiene datos válidos
-            except (ValueError, TypeError):
-                continue
-
-            # Filtrar por similitud aproximada en título
-            if son_similares(nombre_libro, titulo) or nombre_libro.lower() in titulo.lower():
-                resultados_validos.append({
-                    "genero": genero,
-                    "autor": autor,
-                    "anio": anio,
-                    "titulo": titulo,
-                    "paginas": paginas
-                })
-
-        # Si no hubo coincidencias similares, mostrar las primeras válidas
-        if not resultados_validos:
+        resultados_validos, parecidos = candidatos_api(nombre_libro, data["items"])
+        if not parecidos:
             print("⚠️ No se encontraron coincidencias exactas, mostrando resultados válidos de respaldo.")
-            for item in data["items"]:
-                info = item.get("volumeInfo", {})
-                if "pageCount" in info and "publishedDate" in info:
-                    titulo = info.get("title", "Desconocido")
-                    autor = ", ".join(info.get("authors", ["Desconocido"]))
-                    genero = info.get("categories", ["General"])[0]
-                    paginas = int(info.get("pageCount", 0))
-                    anio = int(info.get("publishedDate", "0")[:4]) if info.get("publishedDate") else 0
-                    if paginas > 0 and anio > 0:
-                        resultados_validos.append({
-                            "genero": genero,
-                            "autor": autor,
-                            "anio": anio,
-                            "titulo": titulo,
-                            "paginas": paginas
-                        })
-
         return resultados_validos
 
     except requests.RequestException as e:
@@ -113,6 +97,7 @@ def buscar_y_guardar_libro(base_path: str):
     nombre_libro = input("Ingresa el libro de la API que quieres guardar: ").strip()
 
     resultados = obtener_libros_api(nombre_libro)
+    print(f"🗄️ Caché de la API: {obtener_cliente().cache.resumen()}")
 
     if not resultados:
         print("No se encontró ningún libro válido con esos datos.")
@@ -146,66 +131,37 @@ def buscar_y_guardar_libro(base_path: str):
 
 
 
-def normalizar_texto(texto: str) -> str:
-    """Elimina acentos y pasa todo a minúsculas."""
-    texto = texto.lower()
-    texto = unicodedata.normalize('NFKD', texto)
-    return ''.join(c for c in texto if not unicodedata.combining(c))
-
-
-
 def mostrar_libros_api(base_path: str = None):
     """
-    Busca libros en la API por género, tema o palabra clave,
-    mostrando hasta 25 resultados reales usando paginación.
+    Busca libros en la API por género, tema o palabra clave, mostrando hasta
+    la cantidad pedida (25 por defecto). Las páginas se piden en paralelo.
     """
     consulta = input("\n🔎 Ingresa un género, autor o palabra clave para buscar libros: ").strip()
     if not consulta:
         print("Búsqueda cancelada.")
         return
 
+    cantidad = input(f"¿Cuántos resultados mostrar? (Enter = {MAX_RESULTADOS_API}, máximo {LIMITE_RESULTADOS_API}): ").strip()
     try:
-        max_resultados = 25
-        resultados = []
-        start_index = 0
+        max_resultados = int(cantidad) if cantidad else MAX_RESULTADOS_API
+        if not 1 <= max_resultados <= LIMITE_RESULTADOS_API:
+            raise ValueError
+    except ValueError:
+        print(f"❌ La cantidad debe ser un número entre 1 y {LIMITE_RESULTADOS_API}.")
+        return
 
+    try:
         print("\nBuscando en la API...")
-
-        while len(resultados) < max_resultados:
-            restante = max_resultados - len(resultados)
-            params = {
-                "q": consulta,
-                "maxResults": min(40, restante),
-                "startIndex": start_index,
-                "printType": "books",
-                "langRestrict": "es",
-                #"key":"API KEY ACÁ"
-            }
-
-            response = requests.get(API_URL, params=params, timeout=5)
-            response.raise_for_status()
-            data = response.json()
-
-            if start_index == 0:
-                print(f"Total de resultados disponibles: {data.get('totalItems', 0)}")
-
-            items = data.get("items", [])
-            if not items:
-                break
-
-            resultados.extend(items)
-            start_index += len(items)
-
-            # Si la API devolvió menos de lo solicitado, no hay más páginas
-            if len(items) < params["maxResults"]:
-                break
+        params = {"q": consulta, **FILTROS_BUSQUEDA_API}
+        resultados, total = obtener_cliente().consultar_paginas(params, max_resultados)
+        print(f"Total de resultados disponibles: {total}")
 
         if not resultados:
             print("❌ No se encontraron libros en la API para esa búsqueda.")
             return
 
         print(f"\n📚 Resultados encontrados para: '{consulta}'\n")
-        for i, item in enumerate(resultados[:max_resultados], start=1):
+        for i, item in enumerate(resultados, start=1):
             info = item.get("volumeInfo", {})
             titulo = info.get("title", "Título desconocido")
             autores = ", ".join(info.get("authors", ["Autor desconocido"]))
@@ -218,6 +174,7 @@ def mostrar_libros_api(base_path: str = None):
             print(f"     Género: {categorias}")
             print(f"     Año: {anio} | Páginas: {paginas}")
             print("---")
+        print(f"🗄️ Caché de la API: {obtener_cliente().cache.resumen()}")
 
     except requests.exceptions.RequestException as e:
         print(f"⚠️ Error al conectar con la API: {e}")
\ No newline at end of file
@@ -0,0 +1,135 @@
+# --- ÁRBOL JERÁRQUICO EN MEMORIA (genero/autor/anio) CON AGREGADOS POR NODO ---
+from typing import List, Dict, Optional, Iterator, Tuple
+
+from fsc_jerarquia import JERARQUIA_NIVELES
+from modelo_libro import Libro
+from almacenamiento import obtener_estructura, niveles_desde_ruta
+from diario_cambios import CambioFila
+
+
+class NodoCatalogo:
+    """
+    Nodo del árbol: la raíz representa toda la biblioteca, luego vienen los
+    niveles de JERARQUIA_NIVELES. Las hojas (anio) equivalen a un items.csv.
+    Cada nodo mantiene la cantidad de libros, el total de páginas y el libro
+    más largo de todo su subárbol.
+    """
+
+    __slots__ = ("nombre", "nivel", "hijos", "libros", "cantidad", "total_paginas", "mas_largo")
+
+    def __init__(self, nombre: str, nivel: Optional[str]):
+        self.nombre = nombre
+        self.nivel = nivel
+        self.hijos: Dict[str, "NodoCatalogo"] = {}
+        self.libros: List[Libro] = [] # Solo se usa en las hojas
+        self.cantidad = 0
+        self.total_paginas = 0
+        self.mas_largo: Optional[Libro] = None
+
+    @property
+    def promedio_paginas(self) -> float:
+        return self.total_paginas / self.cantidad if self.cantidad else 0
+
+    def recorrer_libros(self) -> Iterator[Libro]:
+        """Genera los libros del subárbol (en orden alfabético de carpetas)."""
+        pila = [self]
+        while pila:
+            nodo = pila.pop()
+            yield from nodo.libros
+            pila.extend(nodo.hijos[nombre] for nombre in sorted(nodo.hijos, reverse=True))
+
+    def _recalcular_mas_largo(self):
+        """Recalcula el libro más largo a partir de los hijos (o de los libros si es hoja)."""
+        candidatos = self.libros if not self.hijos else [h.mas_largo for h in self.hijos.values() if h.mas_largo]
+        self.mas_largo = max(candidatos, key=lambda libro: libro.paginas, default=None)
+
+
+class ArbolCatalogo:
+    """Trie que refleja las carpetas genero/autor/anio del catálogo."""
+
+    def __init__(self, libros: List[Libro] = ()):
+        self.raiz = NodoCatalogo("", None)
+        for libro in libros:
+            self.insertar(libro)
+
+    def _camino(self, niveles: Tuple[str, ...], crear: bool = False) -> List[NodoCatalogo]:
+        """Devuelve los nodos desde la raíz hasta el prefijo indicado ([] si no existe)."""
+        camino = [self.raiz]
+        for nivel, nombre in zip(JERARQUIA_NIVELES, niveles):
+            hijo = camino[-1].hijos.get(nombre)
+            if hijo is None:
+                if not crear:
+                    return []
+                hijo = camino[-1].hijos[nombre] = NodoCatalogo(nombre, nivel)
+            camino.append(hijo)
+        return camino
+
+    def insertar(self, libro: Libro):
+        """Agrega un libro actualizando los agregados de su camino: O(profundidad)."""
+        camino = self._camino((libro.genero, libro.autor, libro.anio), crear=True)
+        camino[-1].libros.append(libro)
+        for nodo in camino:
+            nodo.cantidad += 1
+            nodo.total_paginas += libro.paginas
+            if nodo.mas_largo is None or libro.paginas > nodo.mas_largo.paginas:
+                nodo.mas_largo = libro
+
+    def aplicar_cambios_csv(self, ruta_csv: str, cambios: List[CambioFila]):
+        """
+        Aplica los cambios de filas a la hoja de un items.csv y ajusta los
+        agregados del camino: O(cambios + profundidad). El libro más largo de
+        un nodo solo se recalcula si el que tenía fue quitado.
+        """
+        niveles = niveles_desde_ruta(ruta_csv)
+        camino = self._camino((niveles['genero'], niveles['autor'], niveles['anio']), crear=True)
+        hoja = camino[-1]
+
+        quitados: List[Libro] = []
+        agregados: Dict[int, Libro] = {} # id(libro) -> libro: uno agregado y quitado en el mismo lote se cancela
+        for posicion, anterior, nuevo in cambios:
+            if anterior is not None:
+                quitado = hoja.libros[posicion] # El objeto de la hoja (anterior es una copia)
+                if agregados.pop(id(quitado), None) is None:
+                    quitados.append(quitado)
+            if nuevo is None:
+                del hoja.libros[posicion]
+                continue
+            if anterior is None:
+                hoja.libros.insert(posicion, nuevo)
+            else:
+                hoja.libros[posicion] = nuevo
+            agregados[id(nuevo)] = nuevo
+
+        delta_cantidad = len(agregados) - len(quitados)
+        delta_paginas = sum(libro.paginas for libro in agregados.values()) - sum(libro.paginas for libro in quitados)
+        mas_largo_nuevo = max(agregados.values(), key=lambda libro: libro.paginas, default=None)
+        ids_quitados = {id(libro) for libro in quitados}
+
+        # De la hoja a la raíz: ajustar totales, el máximo y podar vacíos
+        for profundidad in range(len(camino) - 1, -1, -1):
+            nodo = camino[profundidad]
+            nodo.cantidad += delta_cantidad
+            nodo.total_paginas += delta_paginas
+            if nodo.mas_largo is not None and id(nodo.mas_largo) in ids_quitados:
+                nodo._recalcular_mas_largo() # Los hijos ya están al día
+            elif mas_largo_nuevo is not None and (nodo.mas_largo is None or mas_largo_nuevo.paginas > nodo.mas_largo.paginas):
+                nodo.mas_largo = mas_largo_nuevo
+            if profundidad and nodo.cantidad == 0:
+                del camino[profundidad - 1].hijos[nodo.nombre]
+
+    # --- Consultas por subárbol: O(profundidad + resultado) ---
+
+    def nodo(self, *niveles: str) -> Optional[NodoCatalogo]:
+        """Nodo de un prefijo de la jerarquía, ej. nodo('Ficcion', 'Borges')."""
+        camino = self._camino(niveles)
+        return camino[-1] if camino else None
+
+    def libros_de(self, *niveles: str) -> List[Libro]:
+        """Todos los libros bajo un prefijo (un género, un autor, un año de un autor...)."""
+        nodo = self.nodo(*niveles)
+        return list(nodo.recorrer_libros()) if nodo else []
+
+
+def obtener_arbol(base_path: str) -> ArbolCatalogo:
+    """Árbol del catálogo de base_path, construido una vez y mantenido al día por CSV."""
+    return obtener_estructura(base_path, "arbol", ArbolCatalogo)
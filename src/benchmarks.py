@@ -0,0 +1,717 @@
+# --- MEDICIONES DE RENDIMIENTO (no forman parte del menú) ---
+# Uso: python src/benchmarks.py <medicion> [--archivos N]
+import os
+import csv
+import json
+import time
+import shutil
+import tempfile
+import argparse
+import tracemalloc
+from typing import Callable, Dict, Any
+
+from fsc_jerarquia import CSV_HEADERS
+import almacenamiento
+
+
+def generar_arbol_sintetico(base_path: str, n_archivos: int, libros_por_csv: int = 5) -> int:
+    """Crea un árbol genero/autor/anio/items.csv con n_archivos hojas. Devuelve el total de libros."""
+    total = 0
+    for i in range(n_archivos):
+        genero = f"Genero {i % 20:02d}"
+        autor = f"Autor {i % 500:03d}"
+        anio = str(1900 + (i // 500) % 120)
+        ruta_dir = os.path.join(base_path, genero, autor, anio)
+        os.makedirs(ruta_dir, exist_ok=True)
+        with open(os.path.join(ruta_dir, "items.csv"), "a", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            if f.tell() == 0:
+                writer.writerow(CSV_HEADERS)
+            for j in range(libros_por_csv):
+                writer.writerow([f"Libro {i}-{j}", 50 + (i * 7 + j * 13) % 900])
+                total += 1
+    return total
+
+
+def vaciar_cache_so() -> bool:
+    """Vacía la caché de páginas del SO (solo Linux y con permisos de root)."""
+    try:
+        os.sync()
+        with open("/proc/sys/vm/drop_caches", "w") as f:
+            f.write("3\n")
+        return True
+    except OSError:
+        return False
+
+
+def _medir(nombre: str, funcion: Callable[[], Any], repeticiones: int = 3, en_frio: bool = False) -> float:
+    """Ejecuta la función varias veces y muestra el mejor tiempo."""
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        if en_frio:
+            vaciar_cache_so()
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    print(f"  {nombre:<45} {mejor * 1000:10.1f} ms")
+    return mejor
+
+
+def bench_escaneo(n_archivos: int):
+    """Compara la lectura recursiva original con el motor iterativo (os.scandir + hilos)."""
+    tmp = tempfile.mkdtemp()
+    base = os.path.join(tmp, "data")
+    try:
+        total = generar_arbol_sintetico(base, n_archivos)
+        print(f"\nÁrbol sintético: {n_archivos} items.csv, {total} libros")
+
+        esperado = almacenamiento.consolidar_libros_recursivamente(base, [])
+        assert almacenamiento.escanear_catalogo(base) == esperado, "El motor iterativo difiere del recursivo"
+
+        for en_frio in (False, True):
+            if en_frio and not vaciar_cache_so():
+                print("  (caché fría omitida: se necesita Linux y permisos de root)")
+                break
+            print("  -- caché fría --" if en_frio else "  -- caché caliente --")
+            t_rec = _medir("consolidar_libros_recursivamente", lambda: almacenamiento.consolidar_libros_recursivamente(base, []), en_frio=en_frio)
+            t_uno = _medir("escanear_catalogo (1 hilo)", lambda: almacenamiento.escanear_catalogo(base, hilos=1), en_frio=en_frio)
+            t_hilos = _medir(f"escanear_catalogo ({almacenamiento.HILOS_ESCANEO} hilos)", lambda: almacenamiento.escanear_catalogo(base), en_frio=en_frio)
+            print(f"  Aceleración: x{t_rec / t_uno:.2f} (1 hilo), x{t_rec / t_hilos:.2f} (pool)")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def bench_procesos(n_archivos: int):
+    """Compara el escaneo con hilos contra el escaneo multiproceso repartido por género."""
+    tmp = tempfile.mkdtemp()
+    base = os.path.join(tmp, "data")
+    try:
+        total = generar_arbol_sintetico(base, n_archivos)
+        procesos = max(2, almacenamiento.PROCESOS_ESCANEO)
+        print(f"\nÁrbol sintético: {n_archivos} items.csv, {total} libros ({procesos} procesos)")
+
+        esperado = almacenamiento.escanear_catalogo(base)
+        assert almacenamiento.escanear_catalogo_procesos(base, procesos) == esperado, "El modo multiproceso difiere"
+
+        t_hilos = _medir("escanear_catalogo (hilos)", lambda: almacenamiento.escanear_catalogo(base))
+        t_proc = _medir("escanear_catalogo_procesos", lambda: almacenamiento.escanear_catalogo_procesos(base, procesos))
+        print(f"  Aceleración: x{t_hilos / t_proc:.2f}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _memoria_de(construir: Callable[[], Any]) -> int:
+    """Bytes que quedan asignados tras construir la estructura (tracemalloc)."""
+    tracemalloc.start()
+    estructura = construir()
+    memoria, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del estructura
+    return memoria
+
+
+def bench_memoria(n_archivos: int):
+    """Compara la memoria de la lista de diccionarios original contra la lista de Libro."""
+    tmp = tempfile.mkdtemp()
+    base = os.path.join(tmp, "data")
+    try:
+        total = generar_arbol_sintetico(base, n_archivos)
+        rutas = list(almacenamiento.recorrer_items_csv(base))
+        filas = {ruta: almacenamiento._leer_filas_csv(ruta) for ruta in rutas}
+        print(f"\nÁrbol sintético: {n_archivos} items.csv, {total} libros")
+
+        def como_diccionarios():
+            # El patrón de datos original: un dict de 7 claves por libro
+            lista = []
+            for ruta_csv in rutas:
+                niveles = almacenamiento.niveles_desde_ruta(ruta_csv)
+                for titulo, paginas in filas[ruta_csv]:
+                    lista.append({
+                        "genero": niveles['genero'], "autor": niveles['autor'], "anio": niveles['anio'],
+                        "titulo": titulo, "paginas": paginas,
+                        "id": f"{niveles['genero']}/{niveles['autor']}/{titulo}", "ruta_csv": ruta_csv,
+                    })
+            return lista
+
+        def como_libros():
+            lista = []
+            for ruta_csv in rutas:
+                lista.extend(almacenamiento._filas_a_libros(ruta_csv, almacenamiento.niveles_desde_ruta(ruta_csv), filas[ruta_csv]))
+            return lista
+
+        m_dict = _memoria_de(como_diccionarios)
+        m_libro = _memoria_de(como_libros)
+        print(f"  {'list[dict]':<45} {m_dict / 2**20:8.2f} MiB ({m_dict / total:6.1f} B/libro)")
+        print(f"  {'list[Libro] (__slots__ + str internados)':<45} {m_libro / 2**20:8.2f} MiB ({m_libro / total:6.1f} B/libro)")
+        print(f"  Reducción: {100 * (1 - m_libro / m_dict):.1f}%")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def bench_busqueda(n_archivos: int):
+    """Compara el filtro lineal con son_similares contra el índice de trigramas."""
+    from difflib import SequenceMatcher
+    from similitud import normalizar_texto
+    from indice_busqueda import IndiceBusqueda
+
+    tmp = tempfile.mkdtemp()
+    base = os.path.join(tmp, "data")
+    try:
+        total = generar_arbol_sintetico(base, n_archivos)
+        libros = almacenamiento.escanear_catalogo(base)
+        print(f"\nÁrbol sintético: {n_archivos} items.csv, {total} libros")
+
+        normalizar_sin_cache = normalizar_texto.__wrapped__
+
+        def filtro_original(consulta: str):
+            # Lo que hacía mostrar_libros: normalizar ambos textos y SequenceMatcher por fila
+            resultado = []
+            for libro in libros:
+                a, b = normalizar_sin_cache(consulta), normalizar_sin_cache(libro.titulo)
+                if a in b or b in a or SequenceMatcher(None, a, b).ratio() >= 0.6:
+                    resultado.append(libro)
+            return resultado
+
+        inicio = time.perf_counter()
+        indice = IndiceBusqueda(libros)
+        print(f"  {'construcción del índice':<45} {(time.perf_counter() - inicio) * 1000:10.1f} ms")
+
+        for consulta in ("Libro 1234-3", "libro 99", "Lbro 4321-0"):
+            encontrados = indice.buscar("titulo", consulta)
+            esperados = {l.id for l in filtro_original(consulta)}
+            assert all(l.id in esperados for l, _ in encontrados), "El índice devolvió un libro que no cumple el criterio"
+            print(f"  consulta '{consulta}': {len(esperados)} coincidencias lineales, top {len(encontrados)} del índice")
+            t_lineal = _medir("  filtro lineal (son_similares)", lambda: filtro_original(consulta), repeticiones=1)
+            t_indice = _medir("  índice de trigramas (top 20)", lambda: indice.buscar("titulo", consulta))
+            print(f"  Aceleración: x{t_lineal / t_indice:.1f}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def bench_orden(n_archivos: int):
+    """Compara ordenar todo el catálogo contra los índices mantenidos y el top-N con heap."""
+    from indices_orden import IndicesOrden, top_n
+
+    tmp = tempfile.mkdtemp()
+    base = os.path.join(tmp, "data")
+    try:
+        total = generar_arbol_sintetico(base, n_archivos)
+        libros = almacenamiento.escanear_catalogo(base)
+        print(f"\nÁrbol sintético: {n_archivos} items.csv, {total} libros")
+
+        inicio = time.perf_counter()
+        indices = IndicesOrden(libros)
+        print(f"  {'construcción de los índices':<45} {(time.perf_counter() - inicio) * 1000:10.1f} ms")
+
+        criterios = [("paginas", True)]
+        esperado = [l.paginas for l in sorted(libros, key=lambda l: l.paginas, reverse=True)[:20]]
+        assert [l.paginas for l in indices.primeros(criterios, 20)] == esperado
+        assert [l.paginas for l in top_n(libros, 20, criterios)] == esperado
+
+        print("  -- los 20 libros más largos --")
+        t_sort = _medir("sorted() de todo el catálogo", lambda: sorted(libros, key=lambda l: int(l["paginas"]), reverse=True)[:20])
+        _medir("top_n con heap", lambda: top_n(libros, 20, criterios))
+        t_indice = _medir("índice mantenido", lambda: indices.primeros(criterios, 20))
+        print(f"  Aceleración: x{t_sort / t_indice:.0f}")
+
+        print("  -- orden completo año + título --")
+        _medir("sorted() multi-clave", lambda: sorted(libros, key=lambda l: (l.anio_num, l.titulo.lower())))
+        _medir("índice mantenido", lambda: list(indices.ordenar([("anio", False), ("titulo", False)])))
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def bench_diario(n_archivos: int):
+    """Compara editar un items.csv grande reescribiéndolo entero contra agregar al diario de cambios."""
+    from diario_cambios import operacion_modificacion
+
+    tmp = tempfile.mkdtemp()
+    base = os.path.join(tmp, "data")
+    try:
+        total = generar_arbol_sintetico(base, n_archivos)
+        # Un año con muchos libros: el peor caso de la reescritura completa
+        ruta_grande = os.path.join(base, "Genero Grande", "Autor Prolífico", "2000", "items.csv")
+        os.makedirs(os.path.dirname(ruta_grande))
+        filas = [(f"Tomo {i}", 100 + i % 700) for i in range(50000)]
+        with open(ruta_grande, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_HEADERS)
+            writer.writerows(filas)
+        almacenamiento.cargar_catalogo(base)
+        print(f"\nÁrbol sintético: {n_archivos} items.csv, {total} libros + un items.csv de {len(filas)} libros")
+
+        ediciones = 100
+        almacenamiento.UMBRAL_COMPACTACION = ediciones + 1 # La compactación se mide aparte
+
+        def reescribiendo():
+            for i in range(ediciones):
+                filas[i] = (f"Tomo {i} (rev)", filas[i][1])
+                almacenamiento.reescribir_csv(ruta_grande, filas)
+
+        def con_diario():
+            for i in range(ediciones):
+                fila = filas[i]
+                filas[i] = (f"Tomo {i} (rev2)", fila[1])
+                almacenamiento.registrar_cambio(ruta_grande, operacion_modificacion(i, fila, *filas[i]))
+
+        print(f"  -- {ediciones} modificaciones en el items.csv grande --")
+        t_total = _medir("reescritura completa (temporal + replace)", reescribiendo, repeticiones=1)
+        t_diario = _medir("diario de cambios (append + fsync)", con_diario, repeticiones=1)
+        print(f"  Por edición: {t_total / ediciones * 1000:.2f} ms vs {t_diario / ediciones * 1000:.2f} ms (x{t_total / t_diario:.0f})")
+        _medir("compactación del diario", lambda: almacenamiento.compactar_diario(base), repeticiones=1)
+
+        assert almacenamiento._leer_filas_csv(ruta_grande) == filas, "La compactación no coincide con las ediciones"
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+# Cada escritor de la prueba de concurrencia reparte sus operaciones entre estas hojas
+HOJAS_CONCURRENCIA = 4
+OPERACIONES_POR_ESCRITOR = 300
+
+
+def _hojas_concurrencia(base: str):
+    return [os.path.join(base, "Concurrencia", f"Autor {i}", "2000", "items.csv") for i in range(HOJAS_CONCURRENCIA)]
+
+
+def _escritor_con_bloqueos(base: str, numero: int, barrera) -> float:
+    """
+    Proceso escritor: altas por el diario, altas masivas (agregar_filas_csv) y
+    modificaciones de sus propias filas, con compactaciones frecuentes de por medio.
+    """
+    from diario_cambios import operacion_alta, operacion_modificacion
+
+    almacenamiento.UMBRAL_COMPACTACION = 100
+    hojas = _hojas_concurrencia(base)
+    pendientes_de_modificar = []
+    barrera.wait()
+    inicio = time.perf_counter()
+
+    for i in range(OPERACIONES_POR_ESCRITOR):
+        ruta_csv = hojas[i % len(hojas)]
+        titulo = f"e{numero}-{i}"
+        if i % 10 == 9:
+            ruta_mod, titulo_mod = pendientes_de_modificar.pop(0)
+            filas = [(libro.titulo, libro.paginas) for libro in almacenamiento.leer_items_csv(ruta_mod)]
+            fila = filas.index((titulo_mod, 1))
+            almacenamiento.registrar_cambio(ruta_mod, operacion_modificacion(fila, (titulo_mod, 1), titulo_mod + "*", 1))
+            continue
+        if i % 5 == 4:
+            almacenamiento.agregar_filas_csv(ruta_csv, [(titulo, 1)])
+        else:
+            almacenamiento.registrar_cambio(ruta_csv, operacion_alta(titulo, 1))
+        if i % 10 == 0:
+            pendientes_de_modificar.append((ruta_csv, titulo))
+
+    return time.perf_counter() - inicio
+
+
+def _escritor_sin_bloqueos(base: str, numero: int, barrera) -> float:
+    """Proceso escritor con el esquema original: leer el items.csv, agregar la fila y reescribirlo."""
+    hojas = _hojas_concurrencia(base)
+    barrera.wait()
+    inicio = time.perf_counter()
+    for i in range(OPERACIONES_POR_ESCRITOR):
+        ruta_csv = hojas[i % len(hojas)]
+        filas = almacenamiento._leer_filas_csv(ruta_csv) + [(f"e{numero}-{i}", 1)]
+        with open(ruta_csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_HEADERS)
+            writer.writerows(filas)
+    return time.perf_counter() - inicio
+
+
+def _titulos_esperados(escritores: int, con_modificaciones: bool) -> list:
+    esperados = []
+    for numero in range(escritores):
+        pendientes = []
+        titulos = {}
+        for i in range(OPERACIONES_POR_ESCRITOR):
+            if con_modificaciones and i % 10 == 9:
+                titulos[pendientes.pop(0)] += "*"
+                continue
+            titulos[i] = f"e{numero}-{i}"
+            if i % 10 == 0:
+                pendientes.append(i)
+        esperados.extend(titulos.values())
+    return sorted(esperados)
+
+
+def bench_concurrencia(n_archivos: int):
+    """
+    Prueba de estrés multiproceso: varios escritores sobre las mismas hojas.
+    Verifica que no se pierdan escrituras y mide el rendimiento al sumar escritores.
+    """
+    import multiprocessing
+
+    contexto = multiprocessing.get_context("spawn")
+    print(f"\n{OPERACIONES_POR_ESCRITOR} operaciones por escritor sobre {HOJAS_CONCURRENCIA} items.csv compartidos")
+
+    for nombre, escritor, con_modificaciones in (
+        ("sin bloqueos (leer + reescribir)", _escritor_sin_bloqueos, False),
+        ("con bloqueos + diario", _escritor_con_bloqueos, True),
+    ):
+        print(f"  -- {nombre} --")
+        for escritores in (1, 2, 4, 8):
+            tmp = tempfile.mkdtemp()
+            base = os.path.join(tmp, "data")
+            try:
+                generar_arbol_sintetico(base, n_archivos)
+                for ruta_csv in _hojas_concurrencia(base):
+                    os.makedirs(os.path.dirname(ruta_csv))
+                    with open(ruta_csv, "w", newline="", encoding="utf-8") as f:
+                        csv.writer(f).writerow(CSV_HEADERS)
+
+                with contexto.Manager() as manager, contexto.Pool(escritores) as pool:
+                    barrera = manager.Barrier(escritores)
+                    tiempos = pool.starmap(escritor, [(base, numero, barrera) for numero in range(escritores)])
+
+                almacenamiento.compactar_diario(base)
+                titulos = sorted(
+                    titulo for ruta_csv in _hojas_concurrencia(base)
+                    for titulo, _ in almacenamiento._leer_filas_csv(ruta_csv)
+                )
+                esperados = _titulos_esperados(escritores, con_modificaciones)
+                perdidas = len(esperados) - len(titulos)
+                estado = "sin pérdidas" if titulos == esperados else f"{perdidas} escrituras perdidas"
+                operaciones = escritores * OPERACIONES_POR_ESCRITOR
+                print(f"  {escritores} escritor(es): {operaciones / max(tiempos):8.0f} ops/s  ({estado})")
+            finally:
+                shutil.rmtree(tmp, ignore_errors=True)
+
+
+def bench_motores(n_archivos: int):
+    """Compara el motor de árbol de CSV con el motor SQLite en las operaciones de la interfaz."""
+    from motores_almacenamiento import MotorCSV, MotorSQLite
+    from migrar_almacenamiento import migrar
+
+    tmp = tempfile.mkdtemp()
+    base = os.path.join(tmp, "data")
+    try:
+        total = generar_arbol_sintetico(base, n_archivos)
+        print(f"\nÁrbol sintético: {n_archivos} items.csv, {total} libros")
+        motor_csv = MotorCSV(base)
+        motor_sqlite = MotorSQLite(os.path.join(tmp, "biblioteca.sqlite3"))
+        _medir("migración CSV -> SQLite", lambda: migrar(motor_csv, motor_sqlite), repeticiones=1)
+        # Primera consulta del motor CSV: arma en memoria los índices que después mantiene
+        _medir("CSV: armado de índices (primera consulta)", lambda: (
+            motor_csv.obtener_por_id("x"), motor_csv.ordenar([("paginas", True)], 1), motor_csv.agregados()
+        ), repeticiones=1)
+
+        ids = [f"Genero {i % 20:02d}/Autor {i % 500:03d}/Libro {i}-0" for i in range(0, n_archivos, max(1, n_archivos // 20))]
+        criterios = [("paginas", True), ("titulo", False)]
+        rango = dict(anio_min=1950, anio_max=1955, paginas_min=100, paginas_max=200)
+        assert [l.titulo for l in motor_csv.ordenar(criterios, 20)] == [l.titulo for l in motor_sqlite.ordenar(criterios, 20)]
+        assert len(motor_csv.consultar(**rango)) == len(motor_sqlite.consultar(**rango))
+
+        for motor in (motor_csv, motor_sqlite):
+            print(f"  -- motor {motor.nombre} --")
+            _medir("recorrido completo", lambda: sum(1 for _ in motor.recorrer()))
+            _medir(f"{len(ids)} búsquedas por id", lambda: [motor.obtener_por_id(id_libro) for id_libro in ids])
+            _medir("agregados (estadísticas)", motor.agregados)
+            _medir("los 20 más largos", lambda: motor.ordenar(criterios, 20))
+            _medir("consulta por rango año + páginas", lambda: motor.consultar(**rango))
+
+            def altas_modificaciones_bajas():
+                for i in range(100):
+                    motor.insertar({"genero": "Genero 00", "autor": "Autor 000", "anio": 1900, "titulo": f"Nuevo {i}", "paginas": 10})
+                for libro in motor.obtener_por_id("Genero 00/Autor 000/Nuevo 0") + motor.ordenar([("paginas", False)], 99):
+                    motor.actualizar(libro, libro.titulo + " (rev)", libro.paginas)
+                for libro in motor.consultar(genero="Genero 00", autor="Autor 000", paginas_max=10):
+                    motor.eliminar(libro)
+
+            _medir("100 altas + 100 modificaciones + 100 bajas", altas_modificaciones_bajas, repeticiones=1)
+        motor_sqlite.cerrar()
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def bench_instantanea(n_archivos: int):
+    """Compara arrancar sin caché, con el manifiesto JSON y con la instantánea binaria (mmap)."""
+    from instantanea_catalogo import abrir_instantanea
+
+    tmp = tempfile.mkdtemp()
+    base = os.path.join(tmp, "data")
+    try:
+        total = generar_arbol_sintetico(base, n_archivos)
+        print(f"\nÁrbol sintético: {n_archivos} items.csv, {total} libros")
+        almacenamiento.cargar_catalogo(base)
+        ruta_json = almacenamiento.ruta_manifiesto(base)
+        ruta_bin, _ = almacenamiento.exportar_instantanea(base)
+        print(f"  manifiesto JSON: {os.path.getsize(ruta_json) / 1e6:.1f} MB | instantánea: {os.path.getsize(ruta_bin) / 1e6:.1f} MB")
+        os.rename(ruta_bin, ruta_bin + ".guardada")
+
+        def arranque(usar_json: bool, usar_instantanea: bool) -> Callable[[], Any]:
+            """Simula un proceso nuevo: sin manifiesto en memoria y solo con las cachés pedidas en disco."""
+            def preparar_y_cargar():
+                almacenamiento._manifiestos_en_memoria.clear()
+                if not usar_json and os.path.exists(ruta_json):
+                    os.remove(ruta_json)
+                if usar_instantanea:
+                    shutil.copyfile(ruta_bin + ".guardada", ruta_bin) # Más nueva que el JSON
+                elif os.path.exists(ruta_bin):
+                    os.remove(ruta_bin)
+                return almacenamiento.cargar_catalogo(base)
+            return preparar_y_cargar
+
+        print("  -- cargar_catalogo en un proceso nuevo --")
+        t_csv = _medir("sin caché (parsea todos los items.csv)", arranque(False, False))
+        shutil.copyfile(ruta_bin + ".guardada", ruta_bin)
+        almacenamiento._manifiestos_en_memoria.clear()
+        almacenamiento.cargar_catalogo(base) # Deja un manifiesto JSON
+        os.remove(ruta_bin)
+        json_guardado = open(ruta_json, "rb").read()
+
+        def con_json():
+            with open(ruta_json, "wb") as f:
+                f.write(json_guardado)
+            return arranque(True, False)()
+
+        _medir("manifiesto JSON", con_json)
+        t_bin = _medir("instantánea binaria", arranque(False, True))
+        print(f"  Aceleración contra el recorrido de CSV: x{t_csv / t_bin:.1f}")
+
+        print("  -- solo leer la caché (sin revalidar el árbol) --")
+        _medir("json.load del manifiesto", lambda: json.loads(json_guardado))
+        _medir("abrir la instantánea (mmap)", lambda: abrir_instantanea(ruta_bin + ".guardada"))
+        _medir("todos los libros desde la instantánea", lambda: list(abrir_instantanea(ruta_bin + ".guardada").libros(base)))
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def bench_sesion(n_archivos: int):
+    """Repite mostrar / estadísticas / ordenar en una sesión: recorriendo el árbol cada vez o en caliente."""
+    from motores_almacenamiento import MotorCSV
+    from registro_cambios import RegistroCambios
+
+    tmp = tempfile.mkdtemp()
+    base = os.path.join(tmp, "data")
+    intervalo = almacenamiento.INTERVALO_REVISION_COMPLETA
+    try:
+        total = generar_arbol_sintetico(base, n_archivos)
+        print(f"\nÁrbol sintético: {n_archivos} items.csv, {total} libros")
+        motor = MotorCSV(base)
+        _medir("abrir la sesión (recorrido completo)", motor.abrir, repeticiones=1)
+        motor.agregados(), motor.ordenar([("paginas", True)], 1) # Arma las estructuras
+
+        acciones = {
+            "mostrar (recorrer todo)": lambda: sum(1 for _ in motor.recorrer()),
+            "estadísticas": motor.agregados,
+            "ordenar (los 20 más largos)": lambda: motor.ordenar([("paginas", True)], 20),
+        }
+        for nombre, accion in acciones.items():
+            print(f"  -- {nombre} --")
+            almacenamiento.INTERVALO_REVISION_COMPLETA = 0 # Cada acción vuelve a recorrer el árbol
+            t_arbol = _medir("recorriendo el árbol", accion)
+            almacenamiento.INTERVALO_REVISION_COMPLETA = intervalo
+            t_caliente = _medir("en caliente", accion)
+            print(f"  Aceleración: x{t_arbol / t_caliente:.1f}")
+
+        # Otro proceso reescribe un items.csv y lo anota: solo se relee ese
+        ruta_csv = os.path.join(base, "Genero 00", "Autor 000", "1900", "items.csv")
+        registro_ajeno = RegistroCambios(almacenamiento.ruta_registro_cambios(base))
+
+        def cambio_ajeno_y_estadisticas():
+            with open(ruta_csv, "a", newline="", encoding="utf-8") as f:
+                csv.writer(f).writerow(["Libro externo", 10])
+            registro_ajeno.anotar([os.path.relpath(ruta_csv, base)])
+            return motor.agregados()
+
+        print("  -- tras un cambio de otro proceso --")
+        _medir("estadísticas (relee un items.csv)", cambio_ajeno_y_estadisticas)
+    finally:
+        almacenamiento.INTERVALO_REVISION_COMPLETA = intervalo
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def bench_candidatos_api(n_volumenes: int):
+    """Compara el filtrado original de obtener_libros_api con el ranking de una pasada (candidatos_api)."""
+    import random
+    from difflib import SequenceMatcher
+    from api_libros import candidatos_api, limpiar_dato
+
+    azar = random.Random(0)
+    silabas = ["ra", "me", "lo", "ta", "so", "ción", "man", "te", "ri", "bel", "cu", "ña", "pre", "dor", "vi", "es"]
+    palabras = ["".join(azar.choice(silabas) for _ in range(azar.randrange(2, 5))) for _ in range(3000)]
+    # Como lo que devuelve la API: un tercio de títulos con la búsqueda (varias ediciones) y el resto otros libros
+    conocidos = ["La sombra del viento", "Cien años de soledad", "Cien años de soledad (edición conmemorativa)",
+                 "El juego del ángel", "La sombra del viento. Edición ilustrada"]
+
+    def titulo() -> str:
+        if azar.random() < 0.33:
+            return azar.choice(conocidos)
+        return " ".join(azar.choice(palabras) for _ in range(azar.randrange(2, 7))).capitalize()
+
+    items = [{
+        "id": str(i),
+        "volumeInfo": {
+            "title": titulo(),
+            "authors": [f"Autor {azar.randrange(500)}"],
+            "categories": [f"Genero {azar.randrange(20)}"],
+            "pageCount": azar.randrange(0, 900), # Algunos sin páginas: se descartan
+            "publishedDate": str(azar.randrange(1900, 2024)),
+        },
+    } for i in range(n_volumenes)]
+    print(f"\nResultados grabados sintéticos: {n_volumenes} volúmenes")
+
+    def filtrado_original(nombre_libro: str):
+        # Lo que hacía obtener_libros_api: SequenceMatcher por volumen y otra pasada de respaldo
+        resultados = []
+        for item in items:
+            info = item.get("volumeInfo", {})
+            titulo = limpiar_dato(info.get("title"))
+            try:
+                paginas, anio = int(info.get("pageCount", 0)), int(info.get("publishedDate", "0")[:4])
+            except (ValueError, TypeError):
+                continue
+            if paginas <= 0 or anio <= 0:
+                continue
+            a, b = nombre_libro.lower().strip(), titulo.lower().strip()
+            if SequenceMatcher(None, a, b).ratio() >= 0.4 or a in b:
+                resultados.append(titulo)
+        if not resultados:
+            for item in items:
+                info = item.get("volumeInfo", {})
+                if int(info.get("pageCount", 0)) > 0:
+                    resultados.append(info.get("title"))
+        return resultados
+
+    for consulta in ("la sombra del viento", "cien anos de soledad", "sonbra del bientto"):
+        similares, parecidos = candidatos_api(consulta, items)
+        print(f"  consulta '{consulta}': {len(filtrado_original(consulta))} originales, "
+              f"{len(similares)} {'parecidos' if parecidos else 'de respaldo'} en una pasada")
+        t_original = _medir("  SequenceMatcher por volumen", lambda: filtrado_original(consulta))
+        t_ranking = _medir("  ranking con prefiltro (candidatos_api)", lambda: candidatos_api(consulta, items))
+        print(f"  Aceleración: x{t_original / t_ranking:.1f}")
+
+
+def bench_duplicados(n_archivos: int):
+    """Busca duplicados sembrados en catálogos variados de distinto tamaño (cubetas contra todos los pares)."""
+    import random
+    import itertools
+    from difflib import SequenceMatcher
+    from duplicados import buscar_duplicados, clave_normalizada, UMBRAL_TITULO, UMBRAL_AUTOR
+    from modelo_libro import Libro
+
+    azar = random.Random(0)
+    consonantes = ["", "b", "c", "d", "f", "g", "l", "m", "n", "p", "r", "s", "t", "v", "ch", "ll", "br", "tr", "pl", "gr"]
+    silabas = [c + v + k for c in consonantes for v in ("a", "e", "i", "o", "u", "á", "é", "ó", "ia", "ue") for k in ("", "", "n", "s", "r")]
+
+    def palabra() -> str:
+        return "".join(azar.choice(silabas) for _ in range(azar.randrange(1, 4)))
+
+    # Como en un catálogo real: pocas palabras muy comunes y muchas raras (Zipf)
+    palabras = [palabra() for _ in range(60000)]
+    nombres, apellidos = [palabra().capitalize() for _ in range(3000)], [palabra().capitalize() for _ in range(30000)]
+
+    pesos = list(itertools.accumulate(1 / (rango + 10) for rango in range(len(palabras))))
+
+    def variante(texto: str) -> str:
+        # Lo que deja guardar_libro: mayúsculas, acentos y alguna letra distinta
+        cambio = azar.randrange(3)
+        if cambio == 0:
+            return texto.upper()
+        if cambio == 1:
+            return texto.replace("ó", "o").replace("á", "a").replace("é", "e")
+        i = azar.randrange(len(texto))
+        return texto[:i] + azar.choice("aeiou") + texto[i + 1:]
+
+    def catalogo(n_libros: int):
+        azar.shuffle(palabras)
+        autores = [f"{azar.choice(nombres)} {azar.choice(apellidos)}" for _ in range(max(1, n_libros // 10))]
+        libros, sembrados = [], 0
+        for i in range(n_libros):
+            titulo = " ".join(azar.choices(palabras, cum_weights=pesos, k=azar.randrange(1, 6))).capitalize()
+            autor = azar.choice(autores)
+            libros.append(Libro(f"Genero {i % 20:02d}", autor, str(1900 + i % 120), titulo, 100 + i % 800, "x"))
+            if azar.random() < 0.02:
+                libros.append(Libro("Otro genero", variante(autor), str(1900 + i % 120), variante(titulo), 100, "x"))
+                sembrados += 1
+        return libros, sembrados
+
+    print()
+    for n_libros in (n_archivos * 5 // 4, n_archivos * 5 // 2, n_archivos * 5):
+        libros, sembrados = catalogo(n_libros)
+        inicio = time.perf_counter()
+        grupos = buscar_duplicados(libros)
+        duracion = time.perf_counter() - inicio
+        encontrados = sum(1 for grupo in grupos if any(libro.genero == "Otro genero" for libro in grupo))
+        print(f"  {len(libros):>7} libros: {duracion * 1000:9.1f} ms ({duracion / len(libros) * 1e6:5.1f} µs/libro), "
+              f"{len(grupos)} grupos, {encontrados} de {sembrados} sembrados")
+
+    muestra = libros[:500]
+    claves = [(clave_normalizada(l.titulo), clave_normalizada(l.autor)) for l in muestra]
+
+    def todos_los_pares():
+        return sum(1 for i in range(len(claves)) for j in range(i + 1, len(claves))
+                   if SequenceMatcher(None, claves[i][1], claves[j][1]).ratio() >= UMBRAL_AUTOR
+                   and SequenceMatcher(None, claves[i][0], claves[j][0]).ratio() >= UMBRAL_TITULO)
+
+    t_pares = _medir(f"todos los pares ({len(muestra)} libros)", todos_los_pares, repeticiones=1)
+    estimado = t_pares * (len(libros) / len(muestra)) ** 2
+    print(f"  todos los pares para {len(libros)} libros: ~{estimado:.0f} s estimados (x{estimado / duracion:.0f})")
+
+
+def bench_analitica(n_archivos: int):
+    """Compara el informe de analitica_catalogo con NumPy, en Python puro y con diccionarios por libro."""
+    import random
+    from modelo_libro import Libro
+    import analitica_catalogo
+
+    azar = random.Random(0)
+    libros = [Libro(f"Genero {azar.randrange(20):02d}", f"Autor {azar.randrange(n_archivos // 4 + 1)}",
+                    str(azar.randrange(1900, 2024)), f"Libro {i}", azar.randrange(20, 1500), "")
+              for i in range(n_archivos * 5)]
+    print(f"\nCatálogo sintético en memoria: {len(libros)} libros")
+
+    def con_diccionarios():
+        # Lo que haría un bucle sobre el patrón de datos: un dict por libro y listas por grupo
+        filas = [dict(libro) for libro in libros]
+        paginas = sorted(fila["paginas"] for fila in filas)
+        grupos = {}
+        for campo in ("genero", "autor", "anio"):
+            por_clave = {}
+            for fila in filas:
+                por_clave.setdefault(fila[campo], []).append(fila["paginas"])
+            grupos[campo] = {clave: (len(v), sum(v), sorted(v)[len(v) // 2], min(v), max(v)) for clave, v in por_clave.items()}
+        return paginas, grupos
+
+    _medir("diccionarios por libro", con_diccionarios)
+    tabla_python = analitica_catalogo.TablaCatalogo(libros, usar_numpy=False)
+    _medir("cargar las columnas", lambda: analitica_catalogo.TablaCatalogo(libros, usar_numpy=False))
+    t_python = _medir("informe en Python puro", lambda: analitica_catalogo.informe_analitico(tabla_python))
+    if analitica_catalogo.np is None:
+        print("  (NumPy no está instalado: solo se mide el respaldo en Python)")
+        return
+    tabla_numpy = analitica_catalogo.TablaCatalogo(libros)
+    t_numpy = _medir("informe con NumPy", lambda: analitica_catalogo.informe_analitico(tabla_numpy))
+    informe_python = analitica_catalogo.informe_analitico(tabla_python)
+    informe_numpy = analitica_catalogo.informe_analitico(tabla_numpy)
+    informe_python.pop("calculado_con"), informe_numpy.pop("calculado_con")
+    assert informe_python == informe_numpy, "El informe con NumPy difiere del de Python puro"
+    print(f"  Aceleración: x{t_python / t_numpy:.1f}")
+
+
+MEDICIONES: Dict[str, Callable[[int], None]] = {
+    "escaneo": bench_escaneo,
+    "procesos": bench_procesos,
+    "memoria": bench_memoria,
+    "busqueda": bench_busqueda,
+    "orden": bench_orden,
+    "diario": bench_diario,
+    "concurrencia": bench_concurrencia,
+    "motores": bench_motores,
+    "instantanea": bench_instantanea,
+    "sesion": bench_sesion,
+    "candidatos_api": bench_candidatos_api, # --archivos es la cantidad de volúmenes
+    "duplicados": bench_duplicados,
+    "analitica": bench_analitica,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mediciones de rendimiento de la biblioteca")
+    parser.add_argument("medicion", choices=sorted(MEDICIONES))
+    parser.add_argument("--archivos", type=int, default=10000, help="Cantidad de items.csv del árbol sintético")
+    args = parser.parse_args()
+    MEDICIONES[args.medicion](args.archivos)
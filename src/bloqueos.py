@@ -0,0 +1,75 @@
+# --- BLOQUEOS ENTRE PROCESOS (fcntl.flock, advisory) ---
+# Varios procesos (por ejemplo, trabajadores de importación) pueden escribir
+# sobre la misma carpeta data/. Se usan tres bloqueos:
+#   * árbol (carpeta base): compartido para cualquier escritura y para leer una
+#     foto consistente; exclusivo para los cambios estructurales (compactación,
+#     que reemplaza y elimina items.csv).
+#   * hoja (carpeta genero/autor/anio): exclusivo al escribir su items.csv.
+#   * diario: exclusivo para leer lo nuevo del diario y agregarle una línea.
+# Para evitar abrazos mortales siempre se toman en ese orden: árbol, hoja, diario.
+# En sistemas sin fcntl (Windows) los bloqueos no hacen nada.
+import os
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+@contextmanager
+def bloqueo_archivo(ruta: str, exclusivo: bool = True) -> Iterator[None]:
+    """flock sobre una carpeta o un archivo de bloqueo (el archivo se crea si no existe)."""
+    if fcntl is None:
+        yield
+        return
+
+    es_carpeta = os.path.isdir(ruta)
+    descriptor = os.open(ruta, os.O_RDONLY if es_carpeta else os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(descriptor, fcntl.LOCK_EX if exclusivo else fcntl.LOCK_SH)
+        yield
+    finally:
+        os.close(descriptor) # Cerrar el descriptor libera el bloqueo
+
+
+class BloqueoArbol:
+    """
+    Bloqueo de la carpeta base, reentrante dentro del proceso: si ya se tiene
+    (compartido o exclusivo), pedirlo otra vez no hace nada. No se puede pasar
+    de compartido a exclusivo sin soltarlo. No es seguro entre hilos: quien lo
+    usa debe tener además el candado del catálogo.
+    """
+
+    def __init__(self, ruta_base: str):
+        self.ruta_base = ruta_base
+        self._descriptor: Optional[int] = None
+        self._profundidad = 0
+        self._exclusivo = False
+
+    @contextmanager
+    def tomar(self, exclusivo: bool = False) -> Iterator[None]:
+        if self._profundidad:
+            if exclusivo and not self._exclusivo:
+                raise RuntimeError("No se puede pasar de bloqueo compartido a exclusivo")
+            self._profundidad += 1
+            try:
+                yield
+            finally:
+                self._profundidad -= 1
+            return
+
+        if fcntl is None or not os.path.isdir(self.ruta_base):
+            yield
+            return
+
+        self._descriptor = os.open(self.ruta_base, os.O_RDONLY)
+        try:
+            fcntl.flock(self._descriptor, fcntl.LOCK_EX if exclusivo else fcntl.LOCK_SH)
+            self._profundidad, self._exclusivo = 1, exclusivo
+            yield
+        finally:
+            self._profundidad = 0
+            os.close(self._descriptor)
+            self._descriptor = None
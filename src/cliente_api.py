@@ -0,0 +1,253 @@
+# --- CLIENTE DE GOOGLE BOOKS (conexiones reutilizadas + caché de respuestas) ---
+# Todas las consultas a la API pasan por un mismo requests.Session: la
+# conexión HTTPS se abre una vez y se reutiliza (pool de urllib3), y los
+# errores transitorios (429, 5xx, cortes de conexión) se reintentan con
+# espera exponencial. Las respuestas se guardan en dos niveles:
+#   * memoria: LRU de las últimas CAPACIDAD_CACHE_MEMORIA consultas,
+#   * disco: un JSON por consulta en DIRECTORIO_CACHE, válido TTL_CACHE_DISCO
+#     segundos (sobrevive entre ejecuciones del programa).
+# La clave de caché es la consulta normalizada (sin acentos, mayúsculas ni
+# espacios repetidos) más el resto de los parámetros, ordenados.
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from similitud import normalizar_texto
+from almacenamiento import guardar_json_atomico
+
+URL_GOOGLE_BOOKS = "https://www.googleapis.com/books/v1/volumes"
+# Se puede apuntar a otro servidor (ej. servidor_api_local) sin tocar el código
+API_URL = os.environ.get("BIBLIOTECA_API_URL", URL_GOOGLE_BOOKS)
+TIMEOUT_API = 5 # segundos
+REINTENTOS_API = 3
+ESPERA_BASE_REINTENTO = 0.5 # segundos: 0.5, 1, 2...
+CONEXIONES_POR_HOST = 10
+TAMANIO_PAGINA_API = 40 # Máximo que acepta maxResults
+HILOS_PAGINAS = 6 # Páginas pedidas a la vez (no más que CONEXIONES_POR_HOST)
+CAPACIDAD_CACHE_MEMORIA = 256
+TTL_CACHE_DISCO = 24 * 60 * 60 # segundos
+DIRECTORIO_CACHE = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".cache_api"))
+
+Respuesta = Dict[str, Any]
+
+
+def clave_consulta(params: Dict[str, Any]) -> str:
+    """Clave de caché: el parámetro 'q' normalizado y el resto tal cual, en orden."""
+    normalizados = dict(params)
+    if "q" in normalizados:
+        normalizados["q"] = " ".join(normalizar_texto(str(normalizados["q"])).split())
+    return json.dumps(normalizados, sort_keys=True, ensure_ascii=False)
+
+
+class CacheRespuestas:
+    """LRU en memoria delante de una caché en disco con vencimiento. Segura entre hilos."""
+
+    def __init__(self, directorio: Optional[str] = DIRECTORIO_CACHE, capacidad: int = CAPACIDAD_CACHE_MEMORIA,
+                 ttl: float = TTL_CACHE_DISCO):
+        self.directorio = directorio
+        self.capacidad = capacidad
+        self.ttl = ttl
+        self._memoria: "OrderedDict[str, Respuesta]" = OrderedDict()
+        self._candado = threading.Lock()
+        self.aciertos_memoria = 0
+        self.aciertos_disco = 0
+        self.fallos = 0
+
+    def _ruta(self, clave: str) -> str:
+        return os.path.join(self.directorio, hashlib.sha1(clave.encode("utf-8")).hexdigest() + ".json")
+
+    def _recordar(self, clave: str, respuesta: Respuesta):
+        self._memoria[clave] = respuesta
+        self._memoria.move_to_end(clave)
+        while len(self._memoria) > self.capacidad:
+            self._memoria.popitem(last=False)
+
+    def _leer_disco(self, clave: str) -> Optional[Respuesta]:
+        if not self.directorio:
+            return None
+        ruta = self._ruta(clave)
+        try:
+            with open(ruta, "r", encoding="utf-8") as f:
+                datos = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if datos.get("clave") != clave:
+            return None # Colisión de hash (o archivo ajeno)
+        if time.time() - datos.get("guardado", 0) > self.ttl:
+            try:
+                os.remove(ruta) # Vencida
+            except OSError:
+                pass
+            return None
+        return datos.get("respuesta")
+
+    def obtener(self, clave: str) -> Optional[Respuesta]:
+        """La respuesta guardada para esa clave (de memoria o de disco), o None si no hay."""
+        with self._candado:
+            respuesta = self._memoria.get(clave)
+            if respuesta is not None:
+                self._memoria.move_to_end(clave)
+                self.aciertos_memoria += 1
+                return respuesta
+
+        respuesta = self._leer_disco(clave)
+        with self._candado:
+            if respuesta is None:
+                self.fallos += 1
+                return None
+            self.aciertos_disco += 1
+            self._recordar(clave, respuesta)
+            return respuesta
+
+    def guardar(self, clave: str, respuesta: Respuesta):
+        with self._candado:
+            self._recordar(clave, respuesta)
+        if self.directorio:
+            # Solo es una caché: si no se puede escribir, se sigue sin ella
+            try:
+                os.makedirs(self.directorio, exist_ok=True)
+            except OSError:
+                return
+            guardar_json_atomico(self._ruta(clave), {"clave": clave, "guardado": time.time(), "respuesta": respuesta})
+
+    def vaciar_memoria(self):
+        with self._candado:
+            self._memoria.clear()
+
+    def resumen(self) -> str:
+        aciertos = self.aciertos_memoria + self.aciertos_disco
+        return (f"{aciertos} aciertos (memoria {self.aciertos_memoria}, disco {self.aciertos_disco}), "
+                f"{self.fallos} consultas a la API")
+
+
+class LimitadorTasa:
+    """
+    Limita las consultas a la API a 'por_segundo' (cubeta de fichas con
+    capacidad de 'rafaga'). Seguro entre hilos: cada hilo espera su turno.
+    """
+
+    def __init__(self, por_segundo: float, rafaga: int = 1):
+        self.intervalo = 1.0 / por_segundo
+        self.rafaga = rafaga
+        self._fichas = float(rafaga)
+        self._ultima = time.monotonic()
+        self._candado = threading.Lock()
+
+    def esperar(self):
+        with self._candado:
+            ahora = time.monotonic()
+            self._fichas = min(self.rafaga, self._fichas + (ahora - self._ultima) / self.intervalo)
+            self._ultima = ahora
+            espera = (1 - self._fichas) * self.intervalo if self._fichas < 1 else 0.0
+            self._fichas -= 1 # Se reserva la ficha antes de soltar el candado (queda en negativo si hay que esperar)
+        if espera > 0:
+            time.sleep(espera)
+
+
+class ClienteLibros:
+    """Cliente de la API de Google Books: una sesión HTTP compartida y la caché de respuestas."""
+
+    def __init__(self, url: str = API_URL, cache: Optional[CacheRespuestas] = None, timeout: float = TIMEOUT_API,
+                 limitador: Optional[LimitadorTasa] = None):
+        self.url = url
+        self.timeout = timeout
+        self.limitador = limitador # Solo frena las consultas que salen a la red, no las de la caché
+        self.cache = cache if cache is not None else CacheRespuestas()
+        self.sesion = requests.Session()
+        reintentos = Retry(
+            total=REINTENTOS_API,
+            backoff_factor=ESPERA_BASE_REINTENTO,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET",),
+            respect_retry_after_header=True,
+        )
+        adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=CONEXIONES_POR_HOST, max_retries=reintentos)
+        self.sesion.mount("https://", adaptador)
+        self.sesion.mount("http://", adaptador)
+
+    def consultar(self, params: Dict[str, Any]) -> Respuesta:
+        """
+        Respuesta JSON de la API para esos parámetros, desde la caché si ya se
+        pidió. Lanza requests.RequestException si la API no responde o falla.
+        """
+        clave = clave_consulta(params)
+        respuesta = self.cache.obtener(clave)
+        if respuesta is not None:
+            return respuesta
+
+        if self.limitador:
+            self.limitador.esperar()
+        response = self.sesion.get(self.url, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        try:
+            respuesta = response.json()
+        except ValueError as e:
+            raise requests.RequestException(f"Respuesta inválida de la API: {e}") from e
+        self.cache.guardar(clave, respuesta)
+        return respuesta
+
+    def consultar_paginas(self, params: Dict[str, Any], max_resultados: int,
+                          hilos: int = HILOS_PAGINAS) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Hasta max_resultados volúmenes de una búsqueda paginada. La primera
+        página da totalItems; el resto se pide en paralelo (como mucho 'hilos'
+        a la vez). Devuelve (volúmenes en el orden de la API sin ids repetidos,
+        totalItems). Lanza requests.RequestException si falla alguna página.
+        """
+        def pagina(desde: int) -> List[Dict[str, Any]]:
+            cantidad = min(TAMANIO_PAGINA_API, max_resultados - desde)
+            return self.consultar({**params, "startIndex": desde, "maxResults": cantidad}).get("items", [])
+
+        primera = self.consultar({**params, "startIndex": 0, "maxResults": min(TAMANIO_PAGINA_API, max_resultados)})
+        total = primera.get("totalItems", 0)
+        paginas = [primera.get("items", [])]
+
+        # totalItems es aproximado: una página vacía solo significa que no había más
+        desdes = list(range(TAMANIO_PAGINA_API, min(max_resultados, total), TAMANIO_PAGINA_API))
+        if paginas[0] and desdes:
+            with ThreadPoolExecutor(max_workers=max(1, min(hilos, len(desdes)))) as executor:
+                paginas.extend(executor.map(pagina, desdes)) # map conserva el orden de las páginas
+
+        volumenes: List[Dict[str, Any]] = []
+        vistos = set()
+        for items in paginas:
+            for item in items:
+                # La API repite volúmenes entre páginas; sin id, se compara el contenido
+                id_volumen = item.get("id") or json.dumps(item.get("volumeInfo", {}), sort_keys=True)
+                if id_volumen in vistos:
+                    continue
+                vistos.add(id_volumen)
+                volumenes.append(item)
+        return volumenes[:max_resultados], total
+
+    def cerrar(self):
+        self.sesion.close()
+
+
+_cliente: Optional[ClienteLibros] = None
+_candado_cliente = threading.Lock()
+
+
+def configurar_cliente(cliente: ClienteLibros):
+    """Reemplaza el cliente compartido (ej. uno que apunte a un servidor local)."""
+    global _cliente
+    with _candado_cliente:
+        _cliente = cliente
+
+
+def obtener_cliente() -> ClienteLibros:
+    """Cliente compartido por todo el programa (se crea la primera vez)."""
+    global _cliente
+    with _candado_cliente:
+        if _cliente is None:
+            _cliente = ClienteLibros()
+        return _cliente
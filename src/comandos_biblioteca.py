@@ -0,0 +1,282 @@
+# --- LÍNEA DE COMANDOS SIN PREGUNTAS (para scripts y tuberías) ---
+# Las mismas operaciones del menú, con argumentos en lugar de input(). Los
+# datos salen por la salida estándar, libro a libro, como JSONL (un objeto por
+# línea) o CSV, sin armar el listado completo en memoria; los mensajes van a
+# la salida de errores. El código de salida es 0 si todo anduvo bien.
+# Uso (desde la raíz del repositorio; cada comando acepta también su nombre en inglés):
+#   python src/comandos_biblioteca.py agregar --genero Novela --autor "Julio Cortázar" --anio 1963 --titulo Rayuela --paginas 600
+#   python src/comandos_biblioteca.py listar --autor "Julio Cortázar" --formato csv
+#   python src/comandos_biblioteca.py buscar rayuela --campo titulo --limite 5
+#   python src/comandos_biblioteca.py estadisticas [--por genero|autor|anio]
+#   python src/comandos_biblioteca.py ordenar --por paginas:desc --por titulo --limite 20
+#   python src/comandos_biblioteca.py eliminar --id "Novela/Julio Cortázar/Rayuela"
+#   python src/comandos_biblioteca.py importar libros.csv        (o '-' con --formato para la entrada estándar)
+#   python src/comandos_biblioteca.py exportar --formato csv > catalogo.csv
+import os
+import sys
+import csv
+import json
+import argparse
+import contextlib
+from typing import Any, Callable, Dict, Iterable, List, Optional, TextIO
+
+from modelo_libro import Libro
+from flujo_libros import limitar, mapear
+from fsc_guardado import validar_entrada_libro
+from fsc_importacion import importar_libros, leer_fuente_importacion, leer_filas_importacion
+from indices_orden import CLAVES_ORDEN, Criterio
+from analitica_catalogo import TablaCatalogo, informe_analitico
+from motores_almacenamiento import (
+    MOTORES, MotorAlmacenamiento, crear_motor, configurar_motor, ERRORES_ALMACENAMIENTO
+)
+
+BASE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "data"))
+FORMATOS = ("jsonl", "csv")
+# Columnas de cada libro en la salida; exportar deja afuera el id (importar no lo usa)
+CAMPOS_LISTADO = ("id", "genero", "autor", "anio", "titulo", "paginas")
+CAMPOS_EXPORTACION = ("genero", "autor", "anio", "titulo", "paginas")
+CAMPOS_GRUPO = ("clave", "cantidad", "paginas_total", "promedio", "mediana", "min", "max")
+
+
+# --- Salida en flujo ---
+
+def fila_de_libro(libro: Libro, campos: Iterable[str] = CAMPOS_LISTADO) -> Dict[str, Any]:
+    """Los campos del libro (el año como número si lo es, como en el patrón de datos)."""
+    fila = {campo: libro[campo] for campo in campos}
+    if "anio" in fila and fila["anio"].isdigit():
+        fila["anio"] = int(fila["anio"])
+    return fila
+
+
+def escribir_filas(filas: Iterable[Dict[str, Any]], campos: Iterable[str], formato: str,
+                   salida: Optional[TextIO] = None) -> int:
+    """Escribe cada fila apenas llega (JSONL o CSV con encabezado; por defecto a stdout). Devuelve cuántas escribió."""
+    salida = salida or sys.stdout
+    campos = list(campos)
+    cantidad = 0
+    if formato == "csv":
+        writer = csv.writer(salida, lineterminator="\n")
+        writer.writerow(campos)
+        for fila in filas:
+            writer.writerow([fila.get(campo, "") for campo in campos])
+            cantidad += 1
+    else:
+        for fila in filas:
+            salida.write(json.dumps(fila, ensure_ascii=False) + "\n")
+            cantidad += 1
+    return cantidad
+
+
+def _escribir_libros(libros: Iterable[Libro], formato: str, campos: Iterable[str] = CAMPOS_LISTADO) -> int:
+    campos = tuple(campos)
+    return escribir_filas(mapear(libros, lambda libro: fila_de_libro(libro, campos)), campos, formato)
+
+
+def _dentro_de_base(base: str, *niveles: str) -> bool:
+    """Si la carpeta de esos niveles, ya resuelta (con enlaces simbólicos), queda dentro de base."""
+    base_real = os.path.realpath(base)
+    return os.path.commonpath([base_real, os.path.realpath(os.path.join(base_real, *niveles))]) == base_real
+
+
+def _aviso(mensaje: str):
+    print(mensaje, file=sys.stderr)
+
+
+# --- Comandos (cada uno recibe el motor y los argumentos; devuelve el código de salida) ---
+
+def comando_agregar(motor: MotorAlmacenamiento, args: argparse.Namespace) -> int:
+    es_valido, resultado = validar_entrada_libro({
+        "genero": args.genero, "autor": args.autor, "anio": args.anio,
+        "titulo": args.titulo, "paginas": args.paginas,
+    })
+    if not es_valido:
+        _aviso(f"❌ Error de validación: {resultado}")
+        return 1
+    if not _dentro_de_base(args.base, resultado["genero"], resultado["autor"], str(resultado["anio"])):
+        _aviso(f"❌ La carpeta {resultado['genero']}/{resultado['autor']}/{resultado['anio']} quedaría fuera de {args.base}.")
+        return 1
+    with contextlib.redirect_stdout(sys.stderr): # Los avisos de la jerarquía no van con los datos
+        ubicacion = motor.insertar(resultado)
+    _aviso(f"✅ Libro '{resultado['titulo']}' guardado en {ubicacion}")
+    escribir_filas([resultado], CAMPOS_EXPORTACION, args.formato)
+    return 0
+
+
+def comando_listar(motor: MotorAlmacenamiento, args: argparse.Namespace) -> int:
+    filtros = {clave: getattr(args, clave) for clave in
+               ("anio_min", "anio_max", "paginas_min", "paginas_max", "genero", "autor")}
+    # Sin filtros se recorre el catálogo en flujo; con filtros, la consulta usa los índices del motor
+    libros: Iterable[Libro] = motor.consultar(**filtros) if any(v is not None for v in filtros.values()) else motor.recorrer()
+    if args.limite is not None:
+        libros = limitar(libros, args.limite)
+    _escribir_libros(libros, args.formato)
+    return 0
+
+
+def comando_buscar(motor: MotorAlmacenamiento, args: argparse.Namespace) -> int:
+    resultados = motor.buscar_similares(args.campo, args.consulta, args.limite)
+    filas = (dict(fila_de_libro(libro), similitud=round(puntaje, 3)) for libro, puntaje in resultados)
+    escribir_filas(filas, CAMPOS_LISTADO + ("similitud",), args.formato)
+    return 0
+
+
+def comando_estadisticas(motor: MotorAlmacenamiento, args: argparse.Namespace) -> int:
+    informe = informe_analitico(TablaCatalogo(motor.recorrer()), args.barras)
+    if args.por is None:
+        json.dump(informe, sys.stdout, ensure_ascii=False)
+        sys.stdout.write("\n")
+    else:
+        escribir_filas(informe.get(f"por_{args.por}", []), CAMPOS_GRUPO, args.formato)
+    return 0
+
+
+def comando_ordenar(motor: MotorAlmacenamiento, args: argparse.Namespace) -> int:
+    _escribir_libros(motor.ordenar(args.por, args.limite), args.formato)
+    return 0
+
+
+def comando_eliminar(motor: MotorAlmacenamiento, args: argparse.Namespace) -> int:
+    a_eliminar: List[Libro] = []
+    for id_libro in args.id:
+        encontrados = [libro for libro in motor.obtener_por_id(id_libro)
+                       if args.anio is None or libro.anio_num == args.anio]
+        if not encontrados:
+            _aviso(f"❌ No hay ningún libro con el ID '{id_libro}'.")
+            return 1
+        if len(encontrados) > 1 and not args.todos:
+            anios = ", ".join(sorted({libro.anio for libro in encontrados}))
+            _aviso(f"❌ Hay {len(encontrados)} libros con el ID '{id_libro}' (años {anios}): "
+                   f"indicá --anio o usá --todos.")
+            return 1
+        a_eliminar.extend(encontrados)
+
+    eliminados = motor.eliminar_lote(a_eliminar)
+    _aviso(f"✅ {eliminados} libros eliminados.")
+    _escribir_libros(a_eliminar, args.formato)
+    return 0 if eliminados == len(a_eliminar) else 1
+
+
+def comando_importar(motor: MotorAlmacenamiento, args: argparse.Namespace) -> int:
+    if args.origen == "-":
+        filas = leer_filas_importacion(sys.stdin, es_jsonl=args.formato == "jsonl")
+    elif not os.path.isfile(args.origen):
+        _aviso(f"❌ El archivo no existe: {args.origen}")
+        return 1
+    else:
+        filas = leer_fuente_importacion(args.origen)
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            resumen = importar_libros(args.base, filas)
+    except (UnicodeDecodeError, csv.Error) as e:
+        _aviso(f"❌ Error al leer el archivo de origen: {e}")
+        return 1
+    json.dump(resumen, sys.stdout, ensure_ascii=False)
+    sys.stdout.write("\n")
+    return 0 if not resumen["rechazados"] else 1
+
+
+def comando_exportar(motor: MotorAlmacenamiento, args: argparse.Namespace) -> int:
+    if args.salida in (None, "-"):
+        cantidad = _escribir_libros(motor.recorrer(), args.formato, CAMPOS_EXPORTACION)
+    else:
+        with open(args.salida, "w", encoding="utf-8", newline="") as f:
+            filas = mapear(motor.recorrer(), lambda libro: fila_de_libro(libro, CAMPOS_EXPORTACION))
+            cantidad = escribir_filas(filas, CAMPOS_EXPORTACION, args.formato, f)
+    _aviso(f"📤 {cantidad} libros exportados.")
+    return 0
+
+
+# --- Argumentos ---
+
+def _criterio(texto: str) -> Criterio:
+    """'campo' o 'campo:desc' / 'campo:asc' -> (campo, descendente)."""
+    campo, _, direccion = texto.partition(":")
+    if campo not in CLAVES_ORDEN or direccion not in ("", "asc", "desc"):
+        raise argparse.ArgumentTypeError(
+            f"criterio inválido '{texto}' (campos: {', '.join(CLAVES_ORDEN)}; opcional ':asc' o ':desc')")
+    return campo, direccion == "desc"
+
+
+def crear_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Gestión de la biblioteca sin menú (salida en JSONL o CSV)")
+    parser.add_argument("--base", default=BASE_PATH, help="Carpeta de datos del árbol de CSV")
+    parser.add_argument("--motor", choices=MOTORES, default=os.environ.get("BIBLIOTECA_MOTOR", "csv").lower())
+    parser.add_argument("--sqlite", default=None, help="Archivo de la base SQLite (por defecto, junto a la carpeta de datos)")
+    comandos = parser.add_subparsers(dest="comando", required=True, metavar="comando")
+
+    def comando(nombre: str, alias: str, funcion: Callable[..., int], ayuda: str,
+                escribe: bool = False) -> argparse.ArgumentParser:
+        sub = comandos.add_parser(nombre, aliases=[alias], help=ayuda, description=ayuda)
+        sub.add_argument("--formato", choices=FORMATOS, default="jsonl")
+        sub.set_defaults(funcion=funcion, escribe=escribe)
+        return sub
+
+    sub = comando("agregar", "add", comando_agregar, "Agrega un libro", escribe=True)
+    for campo in ("genero", "autor", "anio", "titulo", "paginas"):
+        sub.add_argument(f"--{campo}", required=True)
+
+    sub = comando("listar", "list", comando_listar, "Lista los libros, con filtros opcionales")
+    sub.add_argument("--genero")
+    sub.add_argument("--autor")
+    for campo in ("anio", "paginas"):
+        sub.add_argument(f"--{campo}-min", type=int)
+        sub.add_argument(f"--{campo}-max", type=int)
+    sub.add_argument("--limite", type=int, default=None)
+
+    sub = comando("buscar", "search", comando_buscar, "Busca libros por parecido (del más al menos parecido)")
+    sub.add_argument("consulta")
+    sub.add_argument("--campo", choices=("titulo", "autor", "genero"), default="titulo")
+    sub.add_argument("--limite", type=int, default=50)
+
+    sub = comando("estadisticas", "stats", comando_estadisticas,
+                  "Informe de páginas en JSON, o un desglose por grupo en JSONL/CSV con --por")
+    sub.add_argument("--por", choices=("genero", "autor", "anio"), default=None)
+    sub.add_argument("--barras", type=int, default=10, help="Barras del histograma de páginas")
+
+    sub = comando("ordenar", "sort", comando_ordenar, "Libros ordenados por uno o más criterios")
+    sub.add_argument("--por", type=_criterio, action="append", required=True, metavar="CAMPO[:desc]")
+    sub.add_argument("--limite", type=int, default=None, help="Solo los primeros N")
+
+    sub = comando("eliminar", "delete", comando_eliminar, "Elimina libros por ID (Genero/Autor/Titulo)", escribe=True)
+    sub.add_argument("--id", action="append", required=True, help="Se puede repetir")
+    sub.add_argument("--anio", type=int, default=None, help="Solo el libro de ese año")
+    sub.add_argument("--todos", action="store_true", help="Eliminar todos los libros con ese ID")
+
+    sub = comando("importar", "import", comando_importar,
+                  "Importa libros desde un .csv o .jsonl ('-': entrada estándar en el --formato indicado)", escribe=True)
+    sub.add_argument("origen")
+
+    sub = comando("exportar", "export", comando_exportar, "Exporta todo el catálogo en un formato que importar acepta")
+    sub.add_argument("--salida", default=None, help="Archivo de destino (por defecto, la salida estándar)")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = crear_parser()
+    args = parser.parse_args(argv)
+    for limite in ("limite", "barras"):
+        if getattr(args, limite, None) is not None and getattr(args, limite) < 1:
+            parser.error(f"--{limite} debe ser positivo")
+
+    os.makedirs(args.base, exist_ok=True)
+    motor = crear_motor(args.motor, args.base, args.sqlite)
+    configurar_motor(args.base, motor) # importar_libros y compañía usan el motor configurado
+    try:
+        return args.funcion(motor, args)
+    except BrokenPipeError:
+        # Quien leía cerró la tubería (ej. '| head'): no es un error del comando
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    except ERRORES_ALMACENAMIENTO as e:
+        _aviso(f"❌ Error del almacenamiento: {e}")
+        return 1
+    finally:
+        # Solo después de escribir: en CSV, cerrar vuelca el diario con el árbol
+        # bloqueado en exclusivo y un comando de lectura no tiene por qué esperar
+        # a (ni frenar a) los demás procesos
+        if args.escribe:
+            motor.cerrar()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
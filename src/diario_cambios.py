@@ -0,0 +1,242 @@
+# --- DIARIO DE CAMBIOS (write-ahead journal) DEL CATÁLOGO ---
+# Altas, modificaciones y bajas se registran como una línea JSON agregada al
+# final del diario, en lugar de reescribir el items.csv completo. Los lectores
+# de 'almacenamiento' aplican estas operaciones sobre las filas del disco, y
+# una compactación las vuelca luego a los items.csv (temporal + os.replace).
+import os
+import json
+from typing import List, Dict, Tuple, Any, Iterable, Optional, Sequence, Callable
+
+Fila = Tuple[str, int]
+Operacion = Dict[str, Any]
+# Cambio de una fila (o de un libro): (posición, anterior, nueva). Sin anterior
+# es una fila agregada en esa posición; sin nueva, una fila quitada. Una lista
+# de cambios se aplica en orden: cada posición es sobre la lista ya cambiada
+# por los cambios anteriores.
+CambioFila = Tuple[int, Optional[Any], Optional[Any]]
+
+
+def operacion_alta(titulo: str, paginas: int) -> Operacion:
+    return {"op": "alta", "titulo": titulo, "paginas": paginas}
+
+
+def operacion_modificacion(fila: int, antes: Fila, titulo: str, paginas: int) -> Operacion:
+    return {"op": "modificacion", "fila": fila, "antes": list(antes), "titulo": titulo, "paginas": paginas}
+
+
+def operacion_baja(fila: int, antes: Fila) -> Operacion:
+    return {"op": "baja", "fila": fila, "antes": list(antes)}
+
+
+def _ubicar_fila(filas: List[Fila], fila: int, antes: List[Any]) -> int:
+    """
+    Posición de la fila a modificar/eliminar. Se usa el número de fila guardado
+    si todavía coincide con (título, páginas); si no (el CSV cambió por fuera),
+    se busca por contenido. Devuelve -1 si ya no está.
+    """
+    antes = (antes[0], antes[1])
+    if 0 <= fila < len(filas) and tuple(filas[fila]) == antes:
+        return fila
+    for posicion, candidata in enumerate(filas):
+        if tuple(candidata) == antes:
+            return posicion
+    return -1
+
+
+def aplicar_operacion(filas: List[Fila], operacion: Operacion) -> Optional[CambioFila]:
+    """
+    Aplica una operación sobre la lista de filas (la modifica) y devuelve el
+    cambio que hizo, o None si no tuvo efecto.
+    """
+    tipo = operacion["op"]
+    if tipo == "alta":
+        filas.append((operacion["titulo"], operacion["paginas"]))
+        return len(filas) - 1, None, filas[-1]
+    posicion = _ubicar_fila(filas, operacion["fila"], operacion["antes"])
+    if posicion == -1:
+        return None # La fila ya no existe: la operación no tiene efecto
+    anterior = tuple(filas[posicion])
+    if tipo == "modificacion":
+        filas[posicion] = (operacion["titulo"], operacion["paginas"])
+        return posicion, anterior, filas[posicion]
+    if tipo == "baja":
+        del filas[posicion]
+        return posicion, anterior, None
+    return None
+
+
+def aplicar_operaciones(filas: List[Fila], operaciones: Iterable[Operacion]) -> List[Fila]:
+    """Filas vigentes de un items.csv: las del disco con las operaciones aplicadas en orden."""
+    filas = list(filas)
+    for operacion in operaciones:
+        aplicar_operacion(filas, operacion)
+    return filas
+
+
+def _quitadas_de_subsecuencia(larga: List[Any], corta: List[Any]) -> Optional[List[int]]:
+    """Posiciones de 'larga' que sobran si 'corta' es una subsecuencia suya (None si no lo es)."""
+    sobrantes: List[int] = []
+    j = 0
+    for i, elemento in enumerate(larga):
+        if j < len(corta) and elemento == corta[j]:
+            j += 1
+        else:
+            sobrantes.append(i)
+    return sobrantes if j == len(corta) else None
+
+
+def diferencias_filas(viejas: Sequence[Any], nuevas: Sequence[Any],
+                      clave: Callable[[Any], Any] = tuple) -> List[CambioFila]:
+    """
+    Cambios que llevan de 'viejas' a 'nuevas' (comparando por 'clave'). Se
+    saltean el principio y el final comunes; en el medio, con el mismo largo
+    se reemplazan solo las filas distintas, si solo se agregaron o solo se
+    quitaron filas se informan esas, y si no, se quita todo el medio viejo y
+    se agrega el nuevo. Las bajas van de atrás hacia adelante: así quitarlas
+    de una lista no mueve las que faltan quitar.
+    """
+    claves_viejas = [clave(fila) for fila in viejas]
+    claves_nuevas = [clave(fila) for fila in nuevas]
+    inicio, limite = 0, min(len(claves_viejas), len(claves_nuevas))
+    while inicio < limite and claves_viejas[inicio] == claves_nuevas[inicio]:
+        inicio += 1
+    fin_viejas, fin_nuevas = len(claves_viejas), len(claves_nuevas)
+    while fin_viejas > inicio and fin_nuevas > inicio and claves_viejas[fin_viejas - 1] == claves_nuevas[fin_nuevas - 1]:
+        fin_viejas -= 1
+        fin_nuevas -= 1
+
+    medio_viejo, medio_nuevo = claves_viejas[inicio:fin_viejas], claves_nuevas[inicio:fin_nuevas]
+    if len(medio_viejo) == len(medio_nuevo):
+        return [(i, viejas[i], nuevas[i]) for i in range(inicio, fin_viejas) if claves_viejas[i] != claves_nuevas[i]]
+    if len(medio_viejo) > len(medio_nuevo):
+        quitadas = _quitadas_de_subsecuencia(medio_viejo, medio_nuevo)
+        if quitadas is not None:
+            return [(inicio + i, viejas[inicio + i], None) for i in reversed(quitadas)]
+    else:
+        agregadas = _quitadas_de_subsecuencia(medio_nuevo, medio_viejo)
+        if agregadas is not None:
+            return [(inicio + i, None, nuevas[inicio + i]) for i in agregadas]
+
+    cambios: List[CambioFila] = [(i, viejas[i], None) for i in range(fin_viejas - 1, inicio - 1, -1)]
+    cambios.extend((i, None, nuevas[i]) for i in range(inicio, fin_nuevas))
+    return cambios
+
+
+class DiarioCambios:
+    """
+    Diario de una carpeta de datos: un archivo JSONL cuya primera línea es
+    {"diario": <marca>} y cada línea siguiente es {"csv": <items.csv relativo
+    a la base>, "op": ..., ...}. En memoria se agrupan las operaciones por
+    items.csv. Solo se agregan líneas al final, así que para ver lo que agregó
+    otro proceso se lee desde el último byte leído. Cada vez que el diario se
+    reescribe (compactación) lleva una marca nueva: si la marca cambió, se
+    vuelve a leer desde el principio.
+    """
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self.operaciones: Dict[str, List[Operacion]] = {}
+        self.cantidad = 0
+        self._marca: Optional[str] = None
+        self._leido_hasta = 0
+        self._firma: Optional[Tuple[int, int, int]] = None # (inodo, tamaño, mtime) de la última lectura
+
+    def operaciones_de(self, clave: str) -> List[Operacion]:
+        return self.operaciones.get(clave, [])
+
+    @staticmethod
+    def _nueva_marca() -> bytes:
+        return (json.dumps({"diario": os.urandom(8).hex()}) + "\n").encode("utf-8")
+
+    @staticmethod
+    def _linea(clave: str, operacion: Operacion) -> bytes:
+        return (json.dumps({"csv": clave, **operacion}, ensure_ascii=False) + "\n").encode("utf-8")
+
+    def sincronizar(self) -> Dict[str, List[Operacion]]:
+        """
+        Lee las líneas nuevas del diario. Devuelve {clave: operaciones que tenía
+        antes} de cada items.csv cuyas operaciones cambiaron.
+        """
+        try:
+            stat = os.stat(self.ruta)
+            if (stat.st_ino, stat.st_size, stat.st_mtime_ns) == self._firma:
+                return {} # Nada nuevo (caso común: solo cuesta un stat)
+            with open(self.ruta, "rb") as f:
+                encabezado = f.readline()
+                try:
+                    marca = json.loads(encabezado)["diario"] if encabezado.endswith(b"\n") else None
+                except (ValueError, KeyError, TypeError):
+                    marca = None
+
+                cambiadas: Dict[str, List[Operacion]] = {}
+                if marca != self._marca:
+                    # El diario se reescribió: se vuelve a leer desde el principio
+                    cambiadas = {clave: list(operaciones) for clave, operaciones in self.operaciones.items()}
+                    self.operaciones, self.cantidad = {}, 0
+                    self._marca = marca
+                    self._leido_hasta = len(encabezado) if marca else 0
+                if marca is None:
+                    return cambiadas
+
+                f.seek(self._leido_hasta)
+                datos = f.read()
+                self._firma = (stat.st_ino, stat.st_size, stat.st_mtime_ns) if f.tell() == stat.st_size else None
+        except FileNotFoundError:
+            cambiadas = {clave: list(operaciones) for clave, operaciones in self.operaciones.items()}
+            self.operaciones, self.cantidad = {}, 0
+            self._marca, self._leido_hasta, self._firma = None, 0, None
+            return cambiadas
+
+        # Una última línea sin '\n' es una escritura cortada: se ignora
+        completo = datos[:datos.rfind(b"\n") + 1]
+        for linea in completo.splitlines():
+            try:
+                operacion = json.loads(linea)
+                clave = operacion.pop("csv")
+            except (ValueError, KeyError, AttributeError):
+                continue
+            cambiadas.setdefault(clave, list(self.operaciones_de(clave)))
+            self.operaciones.setdefault(clave, []).append(operacion)
+            self.cantidad += 1
+        self._leido_hasta += len(completo)
+        return cambiadas
+
+    def anexar(self, clave: str, operacion: Operacion):
+        """
+        Agrega una operación al final del diario y la fuerza a disco (fsync).
+        Se debe llamar recién sincronizado y con el bloqueo del diario tomado.
+        """
+        with open(self.ruta, "ab") as f:
+            if f.tell() > self._leido_hasta:
+                f.truncate(self._leido_hasta) # Restos de una escritura cortada
+            if self._marca is None:
+                encabezado = self._nueva_marca()
+                f.write(encabezado)
+                self._marca = json.loads(encabezado)["diario"]
+            f.write(self._linea(clave, operacion))
+            f.flush()
+            os.fsync(f.fileno())
+            self._leido_hasta = f.tell()
+        self.operaciones.setdefault(clave, []).append(operacion)
+        self.cantidad += 1
+
+    def descartar(self, claves: Iterable[str]):
+        """
+        Quita del diario las operaciones de esos items.csv (ya volcadas a disco).
+        El resto se reescribe, con una marca nueva, en un archivo que reemplaza al anterior.
+        """
+        for clave in claves:
+            self.cantidad -= len(self.operaciones.pop(clave, []))
+
+        encabezado = self._nueva_marca()
+        ruta_tmp = self.ruta + ".tmp"
+        with open(ruta_tmp, "wb") as f:
+            f.write(encabezado)
+            for clave, operaciones in self.operaciones.items():
+                for operacion in operaciones:
+                    f.write(self._linea(clave, operacion))
+            f.flush()
+            os.fsync(f.fileno())
+            self._leido_hasta = f.tell()
+        os.replace(ruta_tmp, self.ruta)
+        self._marca = json.loads(encabezado)["diario"]
@@ -0,0 +1,201 @@
+# --- DETECCIÓN Y FUSIÓN DE LIBROS DUPLICADOS ---
+# guardar_libro agrega sin mirar lo que ya hay, así que un mismo libro puede
+# quedar varias veces, a veces con el autor o el género escritos distinto.
+# Comparar todos los pares es cuadrático; acá cada libro se compara solo con
+# sus candidatos:
+#   1. clave normalizada (título y autor sin acentos, mayúsculas ni signos):
+#      los idénticos quedan juntos sin comparar nada,
+#   2. cubetas de palabras con filtro de prefijo: si dos claves comparten al
+#      menos UMBRAL_PALABRAS de sus palabras de título y autor (sobre la
+#      unión), seguro comparten alguna de las más raras de cada una, así que
+#      cada clave solo entra en las cubetas de esas (orden de frecuencia
+#      global). Se usan palabras y no trigramas: los trigramas del castellano
+#      son pocos y todos comunes, y sus cubetas crecen con el catálogo,
+#   3. cada par candidato se confirma con SequenceMatcher (título y autor por
+#      separado) y los confirmados se unen en grupos (union-find).
+# Las cubetas de palabras raras son chicas: en la práctica es lineal en la
+# cantidad de libros.
+# Uso (desde la raíz del repositorio):
+#   python src/duplicados.py                       # informe
+#   python src/duplicados.py --json duplicados.json
+#   python src/duplicados.py --fusionar            # deja un libro por grupo
+import os
+import re
+import json
+import math
+import argparse
+from collections import Counter
+from difflib import SequenceMatcher
+from typing import Any, Dict, Iterable, List, Tuple
+
+from modelo_libro import Libro
+from similitud import normalizar_texto
+from motores_almacenamiento import MOTORES, MotorAlmacenamiento, crear_motor, ERRORES_ALMACENAMIENTO
+
+UMBRAL_PALABRAS = 0.5 # Alcanza con una palabra mal escrita en "Rayuela Julio Cortázar"
+UMBRAL_TITULO = 0.85
+UMBRAL_AUTOR = 0.8
+LIMITE_CUBETA = 200 # Palabras más frecuentes no separan candidatos (y harían crecer las cubetas con el catálogo)
+BASE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "data"))
+
+ClaveLibro = Tuple[str, ...] # (titulo, autor) normalizados, y el año con --por-anio
+
+
+def clave_normalizada(texto: str) -> str:
+    """Texto sin acentos, mayúsculas, signos ni espacios repetidos."""
+    return " ".join(re.findall(r"\w+", normalizar_texto(texto)))
+
+
+def _parecidos(a: str, b: str, umbral: float) -> bool:
+    """Ratio de SequenceMatcher >= umbral (sin contención: 'Fundación' no duplica a 'Fundación e Imperio')."""
+    if a == b:
+        return True
+    comparador = SequenceMatcher(None, a, b)
+    return (comparador.real_quick_ratio() >= umbral and comparador.quick_ratio() >= umbral
+            and comparador.ratio() >= umbral)
+
+
+def buscar_duplicados(libros: Iterable[Libro], umbral_titulo: float = UMBRAL_TITULO,
+                      umbral_autor: float = UMBRAL_AUTOR, por_anio: bool = False) -> List[List[Libro]]:
+    """
+    Grupos de libros que parecen el mismo (título y autor parecidos; con
+    por_anio, además del mismo año), del más grande al más chico. Cada grupo
+    conserva el orden en que llegaron los libros.
+    """
+    # 1. Claves normalizadas: los libros idénticos quedan en la misma
+    libros_por_clave: Dict[ClaveLibro, List[Libro]] = {}
+    for libro in libros:
+        clave = (clave_normalizada(libro.titulo), clave_normalizada(libro.autor))
+        if por_anio:
+            clave += (libro.anio,)
+        libros_por_clave.setdefault(clave, []).append(libro)
+    claves = list(libros_por_clave)
+
+    # 2 y 3. Filtro de prefijo (de la más chica a la más grande) y confirmación
+    padres = list(range(len(claves)))
+
+    def raiz(i: int) -> int:
+        while padres[i] != i:
+            padres[i] = padres[padres[i]]
+            i = padres[i]
+        return i
+
+    conjuntos = [set(clave[0].split()) | set(clave[1].split()) for clave in claves]
+    frecuencia = Counter(palabra for conjunto in conjuntos for palabra in conjunto)
+    cubetas: Dict[Tuple[Any, ...], List[int]] = {}
+    for i in sorted(range(len(claves)), key=lambda i: len(conjuntos[i])):
+        conjunto = conjuntos[i]
+        if not conjunto:
+            continue
+        # Si comparten >= UMBRAL_PALABRAS, comparten alguna de estas (las más raras).
+        # Como las claves llegan de menor a mayor, alcanza con indexar un prefijo más corto
+        en_orden = sorted(conjunto, key=lambda palabra: (frecuencia[palabra], palabra))
+        prefijo = en_orden[:len(conjunto) - math.ceil(UMBRAL_PALABRAS * len(conjunto)) + 1]
+        prefijo_indexado = en_orden[:len(conjunto) - math.ceil(2 * UMBRAL_PALABRAS / (1 + UMBRAL_PALABRAS) * len(conjunto)) + 1]
+        extra = tuple(claves[i][2:]) # El año con por_anio: solo se compara dentro del mismo
+
+        candidatos = set()
+        for palabra in prefijo:
+            if frecuencia[palabra] <= LIMITE_CUBETA:
+                candidatos.update(cubetas.get((palabra, *extra), ()))
+        for j in candidatos:
+            # comunes / (|i| + |j| - comunes) >= UMBRAL_PALABRAS, sin restar
+            if len(conjunto & conjuntos[j]) * (1 + UMBRAL_PALABRAS) < UMBRAL_PALABRAS * (len(conjunto) + len(conjuntos[j])):
+                continue
+            if raiz(i) == raiz(j):
+                continue # Ya están en el mismo grupo
+            (titulo_i, autor_i), (titulo_j, autor_j) = claves[i][:2], claves[j][:2]
+            if _parecidos(autor_i, autor_j, umbral_autor) and _parecidos(titulo_i, titulo_j, umbral_titulo):
+                padres[raiz(j)] = raiz(i)
+        for palabra in prefijo_indexado:
+            if frecuencia[palabra] <= LIMITE_CUBETA:
+                cubetas.setdefault((palabra, *extra), []).append(i)
+
+    grupos: Dict[int, List[Libro]] = {}
+    for i, clave in enumerate(claves):
+        grupos.setdefault(raiz(i), []).extend(libros_por_clave[clave])
+    return sorted((grupo for grupo in grupos.values() if len(grupo) > 1), key=len, reverse=True)
+
+
+def elegir_canonico(grupo: List[Libro]) -> Libro:
+    """El libro que queda al fusionar: el de la escritura más repetida (a igualdad, el primero)."""
+    escrituras = Counter((libro.genero, libro.autor, libro.titulo) for libro in grupo)
+    return max(grupo, key=lambda libro: escrituras[(libro.genero, libro.autor, libro.titulo)])
+
+
+def fusionar_duplicados(motor: MotorAlmacenamiento, grupos: List[List[Libro]]) -> int:
+    """Deja solo el libro canónico de cada grupo (cada items.csv se reescribe una vez). Devuelve cuántos se eliminaron."""
+    sobrantes = []
+    for grupo in grupos:
+        canonico = elegir_canonico(grupo)
+        sobrantes.extend(libro for libro in grupo if libro is not canonico)
+    return motor.eliminar_lote(sobrantes)
+
+
+def informe_duplicados(grupos: List[List[Libro]]) -> Dict[str, Any]:
+    """Informe apto para JSON: cada grupo con su libro canónico y el resto."""
+    return {
+        "grupos": len(grupos),
+        "sobrantes": sum(len(grupo) - 1 for grupo in grupos),
+        "detalle": [
+            {
+                "conservar": dict(canonico),
+                "eliminar": [dict(libro) for libro in grupo if libro is not canonico],
+            }
+            for grupo in grupos
+            for canonico in (elegir_canonico(grupo),)
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Busca libros duplicados en el catálogo y opcionalmente los fusiona")
+    parser.add_argument("--base", default=BASE_PATH, help="Carpeta de datos del árbol de CSV")
+    parser.add_argument("--motor", choices=MOTORES, default=os.environ.get("BIBLIOTECA_MOTOR", "csv").lower())
+    parser.add_argument("--sqlite", default=None, help="Archivo de la base SQLite (por defecto, junto a la carpeta de datos)")
+    parser.add_argument("--umbral-titulo", type=float, default=UMBRAL_TITULO)
+    parser.add_argument("--umbral-autor", type=float, default=UMBRAL_AUTOR)
+    parser.add_argument("--por-anio", action="store_true", help="Solo considerar duplicados los libros del mismo año")
+    parser.add_argument("--mostrar", type=int, default=20, help="Grupos a mostrar en pantalla")
+    parser.add_argument("--json", metavar="RUTA", default=None, help="Guardar el informe completo en JSON")
+    parser.add_argument("--fusionar", action="store_true", help="Eliminar los sobrantes de cada grupo")
+    parser.add_argument("--si", action="store_true", help="Fusionar sin pedir confirmación")
+    args = parser.parse_args()
+    if not (0 < args.umbral_titulo <= 1 and 0 < args.umbral_autor <= 1):
+        parser.error("Los umbrales deben estar entre 0 y 1")
+
+    motor = crear_motor(args.motor, args.base, args.sqlite)
+    try:
+        grupos = buscar_duplicados(motor.recorrer(), args.umbral_titulo, args.umbral_autor, args.por_anio)
+        informe = informe_duplicados(grupos)
+        if not grupos:
+            print("✅ No se encontraron libros duplicados.")
+            return
+
+        print(f"🔁 {informe['grupos']} grupos de duplicados ({informe['sobrantes']} libros sobrantes)")
+        for grupo in informe["detalle"][:args.mostrar]:
+            conservar = grupo["conservar"]
+            print(f"\n  ✔ {conservar['id']} ({conservar['anio']}, {conservar['paginas']} págs.)")
+            for libro in grupo["eliminar"]:
+                print(f"  ✘ {libro['id']} ({libro['anio']}, {libro['paginas']} págs.)")
+        if len(grupos) > args.mostrar:
+            print(f"\n  ... y {len(grupos) - args.mostrar} grupos más")
+
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(informe, f, ensure_ascii=False, indent=2)
+            print(f"\n📝 Informe guardado en {args.json}")
+
+        if args.fusionar:
+            if not args.si and input(f"\n¿Eliminar {informe['sobrantes']} libros sobrantes? (s/n): ").lower().strip() != "s":
+                print("Fusión cancelada.")
+                return
+            print(f"✅ Fusión terminada: {fusionar_duplicados(motor, grupos)} libros eliminados.")
+    except ERRORES_ALMACENAMIENTO as e:
+        print(f"❌ Error del almacenamiento: {e}")
+    finally:
+        motor.cerrar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+# --- ENRIQUECIMIENTO DEL CATÁLOGO CON GOOGLE BOOKS (proceso por lotes) ---
+# Busca cada libro del catálogo en la API (varias consultas a la vez, con un
+# límite de consultas por segundo) y completa o corrige su cantidad de páginas.
+# Uso (desde la raíz del repositorio):
+#   python src/enriquecer_catalogo.py                  # corrige las páginas
+#   python src/enriquecer_catalogo.py --solo-verificar # solo informa diferencias
+# Avanza de a lotes: las correcciones de cada lote se escriben juntas (cada
+# items.csv una sola vez) y recién después se anota el lote en el punto de
+# control, así que se puede cortar en cualquier momento y al volver a
+# ejecutarlo sigue donde quedó. Las respuestas de la API salen de la caché de
+# cliente_api si ya se pidieron.
+import os
+import json
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import requests
+
+from modelo_libro import Libro
+from similitud import normalizar_texto, similitud_normalizada
+from almacenamiento import ruta_auxiliar
+from cliente_api import ClienteLibros, LimitadorTasa
+from motores_almacenamiento import MOTORES, MotorAlmacenamiento, crear_motor, ERRORES_ALMACENAMIENTO
+
+TAMANIO_LOTE_ENRIQUECIMIENTO = 200
+HILOS_ENRIQUECIMIENTO = 8
+CONSULTAS_POR_SEGUNDO = 5 # Las que salen a la red (las de la caché no esperan)
+TOLERANCIA_PAGINAS = 0.1 # Diferencia relativa que se acepta como otra edición del mismo libro
+UMBRAL_TITULO = 0.85
+UMBRAL_AUTOR = 0.6
+BASE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "data"))
+
+# Resultado de cada libro
+VERIFICADO, COMPLETADO, CORREGIDO, SIN_COINCIDENCIA, ERROR = "verificados", "completados", "corregidos", "sin_coincidencia", "errores"
+
+
+def ruta_punto_control(base_path: str, solo_verificar: bool = False) -> str:
+    """Cada modo tiene el suyo: una verificación no cuenta como corrección hecha."""
+    return ruta_auxiliar(base_path, "verificacion.jsonl" if solo_verificar else "enriquecimiento.jsonl")
+
+
+def clave_libro(libro: Libro, ocurrencia: int = 0) -> str:
+    """
+    genero/autor/anio/titulo#n, donde n cuenta los libros con ese mismo título
+    en su items.csv (en el orden del recorrido): dos filas repetidas no
+    comparten clave y una no se saltea por haber terminado la otra.
+    """
+    return f"{libro.genero}/{libro.autor}/{libro.anio}/{libro.titulo}#{ocurrencia}"
+
+
+def con_claves(libros: Iterable[Libro]) -> Iterator[Tuple[str, Libro]]:
+    """(clave, libro) de cada libro, numerando los títulos repetidos dentro de su items.csv."""
+    ocurrencias: Dict[str, int] = {}
+    for libro in libros:
+        base = clave_libro(libro)
+        ocurrencia = ocurrencias.get(base, 0)
+        ocurrencias[base] = ocurrencia + 1
+        yield clave_libro(libro, ocurrencia), libro
+
+
+def paginas_en_api(cliente: ClienteLibros, libro: Libro) -> Optional[int]:
+    """
+    Páginas del volumen de la API que mejor coincide con el libro (título
+    parecido y, si la API informa autores, alguno parecido), o None si no hay.
+    """
+    titulo, autor = libro.titulo.replace('"', ""), libro.autor.replace('"', "")
+    respuesta = cliente.consultar({"q": f'intitle:"{titulo}" inauthor:"{autor}"', "maxResults": 10, "printType": "books"})
+
+    titulo_norm, autor_norm = normalizar_texto(libro.titulo), normalizar_texto(libro.autor)
+    mejor, mejor_puntaje = None, 0.0
+    for item in respuesta.get("items", []):
+        info = item.get("volumeInfo", {})
+        paginas = info.get("pageCount")
+        if not isinstance(paginas, int) or paginas <= 0:
+            continue
+        autores = info.get("authors") or []
+        if autores and max(similitud_normalizada(autor_norm, normalizar_texto(a)) for a in autores) < UMBRAL_AUTOR:
+            continue
+        puntaje = similitud_normalizada(titulo_norm, normalizar_texto(info.get("title", "")))
+        if puntaje >= UMBRAL_TITULO and puntaje > mejor_puntaje:
+            mejor, mejor_puntaje = paginas, puntaje
+    return mejor
+
+
+def clasificar(libro: Libro, paginas_api: Optional[int], tolerancia: float) -> str:
+    if paginas_api is None:
+        return SIN_COINCIDENCIA
+    if libro.paginas <= 0:
+        return COMPLETADO
+    if abs(paginas_api - libro.paginas) <= tolerancia * libro.paginas:
+        return VERIFICADO
+    return CORREGIDO
+
+
+class PuntoControl:
+    """
+    Archivo JSONL con una línea por lote terminado: {"libros": [claves],
+    "conteo": {resultado: cantidad}}. Una última línea cortada se ignora.
+    """
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self.hechos: Set[str] = set()
+        self.conteo: Dict[str, int] = {}
+        try:
+            with open(ruta, "r", encoding="utf-8") as f:
+                for linea in f:
+                    try:
+                        lote = json.loads(linea)
+                    except ValueError:
+                        continue
+                    self.hechos.update(lote["libros"])
+                    for resultado, cantidad in lote["conteo"].items():
+                        self.conteo[resultado] = self.conteo.get(resultado, 0) + cantidad
+        except OSError:
+            pass
+
+    def anotar(self, claves: Iterable[str], conteo: Dict[str, int]):
+        with open(self.ruta, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"libros": list(claves), "conteo": conteo}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def borrar(self):
+        try:
+            os.remove(self.ruta)
+        except FileNotFoundError:
+            pass
+
+
+def enriquecer(motor: MotorAlmacenamiento, cliente: ClienteLibros, punto_control: PuntoControl,
+               hilos: int = HILOS_ENRIQUECIMIENTO, tamanio_lote: int = TAMANIO_LOTE_ENRIQUECIMIENTO,
+               tolerancia: float = TOLERANCIA_PAGINAS, solo_verificar: bool = False) -> Dict[str, Any]:
+    """
+    Recorre el catálogo en flujo salteando los libros del punto de control.
+    Devuelve el resumen acumulado (con lo de ejecuciones anteriores) y
+    'completo': False si se cortó porque la API dejó de responder.
+    """
+    resumen: Dict[str, Any] = {resultado: punto_control.conteo.get(resultado, 0)
+                               for resultado in (VERIFICADO, COMPLETADO, CORREGIDO, SIN_COINCIDENCIA)}
+    resumen.update(retomados=len(punto_control.hechos), escritos=0, errores=0, completo=True, ejemplos=[])
+    inicio = time.perf_counter()
+    pendientes = ((clave, libro) for clave, libro in con_claves(motor.recorrer()) if clave not in punto_control.hechos)
+
+    def consultar(pendiente: Tuple[str, Libro]) -> Tuple[str, Libro, Optional[int], Optional[str]]:
+        clave, libro = pendiente
+        try:
+            return clave, libro, paginas_en_api(cliente, libro), None
+        except requests.RequestException as e:
+            return clave, libro, None, str(e)
+
+    with ThreadPoolExecutor(max_workers=hilos) as executor:
+        while True:
+            lote = list(islice(pendientes, tamanio_lote))
+            if not lote:
+                break
+
+            conteo: Dict[str, int] = {}
+            hechos: List[str] = []
+            cambios: List[Tuple[Libro, str, int]] = []
+            for clave, libro, paginas_api, error in executor.map(consultar, lote):
+                if error is not None:
+                    resumen[ERROR] += 1 # No se anota: se reintenta en la próxima ejecución
+                    resumen["ultimo_error"] = error
+                    continue
+                resultado = clasificar(libro, paginas_api, tolerancia)
+                conteo[resultado] = conteo.get(resultado, 0) + 1
+                hechos.append(clave)
+                if resultado in (COMPLETADO, CORREGIDO):
+                    cambios.append((libro, libro.titulo, paginas_api))
+                    if len(resumen["ejemplos"]) < 10:
+                        resumen["ejemplos"].append(f"{libro.id}: {libro.paginas} -> {paginas_api}")
+
+            if not hechos:
+                resumen["completo"] = False # Falló todo el lote: la API no está respondiendo
+                break
+            if cambios and not solo_verificar:
+                resumen["escritos"] += motor.actualizar_lote(cambios) # Un solo volcado por lote (cada items.csv una vez)
+            punto_control.anotar(hechos, conteo)
+            for resultado, cantidad in conteo.items():
+                resumen[resultado] += cantidad
+
+    resumen["segundos"] = round(time.perf_counter() - inicio, 3)
+    return resumen
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Completa o corrige las páginas del catálogo con Google Books")
+    parser.add_argument("--base", default=BASE_PATH, help="Carpeta de datos del árbol de CSV")
+    parser.add_argument("--motor", choices=MOTORES, default=os.environ.get("BIBLIOTECA_MOTOR", "csv").lower())
+    parser.add_argument("--sqlite", default=None, help="Archivo de la base SQLite (por defecto, junto a la carpeta de datos)")
+    parser.add_argument("--hilos", type=int, default=HILOS_ENRIQUECIMIENTO, help="Consultas a la API a la vez")
+    parser.add_argument("--tasa", type=float, default=CONSULTAS_POR_SEGUNDO, help="Consultas por segundo a la API")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA_PAGINAS,
+                        help="Diferencia relativa de páginas que no se corrige (0.1 = 10%%)")
+    parser.add_argument("--solo-verificar", action="store_true", help="Informar las diferencias sin escribir")
+    parser.add_argument("--reiniciar", action="store_true", help="Ignorar el punto de control y empezar de cero")
+    args = parser.parse_args()
+    if args.hilos < 1 or args.tasa <= 0 or args.tolerancia < 0:
+        parser.error("--hilos y --tasa deben ser positivos y --tolerancia no puede ser negativa")
+
+    punto_control = PuntoControl(ruta_punto_control(args.base, args.solo_verificar))
+    if args.reiniciar:
+        punto_control.borrar()
+        punto_control = PuntoControl(punto_control.ruta)
+    elif punto_control.hechos:
+        print(f"↩️ Retomando: {len(punto_control.hechos)} libros ya revisados en una ejecución anterior.")
+
+    motor = crear_motor(args.motor, args.base, args.sqlite)
+    cliente = ClienteLibros(limitador=LimitadorTasa(args.tasa, rafaga=args.hilos))
+    try:
+        resumen = enriquecer(motor, cliente, punto_control, hilos=args.hilos,
+                             tolerancia=args.tolerancia, solo_verificar=args.solo_verificar)
+    except ERRORES_ALMACENAMIENTO as e:
+        print(f"❌ Falló la escritura de las correcciones: {e}. Volvé a ejecutarlo para retomar.")
+        return
+    except KeyboardInterrupt:
+        print("\n⏸️ Interrumpido. Volvé a ejecutarlo para retomar desde el último lote.")
+        return
+    finally:
+        motor.cerrar()
+        cliente.cerrar()
+
+    corregidos = "A corregir" if args.solo_verificar else "Corregidos"
+    print(f"✅ Verificados: {resumen[VERIFICADO]} | Completados: {resumen[COMPLETADO]} | "
+          f"{corregidos}: {resumen[CORREGIDO]} | Sin coincidencia: {resumen[SIN_COINCIDENCIA]} "
+          f"({resumen['segundos']} s)")
+    if not args.solo_verificar:
+        print(f"   Libros escritos en esta ejecución: {resumen['escritos']}")
+    for ejemplo in resumen["ejemplos"]:
+        print(f"   - {ejemplo}")
+    print(f"🗄️ Caché de la API: {cliente.cache.resumen()}")
+
+    if not resumen["completo"]:
+        print(f"⚠️ La API dejó de responder ({resumen['ultimo_error']}). Volvé a ejecutarlo para retomar desde el último lote.")
+    elif resumen[ERROR]:
+        print(f"⚠️ {resumen[ERROR]} libros no se pudieron consultar: se reintentan en la próxima ejecución.")
+    else:
+        punto_control.borrar() # Terminó todo: la próxima ejecución empieza de cero
+
+
+if __name__ == "__main__":
+    main()
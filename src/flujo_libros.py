@@ -0,0 +1,41 @@
+# --- ETAPAS COMPONIBLES PARA PROCESAR LIBROS EN FLUJO ---
+# Todas reciben y devuelven iterables perezosos, así que se pueden encadenar:
+#   limitar(filtrar(iterar_libros(base), condicion), 20)
+# y el recorrido del árbol se detiene apenas se obtiene lo necesario.
+from itertools import islice
+from typing import Iterable, Iterator, Callable, Optional, List, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def filtrar(elementos: Iterable[T], condicion: Callable[[T], bool]) -> Iterator[T]:
+    """Deja pasar solo los elementos que cumplen la condición."""
+    return (elemento for elemento in elementos if condicion(elemento))
+
+
+def mapear(elementos: Iterable[T], funcion: Callable[[T], R]) -> Iterator[R]:
+    """Transforma cada elemento."""
+    return (funcion(elemento) for elemento in elementos)
+
+
+def limitar(elementos: Iterable[T], cantidad: int) -> Iterator[T]:
+    """Corta el flujo después de 'cantidad' elementos."""
+    return islice(elementos, cantidad)
+
+
+def primero(elementos: Iterable[T], condicion: Optional[Callable[[T], bool]] = None) -> Optional[T]:
+    """Primer elemento (que cumpla la condición, si se indica) o None. Corta en cuanto lo encuentra."""
+    if condicion is not None:
+        elementos = filtrar(elementos, condicion)
+    return next(iter(elementos), None)
+
+
+def paginar(elementos: Iterable[T], tamanio: int) -> Iterator[List[T]]:
+    """Agrupa el flujo en páginas de 'tamanio' elementos (la última puede ser más corta)."""
+    iterador = iter(elementos)
+    while True:
+        pagina = list(islice(iterador, tamanio))
+        if not pagina:
+            return
+        yield pagina
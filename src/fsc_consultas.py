@@ -0,0 +1,44 @@
+# --- CONSULTAS POR RANGO Y COMPUESTAS (año, páginas, género, autor) ---
+from typing import Optional, Tuple, Dict, Any
+
+from motores_almacenamiento import obtener_motor
+# consultar_libros vive en 'indices_orden' (se reexporta desde acá)
+from indices_orden import consultar_libros
+
+
+def _pedir_entero(mensaje: str) -> Tuple[bool, Optional[int]]:
+    """Pide un entero opcional. Devuelve (ok, valor); vacío -> (True, None)."""
+    valor = input(mensaje).strip()
+    if not valor:
+        return True, None
+    try:
+        return True, int(valor)
+    except ValueError:
+        print("Debes ingresar un número.")
+        return False, None
+
+
+def consulta_compuesta(base_path: str):
+    """Consulta de libros combinando rangos de año y páginas con género y autor."""
+    print("\n🔎 CONSULTA POR RANGOS (dejar vacío para no filtrar por ese dato)\n")
+
+    filtros: Dict[str, Any] = {}
+    for clave, mensaje in (("anio_min", "Año desde: "), ("anio_max", "Año hasta: "),
+                           ("paginas_min", "Páginas mínimas: "), ("paginas_max", "Páginas máximas: ")):
+        ok, valor = _pedir_entero(mensaje)
+        if not ok:
+            return
+        filtros[clave] = valor
+    filtros["genero"] = input("Género: ").strip() or None
+    filtros["autor"] = input("Autor: ").strip() or None
+
+    resultado = obtener_motor(base_path).consultar(**filtros)
+    if not resultado:
+        print("No se encontraron libros con ese criterio.")
+        return
+
+    print(f"\nSe encontraron {len(resultado)} libros:\n---")
+    for i, libro in enumerate(resultado, start=1):
+        print(f"[{i}] {libro.titulo} ({libro.paginas} pgs)")
+        print(f"    Ubicación: {libro.genero} / {libro.autor} / {libro.anio}")
+    print("---")
@@ -1,45 +1,71 @@
-from typing import Dict
-from almacenamiento import consolidar_libros_recursivamente
+import json
+from typing import Dict, List
+from motores_almacenamiento import obtener_motor
+from analitica_catalogo import TablaCatalogo, informe_analitico, mostrar_informe
+
+
+def _mostrar_desglose(titulo: str, desglose: Dict[str, List[int]]):
+    """Imprime un desglose {clave: [cantidad, paginas]} ordenado por cantidad."""
+    print(f"\n{titulo}:")
+    for clave, (cantidad, paginas) in sorted(desglose.items(), key=lambda item: item[1][0], reverse=True):
+        print(f"  - {clave}: {cantidad} libros ({paginas / cantidad:.2f} páginas promedio)")
+
 
 def estadisticas(base_path: str):
     """
-    Calcula y muestra estadísticas básicas globales sobre los libros almacenados.
+    Muestra estadísticas básicas globales sobre los libros almacenados.
+    Los agregados salen del motor de almacenamiento: en el árbol de CSV se
+    mantienen al día con cada cambio; en SQLite son consultas GROUP BY.
     """
-    lista_libros = consolidar_libros_recursivamente(base_path, [])
-    
-    if not lista_libros:
+    stats = obtener_motor(base_path).agregados()
+
+    if not stats.total_libros:
         print("\nNo hay libros registrados para calcular estadísticas.")
         return
 
     print("\n📊 ESTADÍSTICAS GLOBALES DE LIBROS 📊\n")
 
-    total_libros = len(lista_libros)
-    total_paginas = 0
-    libros_por_genero: Dict[str, int] = {}
+    genero_mas_frecuente, cantidad_genero = stats.genero_mas_frecuente()
+    libro_mas_largo = stats.libro_mas_largo()
 
-    for libro in lista_libros:
-        genero = libro['genero']
-        libros_por_genero[genero] = libros_por_genero.get(genero, 0) + 1
-        
-        try:
-            paginas = int(libro['paginas'])
-            total_paginas += paginas
-        except (ValueError, TypeError):
-            pass
-
-    promedio_paginas = total_paginas / total_libros if total_libros else 0
-    libro_mas_largo = max(lista_libros, key=lambda x: int(x['paginas']), default=None)
-    genero_mas_frecuente = max(libros_por_genero, key=libros_por_genero.get, default=None)
-
-    print(f"📚 Total de libros registrados: {total_libros}")
-    print(f"📄 Promedio de páginas por libro: {promedio_paginas:.2f}")
-    print(f"🏆 Género más frecuente: {genero_mas_frecuente} ({libros_por_genero[genero_mas_frecuente]} libros)")
+    print(f"📚 Total de libros registrados: {stats.total_libros}")
+    print(f"📄 Promedio de páginas por libro: {stats.promedio_paginas:.2f}")
+    print(f"🏆 Género más frecuente: {genero_mas_frecuente} ({cantidad_genero} libros)")
     
     if libro_mas_largo:
-        print(f"📘 Libro con más páginas: '{libro_mas_largo['titulo']}' ({libro_mas_largo['paginas']} páginas)")
+        print(f"📘 Libro con más páginas: '{libro_mas_largo[0]}' ({libro_mas_largo[1]} páginas)")
 
     print("\nRecuento por género:")
-    for genero, count in sorted(libros_por_genero.items(), key=lambda item: item[1], reverse=True):
+    for genero, (count, _) in sorted(stats.por_genero.items(), key=lambda item: item[1][0], reverse=True):
         print(f"  - {genero}: {count} libros")
+
+    desglose = input("\n¿Ver desglose por autor, por año o el análisis completo? (autor/anio/analisis/no): ").lower().strip()
+    if desglose == "autor":
+        _mostrar_desglose("Recuento por autor", stats.por_autor)
+    elif desglose in ("anio", "año"):
+        _mostrar_desglose("Recuento por año", stats.por_anio)
+    elif desglose in ("analisis", "análisis"):
+        analisis_catalogo(base_path)
     
     print("---------------------------------------")
+
+
+def analisis_catalogo(base_path: str):
+    """
+    Percentiles e histograma de páginas y desgloses por género, autor y año
+    (analitica_catalogo: en columnas, con NumPy si está instalado). Ofrece
+    guardar el informe completo en JSON.
+    """
+    informe = informe_analitico(TablaCatalogo(obtener_motor(base_path).recorrer()))
+    mostrar_informe(informe)
+    if not informe["total_libros"]:
+        return
+
+    ruta = input("\nRuta para guardar el informe en JSON (Enter para omitir): ").strip()
+    if ruta:
+        try:
+            with open(ruta, "w", encoding="utf-8") as f:
+                json.dump(informe, f, ensure_ascii=False, indent=2)
+            print(f"📝 Informe guardado en {ruta}")
+        except OSError as e:
+            print(f"❌ No se pudo guardar el informe: {e}")
@@ -1,38 +1,39 @@
 # --- FUNCIONES DE PERSISTENCIA (CSV) Y MANEJO DE EXCEPCIONES ---
 import os
-import csv
-from fsc_jerarquia import ensure_path_for_book
+from almacenamiento import reescribir_csv
+from motores_almacenamiento import obtener_motor, ERRORES_ALMACENAMIENTO
 from typing import List, Dict, Tuple, Any
 
 CSV_HEADERS = ["Título", "Páginas"]
 
 def guardar_datos_csv(ruta_csv: str, libros_en_memoria: List[Dict]):
-    """Sobrescribe un archivo CSV específico (modo 'w') con la lista de diccionarios actualizada."""
-    if not libros_en_memoria:
-        try:
-            if os.path.exists(ruta_csv):
-                os.remove(ruta_csv)
-            return
-        except OSError as e:
-            print(f"❌ Error al intentar eliminar el archivo vacío {ruta_csv}: {e}")
-            return
-    
+    """
+    Sobrescribe un archivo CSV específico con la lista de diccionarios actualizada.
+    Se escribe en un temporal y se reemplaza (os.replace): un corte a mitad de
+    la escritura no deja el archivo truncado. Sin libros, el archivo se elimina.
+    """
+    filas = [(libro.get('titulo', ''), libro.get('paginas', 0)) for libro in libros_en_memoria]
     try:
-        with open(ruta_csv, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=CSV_HEADERS)
-            writer.writeheader()
-            for libro in libros_en_memoria:
-                writer.writerow({
-                'Título': libro.get('titulo', ''),
-                'Páginas': libro.get('paginas', 0)
-               })
-
-        print(f"✅ Archivo actualizado: {ruta_csv} ({len(libros_en_memoria)} libros)")
+        reescribir_csv(ruta_csv, filas)
     except OSError as e:
         print(f"Error al escribir en el archivo {ruta_csv}: {e}")
+        return
+    if filas:
+        print(f"✅ Archivo actualizado: {ruta_csv} ({len(filas)} libros)")
 
 # --- FUNCION DE VALIDACIÓN ESTRICTA (Fase 3, Punto 1) ---
 
+def nivel_jerarquia_valido(valor: str) -> bool:
+    """
+    Si el valor sirve como nombre de carpeta de un nivel (genero/autor/anio):
+    sin separadores de ruta ni '..', y no vacío ni hecho solo de puntos. Si no,
+    'a/b' o '../x' terminarían en otra carpeta (o fuera de la carpeta de datos).
+    """
+    separadores = {"/", os.sep, os.altsep or "/", "\x00"}
+    return (bool(valor.strip(". ")) and ".." not in valor
+            and not any(separador in valor for separador in separadores))
+
+
 def validar_entrada_libro(data: Dict[str, str]) -> Tuple[bool, str | Dict[str, Any]]:
     """Valida los datos del libro antes de guardarlo."""
     
@@ -51,6 +52,11 @@ def validar_entrada_libro(data: Dict[str, str]) -> Tuple[bool, str | Dict[str, A
     if anio_int <= 0 or paginas_int <= 0:
         return False, "El Año de publicación y las Páginas deben ser positivos."
 
+    # Género y autor son nombres de carpeta (el año ya es un entero positivo)
+    for campo in ("genero", "autor"):
+        if not nivel_jerarquia_valido(str(data[campo]).strip()):
+            return False, f"El {campo} no puede contener separadores de carpeta ni '..', ni ser solo puntos."
+
     # Retornar diccionario validado
     libro_data = {
         "genero": str(data['genero']).strip(),
@@ -75,28 +81,11 @@ def guardar_libro(base_path: str, data_input: Dict[str, str]):
         return
 
     libro_data: Dict[str, Any] = resultado
-    
-    niveles_jerarquia = {
-        'genero': libro_data['genero'], 
-        'autor': libro_data['autor'], 
-        'anio': libro_data['anio']
-    }
-    
-    try:
-        ruta_csv = ensure_path_for_book(base_path, niveles_jerarquia)
-        existe = os.path.exists(ruta_csv)
-
-        with open(ruta_csv, "a", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            if not existe:
-                writer.writerow(CSV_HEADERS) 
-            
-            writer.writerow([libro_data['titulo'], libro_data['paginas']])
-
-        print(f"\nLibro '{libro_data['titulo']}' guardado jerárquicamente en {ruta_csv}")
-        
-    except OSError as e:
-        print(f"Error del sistema de archivos al guardar el libro: {e}")
 
+    try:
+        # El motor configurado decide dónde va (árbol de CSV: crea genero/autor/anio si falta)
+        ubicacion = obtener_motor(base_path).insertar(libro_data)
+        print(f"\nLibro '{libro_data['titulo']}' guardado en {ubicacion}")
 
-   
+    except ERRORES_ALMACENAMIENTO as e:
+        print(f"Error del almacenamiento al guardar el libro: {e}")
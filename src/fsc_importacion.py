@@ -0,0 +1,129 @@
+# --- IMPORTACIÓN MASIVA DE LIBROS (CSV / JSONL) ---
+import os
+import csv
+import json
+import time
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Any, Set, TextIO
+
+from fsc_guardado import validar_entrada_libro
+from motores_almacenamiento import obtener_motor, ERRORES_ALMACENAMIENTO
+from similitud import normalizar_texto
+
+TAMANIO_LOTE_IMPORTACION = 50000
+MAX_ERRORES_EN_RESUMEN = 10
+
+# Encabezados aceptados en el CSV de origen (sin acentos ni mayúsculas) -> campo
+ALIAS_COLUMNAS = {
+    "genero": "genero", "autor": "autor", "anio": "anio", "ano": "anio",
+    "titulo": "titulo", "paginas": "paginas",
+}
+
+
+def leer_fuente_importacion(ruta_origen: str) -> Iterator[Dict[str, Any]]:
+    """
+    Genera filas {genero, autor, anio, titulo, paginas} desde un .jsonl (un
+    objeto por línea) o un .csv con encabezados. Se lee en flujo, sin cargar
+    todo el archivo en memoria.
+    """
+    with open(ruta_origen, "r", encoding="utf-8", newline="") as f:
+        yield from leer_filas_importacion(f, ruta_origen.lower().endswith((".jsonl", ".ndjson")))
+
+
+def leer_filas_importacion(f: TextIO, es_jsonl: bool) -> Iterator[Dict[str, Any]]:
+    """Como leer_fuente_importacion, sobre un archivo ya abierto (ej. la entrada estándar)."""
+    if es_jsonl:
+        for numero, linea in enumerate(f, start=1):
+            if not linea.strip():
+                continue
+            try:
+                objeto = json.loads(linea)
+            except ValueError:
+                objeto = None
+            yield objeto if isinstance(objeto, dict) else {"_error": f"línea {numero}: JSON inválido"}
+        return
+
+    reader = csv.reader(f)
+    encabezados = next(reader, None) or []
+    campos = [ALIAS_COLUMNAS.get(normalizar_texto(e.strip()), e) for e in encabezados]
+    for fila in reader:
+        yield dict(zip(campos, fila))
+
+
+def importar_libros(base_path: str, filas: Iterable[Dict[str, Any]],
+                    tamanio_lote: int = TAMANIO_LOTE_IMPORTACION) -> Dict[str, Any]:
+    """
+    Alta masiva: valida cada fila con validar_entrada_libro y entrega las
+    válidas, por lote, al motor de almacenamiento (en el árbol de CSV cada
+    carpeta se crea una sola vez y cada items.csv se abre una sola vez por
+    lote). Devuelve un resumen de la importación.
+    """
+    resumen: Dict[str, Any] = {
+        "leidos": 0, "importados": 0, "rechazados": 0,
+        "carpetas_creadas": 0, "archivos_escritos": 0, "errores": [],
+    }
+    motor = obtener_motor(base_path)
+    archivos_tocados: Set[str] = set()
+    inicio = time.perf_counter()
+    iterador = iter(filas)
+
+    while True:
+        lote = list(islice(iterador, tamanio_lote))
+        if not lote:
+            break
+
+        # 1. Validar
+        validos: List[Dict[str, Any]] = []
+        for fila in lote:
+            resumen["leidos"] += 1
+            es_valido, resultado = (False, fila["_error"]) if "_error" in fila else validar_entrada_libro(fila)
+            if not es_valido:
+                resumen["rechazados"] += 1
+                if len(resumen["errores"]) < MAX_ERRORES_EN_RESUMEN:
+                    resumen["errores"].append(f"Fila {resumen['leidos']}: {resultado}")
+                continue
+            validos.append(resultado)
+
+        # 2. Un alta masiva por lote en el motor
+        parcial = motor.insertar_lote(validos)
+        for clave in ("importados", "rechazados", "carpetas_creadas"):
+            resumen[clave] += parcial[clave]
+        resumen["errores"].extend(parcial["errores"])
+        archivos_tocados.update(parcial["archivos"])
+
+    resumen["archivos_escritos"] = len(archivos_tocados)
+    resumen["segundos"] = round(time.perf_counter() - inicio, 3)
+    return resumen
+
+
+def imprimir_resumen_importacion(resumen: Dict[str, Any]):
+    """Reporte final de una importación masiva."""
+    print("\n📥 RESUMEN DE IMPORTACIÓN")
+    print(f"  Filas leídas:      {resumen['leidos']}")
+    print(f"  Libros importados: {resumen['importados']}")
+    print(f"  Filas rechazadas:  {resumen['rechazados']}")
+    print(f"  Carpetas creadas:  {resumen['carpetas_creadas']}")
+    print(f"  Archivos escritos: {resumen['archivos_escritos']}")
+    print(f"  Tiempo: {resumen['segundos']} s")
+    if resumen["errores"]:
+        print(f"  Primeros errores (máx. {MAX_ERRORES_EN_RESUMEN}):")
+        for error in resumen["errores"]:
+            print(f"   - {error}")
+
+
+def importar_catalogo(base_path: str):
+    """Opción de menú: importa libros desde un archivo .csv o .jsonl."""
+    ruta_origen = input("Ruta del archivo a importar (.csv con encabezados o .jsonl): ").strip().strip('"')
+    if not os.path.isfile(ruta_origen):
+        print("❌ El archivo no existe.")
+        return
+
+    try:
+        resumen = importar_libros(base_path, leer_fuente_importacion(ruta_origen))
+    except (UnicodeDecodeError, csv.Error) as e:
+        print(f"❌ Error al leer el archivo de origen: {e}")
+        return
+    except ERRORES_ALMACENAMIENTO as e:
+        print(f"❌ Error de lectura o escritura durante la importación: {e}")
+        return
+    imprimir_resumen_importacion(resumen)
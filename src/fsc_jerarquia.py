@@ -9,10 +9,11 @@ CSV_HEADERS = ["Título", "Páginas"] # Atributos del ítem final
 
 # --- FUNCIONES DE MANIPULACIÓN DE RUTAS Y CREACIÓN JERÁRQUICA (os) ---
 
-def ensure_path_for_book(base_path: str, niveles: Dict[str, str]) -> str:
+def ensure_path_for_book(base_path: str, niveles: Dict[str, str], mostrar: bool = True) -> str:
     """
     Crea la estructura de carpetas jerárquica (genero/autor/anio/) 
     si no existe y devuelve la ruta completa del archivo CSV final.
+    Con mostrar=False no imprime nada al crear (útil para importaciones masivas).
     """
     ruta_dir = os.path.join(
         base_path, 
@@ -24,7 +25,8 @@ def ensure_path_for_book(base_path: str, niveles: Dict[str, str]) -> str:
     # Crear la estructura de carpetas de forma dinámica (os.makedirs)
     try:
         os.makedirs(ruta_dir, exist_ok=True)
-        print(f"📁 Carpeta verificada o creada: {ruta_dir}")
+        if mostrar:
+            print(f"📁 Carpeta verificada o creada: {ruta_dir}")
     except OSError as e:
         print(f"❌ Error al crear la estructura de carpetas {ruta_dir}: {e}")
         return None
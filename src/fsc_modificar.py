@@ -1,65 +1,62 @@
-from typing import List, Dict, Tuple
 from fsc_mostrar import _seleccionar_item_por_id
-from fsc_guardado import guardar_datos_csv
+from motores_almacenamiento import obtener_motor, ERRORES_ALMACENAMIENTO
+
 
 def modificar_libro(base_path: str):
     """Modificación de Item (Update)"""
-    
-    lista_libros, indice_global = _seleccionar_item_por_id(base_path, "modificar")
-    if indice_global == -1:
+
+    libro_a_modificar = _seleccionar_item_por_id(base_path, "modificar")
+    if libro_a_modificar is None:
         return
 
-    libro_a_modificar = lista_libros[indice_global]
-    ruta_csv_original = libro_a_modificar['ruta_csv']
-    
     print(f"\n✏️ Modificando: {libro_a_modificar['titulo']} ({libro_a_modificar['paginas']} páginas)")
 
     nuevo_titulo = input(f"Nuevo título (dejar vacío para no cambiar): ").strip()
     nuevas_paginas_str = input(f"Nuevas páginas (dejar vacío para no cambiar): ").strip()
 
-    if nuevo_titulo:
-        libro_a_modificar['titulo'] = nuevo_titulo
-        libro_a_modificar['id'] = f"{libro_a_modificar['genero']}_{libro_a_modificar['autor']}_{nuevo_titulo}"
+    titulo = nuevo_titulo or libro_a_modificar['titulo']
+    paginas = libro_a_modificar['paginas']
 
     if nuevas_paginas_str:
         try:
-            paginas_int = int(nuevas_paginas_str)
-            if paginas_int <= 0:
+            paginas = int(nuevas_paginas_str)
+            if paginas <= 0:
                 print("❌ Las páginas deben ser un número positivo.")
                 return
-            libro_a_modificar['paginas'] = paginas_int
         except ValueError:
             print("❌ Las páginas deben ser un número entero.")
             return
 
-    libros_mismo_csv = [lib for lib in lista_libros if lib['ruta_csv'] == ruta_csv_original]
-    
-    guardar_datos_csv(ruta_csv_original, libros_mismo_csv)
-    print(f"\n✅ Libro '{libro_a_modificar['titulo']}' actualizado correctamente.")
+    # En el árbol de CSV el cambio se agrega al diario; el items.csv se reescribe al compactar
+    try:
+        actualizado = obtener_motor(base_path).actualizar(libro_a_modificar, titulo, paginas)
+    except ERRORES_ALMACENAMIENTO as e:
+        print(f"\n❌ Falló la modificación. No se pudo registrar el cambio: {e}")
+        return
+    if not actualizado:
+        print("❌ El libro ya no está guardado (¿fue modificado por otro proceso?).")
+        return
+    print(f"\n✅ Libro '{titulo}' actualizado correctamente.")
 
 
 def eliminar_libro(base_path: str):
     """Eliminación de Item (Delete)"""
-    
-    lista_libros, indice_global = _seleccionar_item_por_id(base_path, "eliminar")
-    if indice_global == -1:
-        return
 
-    libro_a_eliminar = lista_libros[indice_global]
-    ruta_csv_original = libro_a_eliminar['ruta_csv']
+    libro_elegido = _seleccionar_item_por_id(base_path, "eliminar")
+    if libro_elegido is None:
+        return
 
-    confirm = input(f"¿Seguro que querés eliminar '{libro_a_eliminar['titulo']}'? (s/n): ").lower()
+    confirm = input(f"¿Seguro que querés eliminar '{libro_elegido['titulo']}'? (s/n): ").lower()
     if confirm != "s":
         print("Operación cancelada.")
         return
 
-    libros_mismo_csv_actualizado = [
-        lib for i, lib in enumerate(lista_libros)
-        if lib['ruta_csv'] == ruta_csv_original and i != indice_global
-    ]
-    
     try:
-        guardar_datos_csv(ruta_csv_original, libros_mismo_csv_actualizado)
-        print(f"\n✅ Libro '{libro_a_eliminar['titulo']}' eliminado correctamente.")
-    except Exception as e:
-        print(f"\n❌ Falló la eliminación. Problemas de escritura en {ruta_csv_original}: {e}")
+        eliminado = obtener_motor(base_path).eliminar(libro_elegido)
+    except ERRORES_ALMACENAMIENTO as e:
+        print(f"\n❌ Falló la eliminación. Problemas de escritura en {libro_elegido['ruta_csv']}: {e}")
+        return
+    if not eliminado:
+        print("❌ El libro ya no está guardado (¿fue modificado por otro proceso?).")
+        return
+    print(f"\n✅ Libro '{libro_elegido['titulo']}' eliminado correctamente.")
@@ -1,39 +1,45 @@
 # --- FUNCIONALIDADES (CRUD y Consultas) ---
-from typing import List, Dict, Tuple
-import os
-import csv
-from almacenamiento import consolidar_libros_recursivamente
-import unicodedata
-from difflib import SequenceMatcher
+from typing import Optional, Iterable
+from flujo_libros import filtrar, primero, paginar
+from arbol_catalogo import NodoCatalogo
+from fsc_jerarquia import JERARQUIA_NIVELES
+from motores_almacenamiento import obtener_motor
+from modelo_libro import Libro
+# normalizar_texto y son_similares viven en 'similitud' (se reexportan desde acá)
+from similitud import normalizar_texto, son_similares, ComparadorConsulta
 
+LIMITE_RESULTADOS_BUSQUEDA = 50
+LIBROS_POR_PAGINA = 20
 
-def normalizar_texto(texto: str) -> str:
-    """Convierte texto a minúsculas y elimina acentos."""
-    texto = texto.lower()
-    texto = unicodedata.normalize('NFKD', texto)
-    return ''.join(c for c in texto if not unicodedata.combining(c))
-
-
-def son_similares(a: str, b: str, umbral: float = 0.6) -> bool:
-    """Devuelve True si los textos son suficientemente parecidos (más flexible)."""
-    a_norm, b_norm = normalizar_texto(a), normalizar_texto(b)
-    
-    # Coincidencia directa o parcial
-    if a_norm in b_norm or b_norm in a_norm:
-        return True
-    
-    # Coincidencia aproximada
-    return SequenceMatcher(None, a_norm, b_norm).ratio() >= umbral
 
+def _imprimir_en_paginas(libros: Iterable[Libro]) -> int:
+    """
+    Imprime los libros de a LIBROS_POR_PAGINA consumiendo el flujo a demanda:
+    si el usuario corta, no se lee el resto del catálogo. Devuelve cuántos mostró.
+    """
+    mostrados = 0
+    print("---")
+    for pagina in paginar(libros, LIBROS_POR_PAGINA):
+        for libro in pagina:
+            mostrados += 1
+            print(f"[{mostrados}] ID: {libro.id}")
+            print(f"    Título: {libro.titulo} ({libro.paginas} pgs)")
+            print(f"    Ubicación: {libro.genero} / {libro.autor} / {libro.anio}")
+            print("---")
+        if len(pagina) < LIBROS_POR_PAGINA:
+            break
+        if input("Enter para ver más, 'q' para terminar: ").lower().strip() == "q":
+            break
+    return mostrados
 
 
 def mostrar_libros(base_path: str):
     """
-    Muestra ítems totales y permite filtrado, usando la lectura recursiva.
+    Muestra ítems totales y permite filtrado, leyendo el catálogo en flujo
+    (los libros se muestran a medida que se leen, por páginas).
     """
-    lista_libros = consolidar_libros_recursivamente(base_path, []) 
-    
-    if not lista_libros:
+    motor = obtener_motor(base_path)
+    if primero(motor.recorrer()) is None:
         print("\nNo hay ítems registrados en la estructura de archivos.")
         return
 
@@ -41,53 +47,128 @@ def mostrar_libros(base_path: str):
     
     atributo_filtro = input("¿Desea filtrar la lista? (titulo/autor/genero/no): ").lower().strip()
     
-    libros_a_mostrar = lista_libros
+    libros_a_mostrar: Iterable[Libro] = motor.recorrer()
     
     if atributo_filtro in ["titulo", "autor", "genero"]:
         valor_filtro = input(f"Ingrese el valor a filtrar por {atributo_filtro}: ").strip()
         if valor_filtro:
-            # 🔍 Búsqueda flexible (ahora más permisiva)
-            libros_a_mostrar = [
-                libro for libro in libros_a_mostrar
-                if son_similares(valor_filtro, str(libro.get(atributo_filtro, "")))
-            ]
+            modo = input("¿Ordenar por parecido y mostrar solo los mejores resultados? (s/n): ").lower().strip()
+            if modo == "s":
+                # 🔍 Búsqueda con índice de trigramas, ordenada por similitud
+                resultados = motor.buscar_similares(atributo_filtro, valor_filtro, LIMITE_RESULTADOS_BUSQUEDA)
+                libros_a_mostrar = [libro for libro, _ in resultados]
+                print(f"\nMostrando los {len(libros_a_mostrar)} libros más parecidos (búsqueda por índice).")
+            else:
+                # 🔍 Búsqueda flexible (ahora más permisiva), aplicada en flujo
+                comparador = ComparadorConsulta(valor_filtro, umbral=0.6) # El mismo umbral que son_similares
+                libros_a_mostrar = filtrar(
+                    libros_a_mostrar,
+                    lambda libro: comparador.puntaje(str(libro.get(atributo_filtro, ""))) is not None
+                )
+                print("\nMostrando libros filtrados (búsqueda flexible).")
 
-            print(f"\nMostrando {len(libros_a_mostrar)} libros filtrados (búsqueda flexible).")
-
-    if not libros_a_mostrar:
+    mostrados = _imprimir_en_paginas(libros_a_mostrar)
+    if not mostrados:
         print("No se encontraron libros con ese criterio de filtrado.")
         return
+    print(f"Se mostraron {mostrados} libros.")
 
-    print("---")
-    for i, libro in enumerate(libros_a_mostrar, start=1):
-        print(f"[{i}] ID: {libro['id']}")
-        print(f"    Título: {libro['titulo']} ({libro['paginas']} pgs)")
-        print(f"    Ubicación: {libro['genero']} / {libro['autor']} / {libro['anio']}")
-        print("---")
 
+def _seleccionar_item_por_id(base_path: str, operacion: str) -> Optional[Libro]:
+    """
+    Función auxiliar para buscar un ítem por ID (Genero/Autor/Titulo) o por
+    parte del título, sin listar todo el catálogo.
+    Devuelve el libro elegido o None.
+    """
+    motor = obtener_motor(base_path)
 
-def _seleccionar_item_por_id(base_path: str, operacion: str) -> Tuple[List[Dict], int]:
-    """Función auxiliar para buscar un ítem por ID."""
-    
-    lista_libros = consolidar_libros_recursivamente(base_path, [])
-    
-    if not lista_libros:
+    if not motor.contar():
         print("No hay libros registrados para esta operación.")
-        return [], -1
+        return None
 
     print(f"\n{operacion.upper()} LIBRO\n")
-    print("Libros disponibles (ID: Genero/Autor/Titulo):")
-    
-    for i, libro in enumerate(lista_libros, start=1):
-        print(f"[{i}] {libro.get('id', libro['titulo'])}") # Usamos .get() por seguridad
-        
+    consulta = input("Ingresá el ID (Genero/Autor/Titulo) o parte del título: ").strip()
+    if not consulta:
+        print("Operación cancelada.")
+        return None
+
+    # 1. ID exacto: búsqueda indexada en el motor
+    candidatos = motor.obtener_por_id(consulta)
+
+    # 2. Si no es un ID, búsqueda flexible por título
+    if not candidatos:
+        candidatos = [libro for libro, _ in motor.buscar_similares("titulo", consulta, LIMITE_RESULTADOS_BUSQUEDA)]
+
+    if not candidatos:
+        print("No se encontraron libros con ese ID o título.")
+        return None
+
+    print("Libros encontrados (ID: Genero/Autor/Titulo):")
+    for i, libro in enumerate(candidatos, start=1):
+        print(f"[{i}] {libro.id} ({libro.anio}, {libro.paginas} pgs)")
+
+    if len(candidatos) == 1:
+        return candidatos[0]
+
     try:
         indice = int(input(f"\nElegí el número del libro a {operacion}: "))
-        if indice < 1 or indice > len(lista_libros):
+        if indice < 1 or indice > len(candidatos):
             print("Número inválido.")
-            return [], -1
+            return None
     except ValueError:
         print("Debes ingresar un número.")
-        return [], -1
-        
-    return lista_libros, indice - 1
+        return None
+
+    return candidatos[indice - 1]
+
+
+def _resumen_nodo(nodo: NodoCatalogo, etiqueta: str):
+    """Imprime los agregados mantenidos de un nodo del árbol."""
+    print(f"\n📂 {etiqueta}: {nodo.cantidad} libros | {nodo.total_paginas} páginas "
+          f"(promedio {nodo.promedio_paginas:.2f})")
+    if nodo.mas_largo:
+        print(f"   📘 Más largo: '{nodo.mas_largo.titulo}' ({nodo.mas_largo.paginas} páginas)")
+
+
+def _elegir_hijo(nodo: NodoCatalogo, nombre_nivel: str) -> NodoCatalogo | None:
+    """Lista los hijos de un nodo y pide uno (sin distinguir mayúsculas ni acentos)."""
+    for nombre, hijo in sorted(nodo.hijos.items()):
+        print(f"  - {nombre} ({hijo.cantidad} libros)")
+
+    valor = input(f"\n{nombre_nivel.capitalize()} a explorar (vacío para ver todos los libros): ").strip()
+    if not valor:
+        return None
+
+    buscado = normalizar_texto(valor)
+    for nombre, hijo in nodo.hijos.items():
+        if normalizar_texto(nombre) == buscado:
+            return hijo
+    print(f"No existe ese {nombre_nivel}.")
+    return None
+
+
+def explorar_jerarquia(base_path: str):
+    """
+    Navega la jerarquía Género > Autor > Año usando el árbol en memoria:
+    las estadísticas de cada nivel salen de los agregados de su nodo.
+    """
+    arbol = obtener_motor(base_path).arbol()
+    nodo = arbol.raiz
+
+    if not nodo.cantidad:
+        print("\nNo hay ítems registrados en la estructura de archivos.")
+        return
+
+    _resumen_nodo(nodo, "Biblioteca completa")
+    while nodo.hijos and nodo.nivel != JERARQUIA_NIVELES[-1]:
+        siguiente_nivel = JERARQUIA_NIVELES[0 if nodo.nivel is None else JERARQUIA_NIVELES.index(nodo.nivel) + 1]
+        hijo = _elegir_hijo(nodo, siguiente_nivel)
+        if hijo is None:
+            break
+        nodo = hijo
+        _resumen_nodo(nodo, f"{nodo.nivel.capitalize()} {nodo.nombre}")
+
+    print("---")
+    for i, libro in enumerate(nodo.recorrer_libros(), start=1):
+        print(f"[{i}] {libro.titulo} ({libro.paginas} pgs) - {libro.genero} / {libro.autor} / {libro.anio}")
+    print("---")
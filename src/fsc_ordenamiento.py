@@ -1,73 +1,77 @@
-import os
 # --- IMPORTACIÓN OBLIGATORIA ---
-# Traemos la función que lee los datos desde el módulo de almacenamiento.
-# Sin esto, 'consolidar_libros_recursivamente' no está definido.
-from almacenamiento import consolidar_libros_recursivamente
+# El orden lo resuelve el motor de almacenamiento: índices ordenados mantenidos
+# (árbol de CSV) o ORDER BY sobre columnas indexadas (SQLite).
+from motores_almacenamiento import obtener_motor
+
+# Opción del menú -> (campo, nombre para mostrar)
+OPCIONES_ORDEN = {
+    "1": ("titulo", "Título"),
+    "2": ("anio", "Año de publicación"),
+    "3": ("paginas", "Páginas"),
+    "4": ("autor", "Autor"),
+    "5": ("genero", "Género"),
+}
+
 
 def ordenar_libros(base_path: str):
     """
-    Permite ordenar la lista completa de ítems (obtenida recursivamente)
-    alfabéticamente por Título o numéricamente por Año.
-    
+    Permite ordenar la lista completa de ítems por Título, Año, Páginas,
+    Autor o Género, con un criterio secundario opcional (ej. Año y luego
+    Título) y mostrando solo los primeros N si se pide.
+
     Esta función es llamada por la Opción 6 del menú en main.py.
     """
-    
-    # 1. Obtener la lista global de datos de la función recursiva
-    # Esta línea ahora funciona gracias a la importación
-    lista_libros = consolidar_libros_recursivamente(base_path, [])
-    
-    if not lista_libros:
+
+    # 1. Motor configurado (no se reordena el catálogo en cada llamada)
+    motor = obtener_motor(base_path)
+    total = motor.contar()
+
+    if not total:
         print("\nNo hay libros registrados para ordenar.")
         return
 
     print("\n⬆️ ORDENAR LISTA GLOBAL DE LIBROS\n")
     print("¿Cómo deseas ordenar la lista?")
-    print("1. Alfabéticamente (por Título)")
-    print("2. Por Año de publicación")
-    
-    opcion = input("Elegí una opción (1 o 2): ")
-    
-    clave_orden = None
-    es_numerico = False
+    for opcion, (_, nombre) in OPCIONES_ORDEN.items():
+        print(f"{opcion}. Por {nombre}")
 
-    if opcion == "1":
-        clave_orden = "titulo"
-        print("Ordenando alfabéticamente por Título...")
-    elif opcion == "2":
-        clave_orden = "anio"
-        es_numerico = True
-        print("Ordenando por Año de publicación...")
-    else:
+    opcion = input(f"Elegí una opción (1 a {len(OPCIONES_ORDEN)}): ").strip()
+    if opcion not in OPCIONES_ORDEN:
         print("Opción no válida. Operación cancelada.")
         return
 
     # 2. Preguntar orden ascendente o descendente
     orden_str = input("¿Orden ascendente (a) o descendente (d)? ").lower().strip()
-    # Si el usuario escribe 'd', reverse será True.
+    # Si el usuario escribe 'd', el orden es descendente.
     invertir_orden = orden_str == 'd'
+    criterios = [(OPCIONES_ORDEN[opcion][0], invertir_orden)]
+    nombres = [OPCIONES_ORDEN[opcion][1]]
+
+    # 3. Criterio secundario para desempatar (opcional, siempre ascendente)
+    secundaria = input("Criterio secundario para desempatar (número, vacío para ninguno): ").strip()
+    if secundaria in OPCIONES_ORDEN and secundaria != opcion:
+        criterios.append((OPCIONES_ORDEN[secundaria][0], False))
+        nombres.append(OPCIONES_ORDEN[secundaria][1])
 
-    # 3. Aplicar el ordenamiento usando 'key' y lambda
+    # 4. Cuántos mostrar: los primeros N salen del índice sin ordenar el resto
+    cantidad_str = input("¿Cuántos libros mostrar? (vacío para todos): ").strip()
     try:
-        if es_numerico:
-            # Para 'Año', aseguramos la conversión a entero para un orden numérico correcto
-            # Usamos .get() para evitar errores si falta la clave, aunque no debería
-            lista_libros.sort(key=lambda libro: int(libro.get(clave_orden, 0)), reverse=invertir_orden)
-        else:
-            # Para 'Título', usamos .lower() para un orden alfabético que no distinga mayúsculas
-            lista_libros.sort(key=lambda libro: str(libro.get(clave_orden, "")).lower(), reverse=invertir_orden)
-            
+        cantidad = int(cantidad_str) if cantidad_str else total
     except ValueError:
-        print("Error: Se encontró un dato no numérico al intentar ordenar por año.")
+        print("Debes ingresar un número.")
         return
-    except Exception as e:
-        print(f"Error inesperado durante el ordenamiento: {e}")
+    if cantidad < 0:
+        print("La cantidad no puede ser negativa.")
         return
 
-    # 4. Mostrar el resultado
-    print(f"\n--- Libros Ordenados por {clave_orden.capitalize()} ({'Descendente' if invertir_orden else 'Ascendente'}) ---")
-    for i, libro in enumerate(lista_libros, start=1):
-        print(f"[{i}] {libro['titulo']} ({libro['autor']})")
-        print(f"    └─ Año: {libro['anio']} | Páginas: {libro['paginas']} | Género: {libro['genero']}")
+    print(f"Ordenando por {' y luego '.join(nombres)}...")
+    libros_ordenados = motor.ordenar(criterios, cantidad)
+
+    # 5. Mostrar el resultado
+    print(f"\n--- Libros Ordenados por {' / '.join(nombres)} ({'Descendente' if invertir_orden else 'Ascendente'}) ---")
+    for i, libro in enumerate(libros_ordenados, start=1):
+        print(f"[{i}] {libro.titulo} ({libro.autor})")
+        print(f"    └─ Año: {libro.anio} | Páginas: {libro.paginas} | Género: {libro.genero}")
     print("--------------------------------------------------")
 
-# (No agregues más código a este archivo a menos que sea otra función de ordenamiento)
\ No newline at end of file
+# (No agregues más código a este archivo a menos que sea otra función de ordenamiento)
@@ -0,0 +1,143 @@
+# --- ÍNDICE INVERTIDO DE TRIGRAMAS PARA LA BÚSQUEDA FLEXIBLE ---
+import heapq
+from typing import List, Dict, Set, Tuple
+
+from modelo_libro import Libro
+from diario_cambios import CambioFila
+from similitud import normalizar_texto, trigramas, ComparadorConsulta
+from almacenamiento import obtener_estructura
+
+CAMPOS_BUSQUEDA = ("titulo", "autor", "genero")
+CANDIDATOS_POR_RESULTADO = 4 # Cuántos candidatos (por trigramas) se puntúan por cada resultado pedido
+
+
+class IndiceBusqueda:
+    """
+    Para cada campo guarda sus valores ya normalizados (sin acentos, en
+    minúsculas) y un índice invertido trigrama -> valores. Una búsqueda solo
+    puntúa con SequenceMatcher los valores que más trigramas comparten con la
+    consulta, en lugar de comparar contra cada libro.
+    Se indexan valores distintos: muchos libros comparten autor o género.
+    """
+
+    def __init__(self, libros: List[Libro] = ()):
+        self._libros: Dict[int, Libro] = {}
+        self._siguiente_id = 0
+        self._ids_por_csv: Dict[str, List[int]] = {}
+        # campo -> valor normalizado -> ids de libros
+        self._valores: Dict[str, Dict[str, Set[int]]] = {campo: {} for campo in CAMPOS_BUSQUEDA}
+        # campo -> trigrama -> valores normalizados que lo contienen
+        self._trigramas: Dict[str, Dict[str, Set[str]]] = {campo: {} for campo in CAMPOS_BUSQUEDA}
+
+        por_csv: Dict[str, List[Libro]] = {}
+        for libro in libros:
+            por_csv.setdefault(libro.ruta_csv, []).append(libro)
+        for ruta_csv, libros_csv in por_csv.items():
+            self._ids_por_csv[ruta_csv] = [self._agregar(libro) for libro in libros_csv]
+
+    # --- Mantenimiento ---
+
+    def _agregar(self, libro: Libro) -> int:
+        id_libro = self._siguiente_id
+        self._siguiente_id += 1
+        self._libros[id_libro] = libro
+
+        for campo in CAMPOS_BUSQUEDA:
+            valor = normalizar_texto(getattr(libro, campo))
+            ids = self._valores[campo].get(valor)
+            if ids is None:
+                ids = self._valores[campo][valor] = set()
+                for trigrama in trigramas(valor):
+                    self._trigramas[campo].setdefault(trigrama, set()).add(valor)
+            ids.add(id_libro)
+        return id_libro
+
+    def _quitar(self, id_libro: int):
+        libro = self._libros.pop(id_libro)
+        for campo in CAMPOS_BUSQUEDA:
+            valor = normalizar_texto(getattr(libro, campo))
+            ids = self._valores[campo][valor]
+            ids.discard(id_libro)
+            if ids:
+                continue
+            del self._valores[campo][valor]
+            for trigrama in trigramas(valor):
+                valores = self._trigramas[campo][trigrama]
+                valores.discard(valor)
+                if not valores:
+                    del self._trigramas[campo][trigrama]
+
+    def aplicar_cambios_csv(self, ruta_csv: str, cambios: List[CambioFila]):
+        """
+        Quita y agrega solo los libros cambiados; los trigramas se tocan solo
+        cuando un valor aparece o deja de estar en el catálogo.
+        """
+        ids = self._ids_por_csv.setdefault(ruta_csv, [])
+        for posicion, anterior, nuevo in cambios:
+            if nuevo is None:
+                self._quitar(ids.pop(posicion))
+            elif anterior is None:
+                ids.insert(posicion, self._agregar(nuevo))
+            else:
+                # Primero el alta: si el valor no cambió, sus trigramas quedan como están
+                id_anterior, ids[posicion] = ids[posicion], self._agregar(nuevo)
+                self._quitar(id_anterior)
+        if not ids:
+            del self._ids_por_csv[ruta_csv]
+
+    # --- Consultas ---
+
+    def _candidatos(self, campo: str, consulta_norm: str, cantidad: int) -> List[str]:
+        """Valores del campo que más trigramas comparten con la consulta (coeficiente de Dice)."""
+        if len(consulta_norm) < 3:
+            # Consulta muy corta: no hay trigramas, solo pueden coincidir por contención
+            return [valor for valor in self._valores[campo] if consulta_norm in valor or valor in consulta_norm]
+
+        grams = trigramas(consulta_norm)
+        compartidos: Dict[str, int] = {}
+        indice = self._trigramas[campo]
+        for trigrama in grams:
+            for valor in indice.get(trigrama, ()):
+                compartidos[valor] = compartidos.get(valor, 0) + 1
+
+        def prioridad(valor: str) -> Tuple[bool, float]:
+            # Primero los que contienen todos los trigramas (posible contención), luego por Dice
+            return (
+                compartidos[valor] == len(grams),
+                2 * compartidos[valor] / (len(grams) + max(len(valor) - 2, 1)),
+            )
+
+        return heapq.nlargest(cantidad, compartidos, key=prioridad)
+
+    def buscar(self, campo: str, consulta: str, limite: int = 20, umbral: float = 0.6) -> List[Tuple[Libro, float]]:
+        """
+        Devuelve hasta 'limite' libros (libro, similitud) ordenados por parecido.
+        Usa el mismo criterio que son_similares: contención o ratio >= umbral.
+        """
+        if campo not in CAMPOS_BUSQUEDA:
+            raise ValueError(f"Campo de búsqueda inválido: {campo}")
+
+        consulta_norm = normalizar_texto(consulta.strip())
+        if not consulta_norm:
+            return []
+
+        comparador = ComparadorConsulta(consulta_norm, umbral)
+        puntuados = []
+        for valor in self._candidatos(campo, consulta_norm, limite * CANDIDATOS_POR_RESULTADO):
+            puntaje = comparador.puntaje(valor)
+            if puntaje is not None:
+                puntuados.append((puntaje, valor))
+        puntuados.sort(key=lambda p: (-p[0], p[1]))
+
+        resultados: List[Tuple[Libro, float]] = []
+        for puntaje, valor in puntuados:
+            libros = sorted((self._libros[i] for i in self._valores[campo][valor]), key=lambda l: (l.titulo, l.id))
+            resultados.extend((libro, puntaje) for libro in libros)
+            if len(resultados) >= limite:
+                break
+        return resultados[:limite]
+
+
+def obtener_indice_busqueda(base_path: str) -> IndiceBusqueda:
+    """Índice de búsqueda del catálogo de base_path, mantenido al día por CSV."""
+    return obtener_estructura(base_path, "busqueda", IndiceBusqueda)
@@ -0,0 +1,58 @@
+# --- ÍNDICE HASH POR ID (Genero/Autor/Titulo) -> LIBROS CON ESE ID ---
+from typing import List, Dict
+
+from modelo_libro import Libro
+from diario_cambios import CambioFila
+from almacenamiento import obtener_estructura
+
+
+class IndiceIds:
+    """
+    Diccionario id -> libros. El id no es único (el mismo título puede estar
+    en dos años del mismo autor), por eso cada id guarda una lista. Buscar es
+    O(1) y un cambio en un items.csv solo toca las filas que cambiaron.
+    """
+
+    def __init__(self, libros: List[Libro] = ()):
+        self._por_id: Dict[str, List[Libro]] = {}
+        self._libros_por_csv: Dict[str, List[Libro]] = {} # En el orden de las filas del CSV
+
+        for libro in libros:
+            self._libros_por_csv.setdefault(libro.ruta_csv, []).append(libro)
+            self._por_id.setdefault(libro.id, []).append(libro)
+
+    def _quitar(self, libro: Libro):
+        """Quita ese objeto (no otro igual por valor) de la lista de su id."""
+        libros = self._por_id[libro.id]
+        libros.pop(next(i for i, candidato in enumerate(libros) if candidato is libro))
+        if not libros:
+            del self._por_id[libro.id]
+
+    def aplicar_cambios_csv(self, ruta_csv: str, cambios: List[CambioFila]):
+        """Quita y agrega solo los libros de las filas cambiadas."""
+        libros_csv = self._libros_por_csv.setdefault(ruta_csv, [])
+        for posicion, anterior, nuevo in cambios:
+            if anterior is not None:
+                self._quitar(libros_csv[posicion])
+            if nuevo is None:
+                del libros_csv[posicion]
+                continue
+            if anterior is None:
+                libros_csv.insert(posicion, nuevo)
+            else:
+                libros_csv[posicion] = nuevo
+            self._por_id.setdefault(nuevo.id, []).append(nuevo)
+        if not libros_csv:
+            del self._libros_por_csv[ruta_csv]
+
+    def buscar(self, id_libro: str) -> List[Libro]:
+        """Libros con el id exacto (lista vacía si no existe)."""
+        return list(self._por_id.get(id_libro.strip().strip("/"), []))
+
+    def __len__(self) -> int:
+        return len(self._por_id)
+
+
+def obtener_indice_ids(base_path: str) -> IndiceIds:
+    """Índice por id del catálogo de base_path, mantenido al día por fila."""
+    return obtener_estructura(base_path, "ids", IndiceIds)
@@ -0,0 +1,253 @@
+# --- INSTANTÁNEA BINARIA DEL CATÁLOGO (un archivo, cargado con mmap) ---
+# Empaqueta todo el árbol en un solo archivo para no parsear miles de
+# items.csv al arrancar. Formato (little/big endian según la máquina que lo
+# escribió, se verifica al abrir), con cada sección alineada a 8 bytes:
+#   encabezado     MAGIA, versión, orden de bytes, generación del manifiesto,
+#                  cantidad de cadenas, de items.csv y de libros
+#   cadenas        n+1 desplazamientos en caracteres (uint64) + el texto
+#                  UTF-8 de géneros, autores, títulos y rutas concatenados
+#                  (cada cadena distinta, una vez), hasta el final del archivo
+#   items.csv      ruta, género y autor (índices de cadena), año (int32),
+#                  tamaño y mtime_ns (int64) y el primer libro de cada CSV
+#                  (n+1 valores: el último cierra el rango)
+#   libros         columnas de ancho fijo: título (índice de cadena) y
+#                  páginas (int64, con signo: los items.csv editados a mano
+#                  pueden tener negativos); el resto sale de su items.csv
+# Al abrirla solo se leen el encabezado y las columnas se ven con
+# memoryview.cast; el texto se decodifica de una vez (una sola llamada en C,
+# que además valida el archivo) y cada cadena es después un slice.
+import os
+import sys
+import mmap
+import struct
+from array import array
+from collections.abc import Sequence
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from modelo_libro import Libro
+
+MAGIA = b"BIBINST\x00"
+VERSION_INSTANTANEA = 2 # 2: páginas como int64 con signo (antes uint32)
+_ENCABEZADO = struct.Struct("<8sII q III 4x") # magia, versión, orden, generación, cadenas, csv, libros
+_ORDEN_NATIVO = 1 if sys.byteorder == "little" else 2
+
+# (clave relativa a la base, tamaño, mtime_ns, filas (título, páginas))
+ArchivoInstantanea = Tuple[str, int, int, List[Tuple[str, int]]]
+
+
+def _alinear(posicion: int) -> int:
+    return (posicion + 7) & ~7
+
+
+def _niveles_de_clave(clave: str) -> Tuple[str, str, str]:
+    """genero/autor/anio/items.csv -> (genero, autor, anio)."""
+    partes = clave.replace(os.sep, "/").split("/")
+    return partes[0], partes[1], partes[2]
+
+
+def escribir_instantanea(ruta: str, generacion: int, archivos: Iterable[ArchivoInstantanea]):
+    """
+    Escribe la instantánea en un temporal y la reemplaza con os.replace.
+    Lanza ValueError si un año no es un número (no entra en la columna int32)
+    o si unas páginas no entran en int64.
+    """
+    indices: Dict[str, int] = {}
+    cadenas: List[str] = []
+
+    def cadena(texto: str) -> int:
+        indice = indices.get(texto)
+        if indice is None:
+            indice = indices[texto] = len(cadenas)
+            cadenas.append(texto)
+        return indice
+
+    csv_ruta, csv_genero, csv_autor, csv_anio = array("I"), array("I"), array("I"), array("i")
+    csv_tamanio, csv_mtime, csv_desde = array("q"), array("q"), array("I")
+    titulos, paginas = array("I"), array("q")
+    for clave, tamanio, mtime_ns, filas in archivos:
+        genero, autor, anio = _niveles_de_clave(clave)
+        if not anio.isdigit() or str(int(anio)) != anio:
+            raise ValueError(f"Año no numérico en {clave}: la instantánea guarda el año como entero")
+        csv_ruta.append(cadena(clave))
+        csv_genero.append(cadena(genero))
+        csv_autor.append(cadena(autor))
+        csv_anio.append(int(anio))
+        csv_tamanio.append(tamanio)
+        csv_mtime.append(mtime_ns)
+        csv_desde.append(len(titulos))
+        for titulo, cantidad_paginas in filas:
+            titulos.append(cadena(titulo))
+            try:
+                paginas.append(cantidad_paginas)
+            except OverflowError:
+                raise ValueError(f"Páginas fuera de rango en {clave}: {cantidad_paginas}") from None
+    csv_desde.append(len(titulos))
+
+    desplazamientos = array("Q", [0])
+    for datos in cadenas:
+        desplazamientos.append(desplazamientos[-1] + len(datos))
+
+    secciones = [desplazamientos, csv_ruta, csv_genero, csv_autor, csv_anio, csv_tamanio, csv_mtime, csv_desde,
+                 titulos, paginas]
+    ruta_tmp = ruta + ".tmp"
+    with open(ruta_tmp, "wb") as f:
+        f.write(_ENCABEZADO.pack(MAGIA, VERSION_INSTANTANEA, _ORDEN_NATIVO, generacion,
+                                 len(cadenas), len(csv_ruta), len(titulos)))
+        for seccion in secciones:
+            f.write(b"\x00" * (_alinear(f.tell()) - f.tell()))
+            seccion.tofile(f)
+        f.write(b"\x00" * (_alinear(f.tell()) - f.tell()))
+        f.write("".join(cadenas).encode("utf-8"))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(ruta_tmp, ruta)
+
+
+class FilasInstantanea(Sequence):
+    """Filas (título, páginas) de un items.csv, decodificadas recién al pedirlas."""
+
+    __slots__ = ("_instantanea", "_desde", "_hasta")
+
+    def __init__(self, instantanea: "InstantaneaCatalogo", desde: int, hasta: int):
+        self._instantanea = instantanea
+        self._desde = desde
+        self._hasta = hasta
+
+    def __len__(self) -> int:
+        return self._hasta - self._desde
+
+    def __getitem__(self, posicion):
+        if isinstance(posicion, slice):
+            return [self[i] for i in range(*posicion.indices(len(self)))]
+        if posicion < 0:
+            posicion += len(self)
+        if not 0 <= posicion < len(self):
+            raise IndexError(posicion)
+        return self._instantanea.fila(self._desde + posicion)
+
+    def __iter__(self) -> Iterator[Tuple[str, int]]:
+        return iter(self._instantanea.filas(self._desde, self._hasta))
+
+
+class InstantaneaCatalogo:
+    """
+    Instantánea abierta con mmap. Las columnas son memoryview sobre el mapa
+    (no se copian ni se parsean); solo se decodifica el texto. Los géneros,
+    autores y rutas ya armados se guardan (son pocos); los títulos no.
+    """
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        with open(ruta, "rb") as f:
+            self._mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._abrir()
+        except (ValueError, struct.error):
+            self.cerrar()
+            raise ValueError(f"Instantánea inválida o de otra versión: {ruta}")
+
+    def _abrir(self):
+        magia, version, orden, self.generacion, n_cadenas, n_csv, n_libros = _ENCABEZADO.unpack_from(self._mapa, 0)
+        if magia != MAGIA or version != VERSION_INSTANTANEA or orden != _ORDEN_NATIVO:
+            raise ValueError("encabezado")
+
+        self._vistas: List[memoryview] = [memoryview(self._mapa)]
+        vista = self._vistas[0]
+        posicion = _ENCABEZADO.size
+
+        def columna(tipo: str, cantidad: int) -> memoryview:
+            nonlocal posicion
+            posicion = _alinear(posicion)
+            tamanio = array(tipo).itemsize * cantidad
+            if posicion + tamanio > len(self._mapa):
+                raise ValueError("truncada")
+            datos = vista[posicion:posicion + tamanio].cast(tipo)
+            self._vistas.append(datos)
+            posicion += tamanio
+            return datos
+
+        self._desplazamientos = columna("Q", n_cadenas + 1)
+        self._csv_ruta = columna("I", n_csv)
+        self._csv_genero = columna("I", n_csv)
+        self._csv_autor = columna("I", n_csv)
+        self._csv_anio = columna("i", n_csv)
+        self._csv_tamanio = columna("q", n_csv)
+        self._csv_mtime = columna("q", n_csv)
+        self._csv_desde = columna("I", n_csv + 1)
+        self._titulos = columna("I", n_libros)
+        self._paginas = columna("q", n_libros)
+        inicio_cadenas = _alinear(posicion)
+        if inicio_cadenas > len(self._mapa):
+            raise ValueError("truncada")
+        self._texto = self._mapa[inicio_cadenas:].decode("utf-8")
+        if len(self._texto) != self._desplazamientos[n_cadenas]:
+            raise ValueError("texto")
+        self._compartidas: Dict[int, str] = {}
+
+    def cerrar(self):
+        """Libera el mapa (las FilasInstantanea ya entregadas dejan de servir)."""
+        for vista in reversed(getattr(self, "_vistas", [])):
+            vista.release()
+        self._mapa.close()
+
+    def __len__(self) -> int:
+        return len(self._titulos)
+
+    def cadena(self, indice: int) -> str:
+        return self._texto[self._desplazamientos[indice]:self._desplazamientos[indice + 1]]
+
+    def _cadena_compartida(self, indice: int) -> str:
+        texto = self._compartidas.get(indice)
+        if texto is None:
+            texto = self._compartidas[indice] = sys.intern(self.cadena(indice))
+        return texto
+
+    def fila(self, indice: int) -> Tuple[str, int]:
+        """(título, páginas) del libro número 'indice'."""
+        return self.cadena(self._titulos[indice]), self._paginas[indice]
+
+    def filas(self, desde: int, hasta: int) -> List[Tuple[str, int]]:
+        """(título, páginas) de los libros [desde, hasta), leyendo las columnas por tramos."""
+        texto = self._texto
+        desplazamientos = self._desplazamientos
+        return [
+            (texto[desplazamientos[titulo]:desplazamientos[titulo + 1]], paginas)
+            for titulo, paginas in zip(self._titulos[desde:hasta].tolist(), self._paginas[desde:hasta].tolist())
+        ]
+
+    def archivos(self) -> Iterator[Tuple[str, int, int, FilasInstantanea]]:
+        """(clave, tamaño, mtime_ns, filas) de cada items.csv, en el orden en que se exportaron."""
+        for i in range(len(self._csv_ruta)):
+            yield (self._cadena_compartida(self._csv_ruta[i]), self._csv_tamanio[i], self._csv_mtime[i],
+                   FilasInstantanea(self, self._csv_desde[i], self._csv_desde[i + 1]))
+
+    def libros(self, base_path: str) -> Iterator[Libro]:
+        """Todos los libros, armados solo con las columnas (sin mirar el árbol de carpetas)."""
+        base = os.path.abspath(base_path)
+        for i in range(len(self._csv_ruta)):
+            genero, autor = self._cadena_compartida(self._csv_genero[i]), self._cadena_compartida(self._csv_autor[i])
+            anio = str(self._csv_anio[i])
+            ruta_csv = os.path.join(base, self._cadena_compartida(self._csv_ruta[i]))
+            for titulo, paginas in self.filas(self._csv_desde[i], self._csv_desde[i + 1]):
+                yield Libro(genero, autor, anio, titulo, paginas, ruta_csv)
+
+
+def abrir_instantanea(ruta: str) -> Optional[InstantaneaCatalogo]:
+    """La instantánea de esa ruta, o None si no existe o no se puede usar (versión, orden de bytes...)."""
+    try:
+        return InstantaneaCatalogo(ruta)
+    except (OSError, ValueError):
+        return None
+
+
+if __name__ == "__main__":
+    # Uso: python src/instantanea_catalogo.py [carpeta de datos]
+    from almacenamiento import exportar_instantanea
+
+    base = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(__file__), "..", "data")
+    try:
+        ruta, cantidad = exportar_instantanea(base)
+    except (OSError, ValueError) as e:
+        print(f"❌ No se pudo exportar la instantánea: {e}")
+    else:
+        print(f"✅ Instantánea con {cantidad} libros en {ruta}")
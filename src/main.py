@@ -1,16 +1,22 @@
 import os
 from fsc_estadisticas import estadisticas
-from fsc_mostrar import mostrar_libros
+from fsc_mostrar import mostrar_libros, explorar_jerarquia
 from fsc_guardado import guardar_libro
 from fsc_modificar import modificar_libro, eliminar_libro
 from api_libros import buscar_y_guardar_libro, mostrar_libros_api
 from fsc_ordenamiento import ordenar_libros
+from fsc_consultas import consulta_compuesta
+from fsc_importacion import importar_catalogo
+from motores_almacenamiento import crear_motor, configurar_motor, obtener_motor
 
 # Ruta base donde se guardarán los datos
 BASE_PATH = os.path.join(os.path.dirname(__file__), "..", "data")
 BASE_PATH = os.path.abspath(BASE_PATH)
 os.makedirs(BASE_PATH, exist_ok=True)
 
+# Motor de almacenamiento: "csv" (árbol de carpetas, por defecto) o "sqlite"
+MOTOR_ALMACENAMIENTO = os.environ.get("BIBLIOTECA_MOTOR", "csv").lower()
+
 
 def mostrar_menu(modo_api=False):
     """Muestra el menú según el modo actual."""
@@ -28,11 +34,18 @@ def mostrar_menu(modo_api=False):
         print("4. Eliminar libro")
         print("5. Estadísticas")
         print("6. Ordenar libros") # <-- AÑADIDO
-        print("7. Cambiar a modo API") # <-- MOVIDO
-        print("8. Salir") # <-- MOVIDO
+        print("7. Explorar por género / autor / año")
+        print("8. Consultar por rangos de año / páginas")
+        print("9. Importar libros desde archivo (CSV / JSONL)")
+        print("10. Cambiar a modo API") # <-- MOVIDO
+        print("11. Salir") # <-- MOVIDO
 
 def main():
     print("📚 SISTEMA DE GESTIÓN DE LIBROS\n")
+    motor = crear_motor(MOTOR_ALMACENAMIENTO, BASE_PATH)
+    configurar_motor(BASE_PATH, motor)
+    motor.abrir() # El catálogo queda en memoria para toda la sesión
+    print(f"💾 Almacenamiento: {MOTOR_ALMACENAMIENTO}")
 
     modo_api = False  # Por defecto inicia en modo local
 
@@ -51,6 +64,7 @@ def main():
                     modo_api = False
                     print("\n🔄 Cambiado a modo LOCAL.")
                 case "4":
+                    obtener_motor(BASE_PATH).cerrar() # CSV: vuelca el diario de cambios a los items.csv
                     print("¡Hasta luego!")
                     break
                 case _:
@@ -60,15 +74,15 @@ def main():
         else:
             match opcion:
                 case "1":
-                    # (Tu código de 'guardar_libro' va aquí, pidiendo los datos)
-                    # Ejemplo rápido:
-                    genero = input("Género del libro: ")
-                    autor = input("Autor: ")
-                    anio = input("Año de publicación: ")
-                    titulo = input("Título del libro: ")
-                    paginas = input("Cantidad de páginas: ")
-                    # Llama a la función importada de fsc_guardado.py
-                    guardar_libro(BASE_PATH, genero, autor, anio, titulo, paginas)
+                    datos = {
+                        "genero": input("Género del libro: "),
+                        "autor": input("Autor: "),
+                        "anio": input("Año de publicación: "),
+                        "titulo": input("Título del libro: "),
+                        "paginas": input("Cantidad de páginas: "),
+                    }
+                    # guardar_libro valida los datos (fsc_guardado.py)
+                    guardar_libro(BASE_PATH, datos)
                 case "2":
                     mostrar_libros(BASE_PATH)
                 case "3":
@@ -82,9 +96,16 @@ def main():
                     # Llama a la función importada de fsc_ordenamiento.py
                     ordenar_libros(BASE_PATH)
                 case "7":
+                    explorar_jerarquia(BASE_PATH)
+                case "8":
+                    consulta_compuesta(BASE_PATH)
+                case "9":
+                    importar_catalogo(BASE_PATH)
+                case "10":
                     modo_api = True
                     print("\n🌐 Cambiado a modo API (Google Books).")
-                case "8":
+                case "11":
+                    obtener_motor(BASE_PATH).cerrar() # CSV: vuelca el diario de cambios a los items.csv
                     print("¡Hasta luego!")
                     break
                 case _:
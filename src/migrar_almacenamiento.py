@@ -0,0 +1,88 @@
+# --- MIGRACIÓN DEL CATÁLOGO ENTRE MOTORES DE ALMACENAMIENTO ---
+# Uso (desde la raíz del repositorio):
+#   python src/migrar_almacenamiento.py csv sqlite     # data/ -> biblioteca.sqlite3
+#   python src/migrar_almacenamiento.py sqlite csv     # biblioteca.sqlite3 -> data/
+import os
+import argparse
+import time
+from itertools import islice
+from typing import Any, Dict
+
+from fsc_guardado import validar_entrada_libro
+from motores_almacenamiento import MOTORES, MotorAlmacenamiento, crear_motor, ERRORES_ALMACENAMIENTO
+
+TAMANIO_LOTE_MIGRACION = 50000
+MAX_ERRORES_EN_RESUMEN = 10
+BASE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "data"))
+
+
+def migrar(origen: MotorAlmacenamiento, destino: MotorAlmacenamiento,
+           tamanio_lote: int = TAMANIO_LOTE_MIGRACION) -> Dict[str, Any]:
+    """
+    Copia todos los libros de un motor a otro recorriendo el origen en flujo y
+    usando el alta masiva del destino, de a tamanio_lote libros. Las filas que
+    no pasan validar_entrada_libro (ej. un año que no es número) se rechazan.
+    """
+    resumen: Dict[str, Any] = {"leidos": 0, "migrados": 0, "rechazados": 0, "errores": []}
+    inicio = time.perf_counter()
+    libros = origen.recorrer()
+
+    while True:
+        lote = list(islice(libros, tamanio_lote))
+        if not lote:
+            break
+        validos = []
+        for libro in lote:
+            resumen["leidos"] += 1
+            es_valido, resultado = validar_entrada_libro(libro)
+            if es_valido:
+                validos.append(resultado)
+            else:
+                resumen["rechazados"] += 1
+                if len(resumen["errores"]) < MAX_ERRORES_EN_RESUMEN:
+                    resumen["errores"].append(f"{libro.id}: {resultado}")
+        parcial = destino.insertar_lote(validos)
+        resumen["migrados"] += parcial["importados"]
+        resumen["rechazados"] += parcial["rechazados"]
+        resumen["errores"].extend(parcial["errores"])
+
+    resumen["segundos"] = round(time.perf_counter() - inicio, 3)
+    return resumen
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Copia el catálogo de un motor de almacenamiento a otro")
+    parser.add_argument("origen", choices=MOTORES)
+    parser.add_argument("destino", choices=MOTORES)
+    parser.add_argument("--base", default=BASE_PATH, help="Carpeta de datos del árbol de CSV")
+    parser.add_argument("--sqlite", default=None, help="Archivo de la base SQLite (por defecto, junto a la carpeta de datos)")
+    parser.add_argument("--agregar", action="store_true", help="Permitir un destino que ya tiene libros")
+    args = parser.parse_args()
+
+    if args.origen == args.destino:
+        parser.error("El origen y el destino deben ser motores distintos")
+
+    os.makedirs(args.base, exist_ok=True)
+    origen = crear_motor(args.origen, args.base, args.sqlite)
+    destino = crear_motor(args.destino, args.base, args.sqlite)
+    try:
+        if destino.contar() and not args.agregar:
+            print(f"❌ El destino ({args.destino}) ya tiene libros: se duplicarían. Usá --agregar para continuar igual.")
+            return
+        resumen = migrar(origen, destino)
+    except ERRORES_ALMACENAMIENTO as e:
+        print(f"❌ Falló la migración: {e}")
+        return
+    finally:
+        destino.cerrar()
+        origen.cerrar()
+
+    print(f"✅ Migrados {resumen['migrados']} de {resumen['leidos']} libros ({args.origen} -> {args.destino}) en {resumen['segundos']} s")
+    if resumen["rechazados"]:
+        print(f"⚠️ {resumen['rechazados']} libros rechazados. Primeros errores:")
+        for error in resumen["errores"][:MAX_ERRORES_EN_RESUMEN]:
+            print(f"   - {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# --- REPRESENTACIÓN COMPACTA DE UN LIBRO ---
+import sys
+from collections.abc import MutableMapping
+from typing import Any, Iterator
+
+# Claves del "patrón de datos" original, en el mismo orden que el diccionario
+CLAVES_LIBRO = ("genero", "autor", "anio", "titulo", "paginas", "id", "ruta_csv")
+
+
+class Libro(MutableMapping):
+    """
+    Libro con __slots__ (sin __dict__ por instancia) que se comporta como el
+    diccionario de siempre: libro['titulo'], libro.get('paginas'), dict(libro)...
+    El 'id' no se guarda, se deriva de genero/autor/titulo al pedirlo.
+    genero, autor, anio y ruta_csv se internan: todos los libros de un mismo
+    items.csv (y de una misma jerarquía) comparten el mismo objeto str.
+    """
+
+    __slots__ = ("genero", "autor", "anio", "titulo", "paginas", "ruta_csv")
+
+    def __init__(self, genero: str, autor: str, anio: str, titulo: str, paginas: int, ruta_csv: str):
+        self.genero = sys.intern(genero)
+        self.autor = sys.intern(autor)
+        self.anio = sys.intern(str(anio))
+        self.titulo = titulo
+        self.paginas = paginas
+        self.ruta_csv = sys.intern(ruta_csv)
+
+    @property
+    def id(self) -> str:
+        """ID simple para identificación en CRUD (Genero/Autor/Titulo)."""
+        return f"{self.genero}/{self.autor}/{self.titulo}"
+
+    @property
+    def anio_num(self) -> int:
+        """Año como entero (0 si la carpeta no es numérica), para ordenar y comparar."""
+        try:
+            return int(self.anio)
+        except ValueError:
+            return 0
+
+    def reemplazar(self, **cambios: Any) -> "Libro":
+        """Devuelve una copia del libro con los campos indicados cambiados."""
+        datos = {campo: getattr(self, campo) for campo in Libro.__slots__}
+        datos.update(cambios)
+        return Libro(**datos)
+
+    # --- Vista compatible con diccionario ---
+
+    def __getitem__(self, clave: str) -> Any:
+        if clave not in CLAVES_LIBRO:
+            raise KeyError(clave)
+        return getattr(self, clave)
+
+    def __setitem__(self, clave: str, valor: Any):
+        if clave not in Libro.__slots__:
+            raise KeyError(f"'{clave}' no es un campo modificable del libro")
+        setattr(self, clave, valor)
+
+    def __delitem__(self, clave: str):
+        raise TypeError("No se pueden eliminar campos de un libro")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(CLAVES_LIBRO)
+
+    def __len__(self) -> int:
+        return len(CLAVES_LIBRO)
+
+    def __contains__(self, clave: object) -> bool:
+        return clave in CLAVES_LIBRO
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
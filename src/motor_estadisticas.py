@@ -0,0 +1,167 @@
+# --- MOTOR DE ESTADÍSTICAS INCREMENTALES ---
+import json
+import heapq
+from typing import List, Dict, Optional, Set, Tuple, Any
+
+from modelo_libro import Libro
+from diario_cambios import CambioFila
+from almacenamiento import obtener_estructura, ruta_auxiliar, guardar_json_atomico, leer_filas_items_csv
+
+VERSION_ESTADISTICAS = 1
+
+
+class EstadisticasCatalogo:
+    """
+    Agregados del catálogo que se mantienen al día libro a libro (O(1) por alta
+    o baja): totales, cantidad/páginas por género, autor y año, y el libro más
+    largo. Para el más largo se guarda el máximo de cada items.csv y un heap con
+    borrado perezoso, así una baja no obliga a recorrer toda la biblioteca; si
+    se va el más largo de un items.csv, el de ese CSV se recalcula al consultarlo.
+    """
+
+    def __init__(self, libros: List[Libro] = ()):
+        self.total_libros = 0
+        self.total_paginas = 0
+        # Cada desglose guarda {clave: [cantidad, total_paginas]}
+        self.por_genero: Dict[str, List[int]] = {}
+        self.por_autor: Dict[str, List[int]] = {}
+        self.por_anio: Dict[str, List[int]] = {}
+        self._max_por_csv: Dict[str, Tuple[int, str]] = {}
+        self._heap_max: List[Tuple[int, str, str]] = []
+        self._max_pendientes: Set[str] = set() # items.csv que perdieron su libro más largo
+
+        por_csv: Dict[str, List[Libro]] = {}
+        for libro in libros:
+            por_csv.setdefault(libro.ruta_csv, []).append(libro)
+        for ruta_csv, libros_csv in por_csv.items():
+            self.aplicar_cambios_csv(ruta_csv, [(i, None, libro) for i, libro in enumerate(libros_csv)])
+
+    # --- Actualización incremental ---
+
+    @staticmethod
+    def _sumar(desglose: Dict[str, List[int]], clave: str, cantidad: int, paginas: int):
+        acumulado = desglose.setdefault(clave, [0, 0])
+        acumulado[0] += cantidad
+        acumulado[1] += paginas
+        if acumulado[0] <= 0:
+            del desglose[clave]
+
+    def _registrar(self, libro: Libro, signo: int):
+        paginas = signo * libro.paginas
+        self.total_libros += signo
+        self.total_paginas += paginas
+        self._sumar(self.por_genero, libro.genero, signo, paginas)
+        self._sumar(self.por_autor, libro.autor, signo, paginas)
+        self._sumar(self.por_anio, libro.anio, signo, paginas)
+
+    def _fijar_max(self, ruta_csv: str, paginas: int, titulo: str):
+        self._max_por_csv[ruta_csv] = (paginas, titulo)
+        heapq.heappush(self._heap_max, (-paginas, ruta_csv, titulo))
+
+    def aplicar_cambios_csv(self, ruta_csv: str, cambios: List[CambioFila]):
+        """Descuenta cada libro quitado o reemplazado y suma cada libro nuevo: O(1) por cambio."""
+        for _, anterior, nuevo in cambios:
+            if anterior is not None:
+                self._registrar(anterior, -1)
+                if self._max_por_csv.get(ruta_csv) == (anterior.paginas, anterior.titulo):
+                    del self._max_por_csv[ruta_csv]
+                    self._max_pendientes.add(ruta_csv)
+            if nuevo is not None:
+                self._registrar(nuevo, 1)
+                actual = self._max_por_csv.get(ruta_csv)
+                if ruta_csv not in self._max_pendientes and (actual is None or nuevo.paginas > actual[0]):
+                    self._fijar_max(ruta_csv, nuevo.paginas, nuevo.titulo)
+
+        # Si se acumularon demasiadas entradas vencidas, se reconstruye el heap
+        if len(self._heap_max) > 2 * len(self._max_por_csv) + 64:
+            self._heap_max = [(-paginas, ruta, titulo) for ruta, (paginas, titulo) in self._max_por_csv.items()]
+            heapq.heapify(self._heap_max)
+
+    # --- Consultas ---
+
+    @property
+    def promedio_paginas(self) -> float:
+        return self.total_paginas / self.total_libros if self.total_libros else 0
+
+    def _recalcular_max_pendientes(self):
+        """Máximo de los items.csv que perdieron su libro más largo (se lee solo cada uno de esos CSV)."""
+        while self._max_pendientes:
+            ruta_csv = self._max_pendientes.pop()
+            mas_largo = max(leer_filas_items_csv(ruta_csv), key=lambda fila: fila[1], default=None)
+            if mas_largo is not None:
+                self._fijar_max(ruta_csv, mas_largo[1], mas_largo[0])
+
+    def libro_mas_largo(self) -> Optional[Tuple[str, int]]:
+        """(titulo, paginas) del libro más largo, descartando entradas vencidas del heap."""
+        self._recalcular_max_pendientes()
+        while self._heap_max:
+            paginas_neg, ruta_csv, titulo = self._heap_max[0]
+            if self._max_por_csv.get(ruta_csv) == (-paginas_neg, titulo):
+                return titulo, -paginas_neg
+            heapq.heappop(self._heap_max)
+        return None
+
+    def genero_mas_frecuente(self) -> Optional[Tuple[str, int]]:
+        if not self.por_genero:
+            return None
+        genero = max(self.por_genero, key=lambda g: self.por_genero[g][0])
+        return genero, self.por_genero[genero][0]
+
+    @classmethod
+    def desde_agregados(cls, total_libros: int, total_paginas: int, por_genero: Dict[str, List[int]],
+                        por_autor: Dict[str, List[int]], por_anio: Dict[str, List[int]],
+                        mas_largo: Optional[Tuple[str, int]]) -> "EstadisticasCatalogo":
+        """Estadísticas ya calculadas por otro motor (ej. GROUP BY de SQLite); no se mantienen al día."""
+        estadisticas = cls()
+        estadisticas.total_libros = total_libros
+        estadisticas.total_paginas = total_paginas
+        estadisticas.por_genero = por_genero
+        estadisticas.por_autor = por_autor
+        estadisticas.por_anio = por_anio
+        if mas_largo:
+            titulo, paginas = mas_largo
+            estadisticas._max_por_csv[""] = (paginas, titulo)
+            estadisticas._heap_max = [(-paginas, "", titulo)]
+        return estadisticas
+
+    # --- Persistencia junto al manifiesto del catálogo ---
+
+    def persistir(self, base_path: str, generacion: int):
+        self.libro_mas_largo() # Limpia el heap antes de guardarlo
+        guardar_json_atomico(ruta_auxiliar(base_path, "estadisticas.json"), {
+            "version": VERSION_ESTADISTICAS,
+            "generacion": generacion,
+            "total_libros": self.total_libros,
+            "total_paginas": self.total_paginas,
+            "por_genero": self.por_genero,
+            "por_autor": self.por_autor,
+            "por_anio": self.por_anio,
+            "max_por_csv": self._max_por_csv,
+        })
+
+    @classmethod
+    def cargar_persistida(cls, base_path: str, generacion: int) -> Optional["EstadisticasCatalogo"]:
+        """Recupera las estadísticas guardadas si corresponden a la generación indicada."""
+        try:
+            with open(ruta_auxiliar(base_path, "estadisticas.json"), "r", encoding="utf-8") as f:
+                datos: Dict[str, Any] = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if datos.get("version") != VERSION_ESTADISTICAS or datos.get("generacion") != generacion:
+            return None
+
+        estadisticas = cls()
+        estadisticas.total_libros = datos["total_libros"]
+        estadisticas.total_paginas = datos["total_paginas"]
+        estadisticas.por_genero = datos["por_genero"]
+        estadisticas.por_autor = datos["por_autor"]
+        estadisticas.por_anio = datos["por_anio"]
+        estadisticas._max_por_csv = {ruta: tuple(valor) for ruta, valor in datos["max_por_csv"].items()}
+        estadisticas._heap_max = [(-paginas, ruta, titulo) for ruta, (paginas, titulo) in estadisticas._max_por_csv.items()]
+        heapq.heapify(estadisticas._heap_max)
+        return estadisticas
+
+
+def obtener_estadisticas(base_path: str) -> EstadisticasCatalogo:
+    """Estadísticas del catálogo: desde memoria, desde disco o (si no hay) calculadas una vez."""
+    return obtener_estructura(base_path, "estadisticas", EstadisticasCatalogo, EstadisticasCatalogo.cargar_persistida)
@@ -0,0 +1,525 @@
+# --- MOTORES DE ALMACENAMIENTO INTERCAMBIABLES (árbol de CSV o SQLite) ---
+# Las funciones del menú no tocan los items.csv directamente: piden el motor
+# configurado para su carpeta de datos (obtener_motor) y usan su interfaz:
+# recorrer, obtener por id, insertar, modificar, eliminar y agregados.
+#   * MotorCSV: el árbol genero/autor/anio/items.csv de siempre, con el diario
+#     de cambios y las estructuras derivadas en memoria.
+#   * MotorSQLite: una base sqlite3 con índices sobre genero, autor, anio,
+#     paginas y titulo; las consultas y el orden los resuelve SQLite.
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from modelo_libro import Libro
+from similitud import normalizar_texto
+from fsc_jerarquia import ensure_path_for_book
+from diario_cambios import operacion_alta, operacion_modificacion, operacion_baja
+from almacenamiento import (
+    iterar_libros, leer_filas_items_csv, registrar_cambio, agregar_filas_csv,
+    actualizar_manifiesto_csvs, compactar_diario, revalidar_catalogo, transformar_csvs,
+)
+from arbol_catalogo import ArbolCatalogo, obtener_arbol
+from indice_busqueda import IndiceBusqueda, obtener_indice_busqueda
+from indice_ids import obtener_indice_ids
+from indices_orden import Criterio, top_n, _ordenar_por_criterios, consultar_libros, obtener_indices_orden
+from motor_estadisticas import EstadisticasCatalogo, obtener_estadisticas
+
+# Errores de escritura que pueden lanzar los motores (el menú los informa sin cortar el programa)
+ERRORES_ALMACENAMIENTO = (OSError, sqlite3.Error)
+
+MOTORES = ("csv", "sqlite")
+NOMBRE_BASE_SQLITE = "biblioteca.sqlite3"
+
+
+def _resumen_lote() -> Dict[str, Any]:
+    return {"importados": 0, "rechazados": 0, "carpetas_creadas": 0, "archivos": set(), "errores": []}
+
+
+def _agrupar_por_csv(elementos: Iterable[Any], libro_de: Callable[[Any], Libro]) -> Dict[str, List[Any]]:
+    """{ruta_csv: elementos} según el items.csv del libro de cada elemento, en orden de llegada."""
+    por_csv: Dict[str, List[Any]] = {}
+    for elemento in elementos:
+        por_csv.setdefault(libro_de(elemento).ruta_csv, []).append(elemento)
+    return por_csv
+
+
+class MotorAlmacenamiento(ABC):
+    """
+    Interfaz común de los motores. Cada motor implementa recorrer, insertar,
+    actualizar y eliminar (abstractos: un motor incompleto falla al crearlo,
+    no a mitad de una acción del menú); el resto tiene una versión genérica
+    (recorriendo todo el catálogo) que cada motor reemplaza por una que use
+    sus índices.
+    Los libros que devuelve un motor son Libro; su 'ruta_csv' indica dónde
+    están guardados (el items.csv o el archivo de la base).
+    """
+
+    nombre = "base"
+
+    # --- Obligatorios ---
+
+    @abstractmethod
+    def recorrer(self) -> Iterator[Libro]:
+        """Genera todos los libros en flujo (orden genero/autor/anio)."""
+
+    @abstractmethod
+    def insertar(self, libro_data: Dict[str, Any]) -> str:
+        """Alta de un libro ya validado. Devuelve dónde quedó guardado."""
+
+    @abstractmethod
+    def actualizar(self, libro: Libro, titulo: str, paginas: int) -> bool:
+        """Cambia título y páginas de un libro. False si ya no está guardado."""
+
+    @abstractmethod
+    def eliminar(self, libro: Libro) -> bool:
+        """Baja de un libro. False si ya no está guardado."""
+
+    # --- Con versión genérica ---
+
+    def insertar_lote(self, libros: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Alta masiva de libros ya validados. Devuelve {importados, rechazados,
+        carpetas_creadas, archivos (set de rutas escritas), errores}.
+        """
+        resumen = _resumen_lote()
+        for libro_data in libros:
+            resumen["archivos"].add(self.insertar(libro_data))
+            resumen["importados"] += 1
+        return resumen
+
+    def actualizar_lote(self, cambios: List[Tuple[Libro, str, int]]) -> int:
+        """Varias modificaciones (libro, título, páginas) juntas. Devuelve cuántos libros se actualizaron."""
+        return sum(1 for libro, titulo, paginas in cambios if self.actualizar(libro, titulo, paginas))
+
+    def eliminar_lote(self, libros: List[Libro]) -> int:
+        """Varias bajas juntas. Devuelve cuántos libros se eliminaron."""
+        return sum(1 for libro in libros if self.eliminar(libro))
+
+    def contar(self) -> int:
+        return sum(1 for _ in self.recorrer())
+
+    def obtener_por_id(self, id_libro: str) -> List[Libro]:
+        """Libros con ese id exacto (Genero/Autor/Titulo); puede haber más de uno."""
+        id_libro = id_libro.strip().strip("/")
+        return [libro for libro in self.recorrer() if libro.id == id_libro]
+
+    def agregados(self) -> EstadisticasCatalogo:
+        """Totales y desgloses por género, autor y año."""
+        return EstadisticasCatalogo(list(self.recorrer()))
+
+    def ordenar(self, criterios: List[Criterio], n: Optional[int] = None) -> List[Libro]:
+        """Los primeros n libros (todos si n es None) según los criterios de indices_orden."""
+        libros = list(self.recorrer())
+        return _ordenar_por_criterios(libros, criterios) if n is None else top_n(libros, n, criterios)
+
+    def consultar(self, anio_min: Optional[int] = None, anio_max: Optional[int] = None,
+                  paginas_min: Optional[int] = None, paginas_max: Optional[int] = None,
+                  genero: Optional[str] = None, autor: Optional[str] = None) -> List[Libro]:
+        """Misma semántica que indices_orden.consultar_libros (límites inclusivos, texto normalizado)."""
+        genero_norm = normalizar_texto(genero.strip()) if genero else None
+        autor_norm = normalizar_texto(autor.strip()) if autor else None
+        resultado = [
+            libro for libro in self.recorrer()
+            if (anio_min is None or libro.anio_num >= anio_min) and (anio_max is None or libro.anio_num <= anio_max)
+            and (paginas_min is None or libro.paginas >= paginas_min) and (paginas_max is None or libro.paginas <= paginas_max)
+            and (not genero_norm or normalizar_texto(libro.genero) == genero_norm)
+            and (not autor_norm or normalizar_texto(libro.autor) == autor_norm)
+        ]
+        resultado.sort(key=lambda libro: (libro.anio_num, normalizar_texto(libro.titulo)))
+        return resultado
+
+    def buscar_similares(self, campo: str, consulta: str, limite: int) -> List[Tuple[Libro, float]]:
+        """Búsqueda flexible por parecido (índice de trigramas)."""
+        return IndiceBusqueda(list(self.recorrer())).buscar(campo, consulta, limite=limite)
+
+    def arbol(self) -> ArbolCatalogo:
+        """Árbol genero > autor > anio con agregados por nodo."""
+        return ArbolCatalogo(list(self.recorrer()))
+
+    def abrir(self):
+        """Prepara el motor para una sesión larga (ej. deja el catálogo en memoria)."""
+
+    def cerrar(self):
+        """Deja el almacenamiento consistente al salir del programa."""
+
+
+# --- MOTOR CSV (árbol de carpetas + diario de cambios) ---
+
+class MotorCSV(MotorAlmacenamiento):
+    """El árbol genero/autor/anio/items.csv; cada operación usa las estructuras mantenidas del catálogo."""
+
+    nombre = "csv"
+
+    def __init__(self, base_path: str):
+        self.base_path = os.path.abspath(base_path)
+
+    def recorrer(self) -> Iterator[Libro]:
+        return iterar_libros(self.base_path)
+
+    def _ruta_hoja(self, genero: str, autor: str, anio: str) -> Tuple[Optional[str], bool]:
+        """(ruta del items.csv, si hubo que crear la carpeta) creando la carpeta si falta."""
+        existia = os.path.isdir(os.path.join(self.base_path, genero, autor, anio))
+        niveles = {"genero": genero, "autor": autor, "anio": anio}
+        return ensure_path_for_book(self.base_path, niveles, mostrar=False), not existia
+
+    def insertar(self, libro_data: Dict[str, Any]) -> str:
+        niveles = {"genero": libro_data["genero"], "autor": libro_data["autor"], "anio": libro_data["anio"]}
+        ruta_csv = ensure_path_for_book(self.base_path, niveles)
+        if ruta_csv is None:
+            raise OSError(f"No se pudo crear la carpeta {niveles['genero']}/{niveles['autor']}/{niveles['anio']}")
+        # El libro va al diario (si el items.csv no existe, se crea con el encabezado)
+        registrar_cambio(ruta_csv, operacion_alta(libro_data["titulo"], libro_data["paginas"]))
+        return ruta_csv
+
+    @staticmethod
+    def _posicion_en_csv(libro: Libro) -> int:
+        """Fila vigente del libro en su items.csv (por título y páginas), -1 si ya no está."""
+        for posicion, (titulo, paginas) in enumerate(leer_filas_items_csv(libro.ruta_csv)):
+            if titulo == libro.titulo and paginas == libro.paginas:
+                return posicion
+        return -1
+
+    def actualizar(self, libro: Libro, titulo: str, paginas: int) -> bool:
+        posicion = self._posicion_en_csv(libro)
+        if posicion == -1:
+            return False
+        # El cambio se agrega al diario; el items.csv se reescribe al compactar
+        registrar_cambio(libro.ruta_csv, operacion_modificacion(posicion, (libro.titulo, libro.paginas), titulo, paginas))
+        return True
+
+    def eliminar(self, libro: Libro) -> bool:
+        posicion = self._posicion_en_csv(libro)
+        if posicion == -1:
+            return False
+        registrar_cambio(libro.ruta_csv, operacion_baja(posicion, (libro.titulo, libro.paginas)))
+        return True
+
+    def insertar_lote(self, libros: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Agrupa los libros por carpeta genero/autor/anio, crea cada carpeta una
+        sola vez y abre cada items.csv una sola vez; el manifiesto se guarda una vez.
+        """
+        resumen = _resumen_lote()
+        grupos: Dict[Tuple[str, str, str], List[Tuple[str, int]]] = {}
+        for libro_data in libros:
+            clave = (libro_data["genero"], libro_data["autor"], str(libro_data["anio"]))
+            grupos.setdefault(clave, []).append((libro_data["titulo"], libro_data["paginas"]))
+
+        escritos: List[str] = []
+        for (genero, autor, anio), filas_csv in grupos.items():
+            ruta_csv, creada = self._ruta_hoja(genero, autor, anio)
+            if ruta_csv is None:
+                resumen["rechazados"] += len(filas_csv)
+                resumen["errores"].append(f"No se pudo crear la carpeta {genero}/{autor}/{anio}")
+                continue
+            resumen["carpetas_creadas"] += 1 if creada else 0
+
+            try:
+                # Con bloqueo de la hoja y reemplazo atómico: seguro con otros procesos
+                # escribiendo. Sin fsync por archivo: la importación se puede repetir
+                agregar_filas_csv(ruta_csv, filas_csv, sincronizar=False)
+            except OSError as e:
+                resumen["rechazados"] += len(filas_csv)
+                resumen["errores"].append(f"Error al escribir {ruta_csv}: {e}")
+                continue
+
+            resumen["importados"] += len(filas_csv)
+            escritos.append(ruta_csv)
+            resumen["archivos"].add(ruta_csv)
+
+        actualizar_manifiesto_csvs(escritos)
+        return resumen
+
+    def actualizar_lote(self, cambios: List[Tuple[Libro, str, int]]) -> int:
+        """Agrupa los cambios por items.csv y reescribe todos en un solo volcado (sin pasar por el diario)."""
+        def actualizar(filas: List[Tuple[str, int]], cambio: Tuple[Libro, str, int]) -> bool:
+            libro, titulo, paginas = cambio
+            try:
+                posicion = filas.index((libro.titulo, libro.paginas))
+            except ValueError:
+                return False # Ya no está (lo cambió otro proceso)
+            filas[posicion] = (titulo, paginas)
+            return True
+
+        return self._transformar_por_csv(_agrupar_por_csv(cambios, lambda cambio: cambio[0]), actualizar)
+
+    def _transformar_por_csv(self, por_csv: Dict[str, List[Any]],
+                             aplicar: Callable[[List[Tuple[str, int]], Any], bool]) -> int:
+        """
+        Aplica a las filas de cada items.csv los pedidos agrupados para él
+        (aplicar(filas, pedido) modifica la lista y devuelve si encontró la
+        fila) y reescribe todos en un solo volcado. Devuelve cuántos pedidos se aplicaron.
+        """
+        aplicados = 0
+
+        def transformar(pedidos: List[Any]) -> Callable[[List[Tuple[str, int]]], List[Tuple[str, int]]]:
+            def transformar_filas(filas: List[Tuple[str, int]]) -> List[Tuple[str, int]]:
+                nonlocal aplicados
+                filas = list(filas)
+                aplicados += sum(1 for pedido in pedidos if aplicar(filas, pedido))
+                return filas
+            return transformar_filas
+
+        transformar_csvs(self.base_path, {ruta_csv: transformar(pedidos) for ruta_csv, pedidos in por_csv.items()})
+        return aplicados
+
+    def eliminar_lote(self, libros: List[Libro]) -> int:
+        """Agrupa las bajas por items.csv y reescribe todos en un solo volcado (sin pasar por el diario)."""
+        def eliminar(filas: List[Tuple[str, int]], libro: Libro) -> bool:
+            try:
+                filas.remove((libro.titulo, libro.paginas)) # Una sola fila por libro, aunque se repita
+            except ValueError:
+                return False # Ya no está (lo cambió otro proceso)
+            return True
+
+        return self._transformar_por_csv(_agrupar_por_csv(libros, lambda libro: libro), eliminar)
+
+    def contar(self) -> int:
+        return obtener_estadisticas(self.base_path).total_libros
+
+    def obtener_por_id(self, id_libro: str) -> List[Libro]:
+        return obtener_indice_ids(self.base_path).buscar(id_libro)
+
+    def agregados(self) -> EstadisticasCatalogo:
+        return obtener_estadisticas(self.base_path)
+
+    def ordenar(self, criterios: List[Criterio], n: Optional[int] = None) -> List[Libro]:
+        indices = obtener_indices_orden(self.base_path)
+        return indices.primeros(criterios, len(indices) if n is None else n)
+
+    def consultar(self, **filtros: Any) -> List[Libro]:
+        return consultar_libros(self.base_path, **filtros)
+
+    def buscar_similares(self, campo: str, consulta: str, limite: int) -> List[Tuple[Libro, float]]:
+        return obtener_indice_busqueda(self.base_path).buscar(campo, consulta, limite=limite)
+
+    def arbol(self) -> ArbolCatalogo:
+        return obtener_arbol(self.base_path)
+
+    def abrir(self):
+        # Un recorrido completo deja la sesión en caliente: después solo se miran los cambios
+        revalidar_catalogo(self.base_path)
+
+    def cerrar(self):
+        compactar_diario(self.base_path) # Vuelca el diario de cambios a los items.csv
+
+
+# --- MOTOR SQLITE (una tabla con índices por columna) ---
+
+# Columna por la que SQLite ordena/compara cada campo de CLAVES_ORDEN (texto normalizado)
+COLUMNAS_ORDEN = {
+    "titulo": "titulo_norm",
+    "anio": "anio",
+    "paginas": "paginas",
+    "autor": "autor_norm",
+    "genero": "genero_norm",
+}
+
+ESQUEMA_SQLITE = """
+CREATE TABLE IF NOT EXISTS libros (
+    genero TEXT NOT NULL,
+    autor TEXT NOT NULL,
+    anio INTEGER NOT NULL,
+    titulo TEXT NOT NULL,
+    paginas INTEGER NOT NULL,
+    genero_norm TEXT NOT NULL,
+    autor_norm TEXT NOT NULL,
+    titulo_norm TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_libros_genero ON libros (genero_norm);
+CREATE INDEX IF NOT EXISTS idx_libros_autor ON libros (autor_norm);
+CREATE INDEX IF NOT EXISTS idx_libros_anio ON libros (anio);
+CREATE INDEX IF NOT EXISTS idx_libros_paginas ON libros (paginas);
+CREATE INDEX IF NOT EXISTS idx_libros_titulo ON libros (titulo_norm);
+CREATE INDEX IF NOT EXISTS idx_libros_id ON libros (genero, autor, titulo);
+"""
+
+COLUMNAS_LIBRO = "genero, autor, anio, titulo, paginas"
+FILAS_POR_LECTURA = 1000
+
+# Ubica una fila por su contenido (la primera, si hay libros repetidos)
+_FILA_DEL_LIBRO = ("SELECT rowid FROM libros WHERE genero = ? AND autor = ? AND titulo = ? "
+                   "AND anio = ? AND paginas = ? LIMIT 1")
+
+
+def ruta_sqlite_por_defecto(base_path: str) -> str:
+    """La base SQLite va junto a la carpeta de datos (data/ -> biblioteca.sqlite3)."""
+    return os.path.join(os.path.dirname(os.path.abspath(base_path)), NOMBRE_BASE_SQLITE)
+
+
+def _fila_sqlite(libro_data: Dict[str, Any]) -> Tuple[Any, ...]:
+    genero, autor, titulo = str(libro_data["genero"]), str(libro_data["autor"]), str(libro_data["titulo"])
+    return (genero, autor, int(libro_data["anio"]), titulo, int(libro_data["paginas"]),
+            normalizar_texto(genero), normalizar_texto(autor), normalizar_texto(titulo))
+
+
+class MotorSQLite(MotorAlmacenamiento):
+    """
+    Catálogo en una tabla sqlite3 (modo WAL, varios procesos pueden leer
+    mientras uno escribe). Junto a cada texto se guarda su versión
+    normalizada (sin mayúsculas ni acentos): es la que indexan y comparan
+    las consultas, igual que las claves de indices_orden.
+    """
+
+    nombre = "sqlite"
+
+    def __init__(self, ruta_db: str):
+        # ":memory:" y las URI "file:..." van tal cual: abspath las convertiría en un archivo del directorio actual
+        es_uri = ruta_db.startswith("file:")
+        self.ruta_db = ruta_db if es_uri or ruta_db == ":memory:" else os.path.abspath(ruta_db)
+        self._conexion = sqlite3.connect(self.ruta_db, timeout=30, uri=es_uri)
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        self._conexion.execute("PRAGMA synchronous=NORMAL")
+        with self._conexion:
+            self._conexion.executescript(ESQUEMA_SQLITE)
+
+    def _libro(self, fila: Tuple[Any, ...]) -> Libro:
+        genero, autor, anio, titulo, paginas = fila
+        return Libro(genero, autor, str(anio), titulo, paginas, self.ruta_db)
+
+    def _libros(self, sql: str, parametros: Iterable[Any] = ()) -> List[Libro]:
+        return [self._libro(fila) for fila in self._conexion.execute(sql, tuple(parametros))]
+
+    def recorrer(self) -> Iterator[Libro]:
+        cursor = self._conexion.execute(f"SELECT {COLUMNAS_LIBRO} FROM libros ORDER BY genero, autor, anio, rowid")
+        while True:
+            filas = cursor.fetchmany(FILAS_POR_LECTURA)
+            if not filas:
+                return
+            for fila in filas:
+                yield self._libro(fila)
+
+    def insertar(self, libro_data: Dict[str, Any]) -> str:
+        with self._conexion:
+            self._conexion.execute("INSERT INTO libros VALUES (?, ?, ?, ?, ?, ?, ?, ?)", _fila_sqlite(libro_data))
+        return self.ruta_db
+
+    def insertar_lote(self, libros: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Todo el lote en una transacción (un solo commit)."""
+        resumen = _resumen_lote()
+        with self._conexion:
+            self._conexion.executemany("INSERT INTO libros VALUES (?, ?, ?, ?, ?, ?, ?, ?)", map(_fila_sqlite, libros))
+        resumen["importados"] = len(libros)
+        if libros:
+            resumen["archivos"].add(self.ruta_db)
+        return resumen
+
+    @staticmethod
+    def _clave_fila(libro: Libro) -> Tuple[Any, ...]:
+        return libro.genero, libro.autor, libro.titulo, libro.anio_num, libro.paginas
+
+    def actualizar(self, libro: Libro, titulo: str, paginas: int) -> bool:
+        with self._conexion:
+            cursor = self._conexion.execute(
+                f"UPDATE libros SET titulo = ?, titulo_norm = ?, paginas = ? WHERE rowid = ({_FILA_DEL_LIBRO})",
+                (titulo, normalizar_texto(titulo), paginas, *self._clave_fila(libro)),
+            )
+        return cursor.rowcount > 0
+
+    def actualizar_lote(self, cambios: List[Tuple[Libro, str, int]]) -> int:
+        """Todas las modificaciones en una transacción."""
+        actualizados = 0
+        with self._conexion:
+            for libro, titulo, paginas in cambios:
+                cursor = self._conexion.execute(
+                    f"UPDATE libros SET titulo = ?, titulo_norm = ?, paginas = ? WHERE rowid = ({_FILA_DEL_LIBRO})",
+                    (titulo, normalizar_texto(titulo), paginas, *self._clave_fila(libro)),
+                )
+                actualizados += cursor.rowcount
+        return actualizados
+
+    def eliminar(self, libro: Libro) -> bool:
+        with self._conexion:
+            cursor = self._conexion.execute(f"DELETE FROM libros WHERE rowid = ({_FILA_DEL_LIBRO})", self._clave_fila(libro))
+        return cursor.rowcount > 0
+
+    def eliminar_lote(self, libros: List[Libro]) -> int:
+        """Todas las bajas en una transacción."""
+        eliminados = 0
+        with self._conexion:
+            for libro in libros:
+                cursor = self._conexion.execute(f"DELETE FROM libros WHERE rowid = ({_FILA_DEL_LIBRO})",
+                                                self._clave_fila(libro))
+                eliminados += cursor.rowcount
+        return eliminados
+
+    def contar(self) -> int:
+        return self._conexion.execute("SELECT COUNT(*) FROM libros").fetchone()[0]
+
+    def obtener_por_id(self, id_libro: str) -> List[Libro]:
+        # Género y autor son nombres de carpeta (sin '/'); el título sí puede tenerla
+        partes = id_libro.strip().strip("/").split("/", 2)
+        if len(partes) != 3:
+            return []
+        return self._libros(
+            f"SELECT {COLUMNAS_LIBRO} FROM libros WHERE genero = ? AND autor = ? AND titulo = ? ORDER BY anio, rowid", partes
+        )
+
+    def _desglose(self, columna: str) -> Dict[str, List[int]]:
+        consulta = f"SELECT {columna}, COUNT(*), SUM(paginas) FROM libros GROUP BY {columna}"
+        return {str(clave): [cantidad, paginas] for clave, cantidad, paginas in self._conexion.execute(consulta)}
+
+    def agregados(self) -> EstadisticasCatalogo:
+        total_libros, total_paginas = self._conexion.execute("SELECT COUNT(*), COALESCE(SUM(paginas), 0) FROM libros").fetchone()
+        mas_largo = self._conexion.execute("SELECT titulo, paginas FROM libros ORDER BY paginas DESC, rowid LIMIT 1").fetchone()
+        return EstadisticasCatalogo.desde_agregados(
+            total_libros, total_paginas,
+            self._desglose("genero"), self._desglose("autor"), self._desglose("anio"),
+            tuple(mas_largo) if mas_largo else None,
+        )
+
+    def ordenar(self, criterios: List[Criterio], n: Optional[int] = None) -> List[Libro]:
+        if not criterios or any(campo not in COLUMNAS_ORDEN for campo, _ in criterios):
+            raise ValueError(f"Criterios de orden inválidos: {criterios}")
+        orden = ", ".join(f"{COLUMNAS_ORDEN[campo]} {'DESC' if descendente else 'ASC'}" for campo, descendente in criterios)
+        limite = "" if n is None else f" LIMIT {max(0, int(n))}"
+        return self._libros(f"SELECT {COLUMNAS_LIBRO} FROM libros ORDER BY {orden}, rowid{limite}")
+
+    def consultar(self, anio_min: Optional[int] = None, anio_max: Optional[int] = None,
+                  paginas_min: Optional[int] = None, paginas_max: Optional[int] = None,
+                  genero: Optional[str] = None, autor: Optional[str] = None) -> List[Libro]:
+        condiciones: List[str] = []
+        parametros: List[Any] = []
+        for condicion, valor in (("anio >= ?", anio_min), ("anio <= ?", anio_max),
+                                 ("paginas >= ?", paginas_min), ("paginas <= ?", paginas_max),
+                                 ("genero_norm = ?", normalizar_texto(genero.strip()) if genero else None),
+                                 ("autor_norm = ?", normalizar_texto(autor.strip()) if autor else None)):
+            if valor is not None:
+                condiciones.append(condicion)
+                parametros.append(valor)
+        donde = f" WHERE {' AND '.join(condiciones)}" if condiciones else ""
+        # SQLite elige el índice más selectivo de las condiciones (como consultar_libros con bisect)
+        return self._libros(f"SELECT {COLUMNAS_LIBRO} FROM libros{donde} ORDER BY anio, titulo_norm, rowid", parametros)
+
+    def cerrar(self):
+        self._conexion.execute("PRAGMA optimize") # Actualiza las estadísticas de los índices si hace falta
+        self._conexion.close()
+
+
+# --- MOTOR CONFIGURADO POR CARPETA DE DATOS ---
+
+_motores: Dict[str, MotorAlmacenamiento] = {}
+
+
+def crear_motor(tipo: str, base_path: str, ruta_sqlite: Optional[str] = None) -> MotorAlmacenamiento:
+    """Motor 'csv' sobre la carpeta de datos o 'sqlite' sobre ruta_sqlite (por defecto, junto a la carpeta)."""
+    if tipo == "csv":
+        return MotorCSV(base_path)
+    if tipo == "sqlite":
+        return MotorSQLite(ruta_sqlite or ruta_sqlite_por_defecto(base_path))
+    raise ValueError(f"Motor de almacenamiento desconocido: {tipo} (opciones: {', '.join(MOTORES)})")
+
+
+def configurar_motor(base_path: str, motor: MotorAlmacenamiento):
+    """Define qué motor usan las funciones del menú para esa carpeta de datos."""
+    _motores[os.path.abspath(base_path)] = motor
+
+
+def obtener_motor(base_path: str) -> MotorAlmacenamiento:
+    """Motor configurado para la carpeta de datos (por defecto, el árbol de CSV)."""
+    base = os.path.abspath(base_path)
+    motor = _motores.get(base)
+    if motor is None:
+        motor = _motores[base] = MotorCSV(base)
+    return motor
@@ -0,0 +1,172 @@
+# --- PRUEBA DE CARGA DEL MODO API (contra el servidor local o una URL) ---
+# Ejecuta muchas veces, desde varios hilos a la vez, los tres flujos del modo
+# API y muestra latencias (p50/p95/p99/máx) y operaciones por segundo:
+#   busqueda    obtener_libros_api (lo que hace buscar_y_guardar_libro)
+#   paginacion  las páginas de mostrar_libros_api (consultar_paginas)
+#   guardado    buscar + validar + guardar_libro en un árbol temporal
+# Uso (sin --url levanta servidor_api_local con una grabación inventada):
+#   python src/prueba_carga_api.py [--operaciones 200] [--hilos 8] [--latencia 0.02] [--errores 0.05]
+#   python src/prueba_carga_api.py --url http://127.0.0.1:8765/books/v1/volumes --consultas borges,cortazar
+import io
+import os
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+import api_libros
+from fsc_guardado import guardar_libro, validar_entrada_libro
+from cliente_api import ClienteLibros, CacheRespuestas, configurar_cliente, obtener_cliente
+from servidor_api_local import ServidorApiLocal, grabacion_sintetica
+
+CONSULTAS_POR_DEFECTO = [f"tema {i}" for i in range(20)]
+VOLUMENES_POR_CONSULTA = 120
+RESULTADOS_PAGINACION = 100
+
+
+class ClienteMedido(ClienteLibros):
+    """
+    Cliente que recuerda, por hilo, si falló alguna consulta: los flujos del
+    modo API atrapan los errores de red (muestran un aviso y siguen), así que
+    la prueba no los vería de otra forma.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._estado = threading.local()
+
+    def consultar(self, params: Dict[str, Any]):
+        try:
+            return super().consultar(params)
+        except requests.RequestException:
+            self._estado.fallo = True
+            raise
+
+    def empezar(self):
+        self._estado.fallo = False
+
+    def fallo(self) -> bool:
+        return getattr(self._estado, "fallo", False)
+
+
+def percentil(valores: List[float], p: float) -> float:
+    """Percentil p (0..100) por el método del rango más cercano; valores ya ordenados."""
+    if not valores:
+        return 0.0
+    return valores[min(len(valores) - 1, max(0, int(round(p / 100 * len(valores) + 0.5)) - 1))]
+
+
+def medir_flujo(cliente: ClienteMedido, flujo: Callable[[str], Any], consultas: List[str], operaciones: int,
+                hilos: int) -> Dict[str, Any]:
+    """Ejecuta 'operaciones' veces el flujo (repartiendo las consultas) y resume latencias y errores."""
+    def una(i: int) -> Optional[float]:
+        cliente.empezar()
+        inicio = time.perf_counter()
+        try:
+            flujo(consultas[i % len(consultas)])
+        except requests.RequestException:
+            return None
+        latencia = time.perf_counter() - inicio
+        return None if cliente.fallo() else latencia
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=hilos) as executor:
+        latencias = list(executor.map(una, range(operaciones)))
+    duracion = time.perf_counter() - inicio
+
+    correctas = sorted(latencia for latencia in latencias if latencia is not None)
+    return {
+        "operaciones": operaciones,
+        "errores": operaciones - len(correctas),
+        "p50": percentil(correctas, 50),
+        "p95": percentil(correctas, 95),
+        "p99": percentil(correctas, 99),
+        "max": correctas[-1] if correctas else 0.0,
+        "por_segundo": operaciones / duracion if duracion else 0.0,
+    }
+
+
+def flujos_api(base_path: str) -> Dict[str, Callable[[str], Any]]:
+    """Los flujos del modo API sin las preguntas por consola (se usan las mismas funciones)."""
+    def busqueda(consulta: str):
+        return api_libros.obtener_libros_api(consulta)
+
+    def paginacion(consulta: str):
+        params = {"q": consulta, **api_libros.FILTROS_BUSQUEDA_API}
+        return obtener_cliente().consultar_paginas(params, RESULTADOS_PAGINACION)
+
+    def guardado(consulta: str):
+        resultados = api_libros.obtener_libros_api(consulta)
+        if resultados:
+            es_valido, resultado = validar_entrada_libro(resultados[0])
+            if es_valido:
+                guardar_libro(base_path, resultado)
+
+    return {"busqueda": busqueda, "paginacion": paginacion, "guardado": guardado}
+
+
+def prueba_de_carga(url: str, consultas: List[str], operaciones: int, hilos: int,
+                    con_cache: bool = False) -> Dict[str, Dict[str, Any]]:
+    """
+    Mide cada flujo contra esa URL con un cliente propio (sin caché, salvo
+    con_cache: así se mide la red y no la memoria). Deja el cliente compartido
+    como estaba.
+    """
+    anterior = obtener_cliente()
+    tmp = tempfile.mkdtemp()
+    resultados = {}
+    try:
+        for nombre, flujo in flujos_api(os.path.join(tmp, "data")).items():
+            cache = CacheRespuestas(None) if con_cache else CacheRespuestas(None, capacidad=0)
+            cliente = ClienteMedido(url=url, cache=cache)
+            configurar_cliente(cliente)
+            with contextlib.redirect_stdout(io.StringIO()): # Los flujos imprimen para el menú
+                resultados[nombre] = medir_flujo(cliente, flujo, consultas, operaciones, hilos)
+            cliente.cerrar()
+    finally:
+        configurar_cliente(anterior)
+        shutil.rmtree(tmp, ignore_errors=True)
+    return resultados
+
+
+def mostrar_resultados(resultados: Dict[str, Dict[str, Any]]):
+    print(f"  {'flujo':<12}{'ops':>6}{'errores':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'máx ms':>9}{'ops/s':>9}")
+    for nombre, r in resultados.items():
+        print(f"  {nombre:<12}{r['operaciones']:>6}{r['errores']:>9}{r['p50'] * 1000:>9.1f}{r['p95'] * 1000:>9.1f}"
+              f"{r['p99'] * 1000:>9.1f}{r['max'] * 1000:>9.1f}{r['por_segundo']:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga de los flujos del modo API")
+    parser.add_argument("--url", default=None, help="API a medir (por defecto, un servidor_api_local con datos inventados)")
+    parser.add_argument("--consultas", default=None, help="Consultas separadas por coma (deben estar grabadas)")
+    parser.add_argument("--operaciones", type=int, default=200, help="Operaciones por flujo")
+    parser.add_argument("--hilos", type=int, default=8)
+    parser.add_argument("--latencia", type=float, default=0.02, help="Servidor local: segundos por respuesta")
+    parser.add_argument("--errores", type=float, default=0.0, help="Servidor local: fracción de respuestas 503")
+    parser.add_argument("--con-cache", action="store_true", help="Usar la caché en memoria del cliente")
+    args = parser.parse_args()
+    if args.operaciones < 1 or args.hilos < 1:
+        parser.error("--operaciones y --hilos deben ser positivos")
+
+    consultas = args.consultas.split(",") if args.consultas else CONSULTAS_POR_DEFECTO
+    if args.url:
+        print(f"🎯 Midiendo {args.url}")
+        mostrar_resultados(prueba_de_carga(args.url, consultas, args.operaciones, args.hilos, args.con_cache))
+        return
+
+    grabacion = grabacion_sintetica(consultas, VOLUMENES_POR_CONSULTA, variantes=({}, api_libros.FILTROS_BUSQUEDA_API))
+    with ServidorApiLocal(grabacion, latencia=args.latencia, tasa_errores=args.errores, semilla=0) as servidor:
+        print(f"🛰️ Servidor local en {servidor.url} (latencia {args.latencia * 1000:.0f} ms, errores {args.errores:.0%})")
+        mostrar_resultados(prueba_de_carga(servidor.url, consultas, args.operaciones, args.hilos, args.con_cache))
+        print(f"  Peticiones atendidas: {servidor.peticiones} ({servidor.errores_inyectados} errores inyectados)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# --- REGISTRO DE CAMBIOS DE LOS ITEMS.CSV (detección barata entre procesos) ---
+# Cada vez que este programa crea, reemplaza o elimina un items.csv anota su
+# ruta (relativa a la base) al final de un archivo compartido. Un proceso que
+# ya tiene el catálogo en memoria no necesita recorrer el árbol para saber qué
+# cambió: le alcanza con un stat del registro y, si creció, con leer las
+# líneas nuevas. Los cambios del diario no se anotan: el diario ya se sigue
+# de la misma forma (ver diario_cambios).
+import os
+import json
+from typing import Iterable, Optional, Set, Tuple
+
+LIMITE_REGISTRO_CAMBIOS = 1024 * 1024 # Bytes a partir de los cuales se reinicia al compactar
+
+
+class RegistroCambios:
+    """
+    Archivo cuya primera línea es {"registro": <marca>} y cada línea siguiente
+    la clave JSON de un items.csv que cambió. Cada línea se agrega con una sola
+    escritura O_APPEND (atómica entre procesos). Al reiniciarse lleva una marca
+    nueva: quien la ve cambiar no sabe qué se perdió y tiene que revisar todo.
+    """
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self._marca: Optional[str] = None
+        self._leido_hasta = 0
+        self._firma: Optional[Tuple[int, int, int]] = None # (inodo, tamaño, mtime) de la última lectura
+
+    @staticmethod
+    def _nueva_marca() -> bytes:
+        return (json.dumps({"registro": os.urandom(8).hex()}) + "\n").encode("utf-8")
+
+    def _crear(self, contenido: bytes, reemplazar: bool):
+        """Escribe el registro completo en un temporal y lo publica de una vez."""
+        ruta_tmp = f"{self.ruta}.{os.getpid()}.tmp"
+        with open(ruta_tmp, "wb") as f:
+            f.write(contenido)
+        try:
+            if reemplazar:
+                os.replace(ruta_tmp, self.ruta)
+            else:
+                os.link(ruta_tmp, self.ruta) # Falla si otro proceso lo creó antes
+        except FileExistsError:
+            pass
+        finally:
+            if os.path.exists(ruta_tmp):
+                os.remove(ruta_tmp)
+
+    def anotar(self, claves: Iterable[str]):
+        """Agrega las claves al final del registro (lo crea con su marca si no existe)."""
+        datos = b"".join((json.dumps(clave, ensure_ascii=False) + "\n").encode("utf-8") for clave in claves)
+        if not datos:
+            return
+        for _ in range(2):
+            try:
+                descriptor = os.open(self.ruta, os.O_WRONLY | os.O_APPEND)
+            except FileNotFoundError:
+                self._crear(self._nueva_marca(), reemplazar=False)
+                continue
+            try:
+                os.write(descriptor, datos)
+            finally:
+                os.close(descriptor)
+            return
+
+    def reiniciar_si_grande(self):
+        """
+        Vacía el registro (con una marca nueva) si superó LIMITE_REGISTRO_CAMBIOS.
+        Se debe llamar con el bloqueo exclusivo del árbol: nadie puede estar anotando.
+        """
+        try:
+            if os.path.getsize(self.ruta) < LIMITE_REGISTRO_CAMBIOS:
+                return
+        except OSError:
+            return
+        self.novedades() # Lo anotado hasta acá ya lo vio este proceso
+        encabezado = self._nueva_marca()
+        self._crear(encabezado, reemplazar=True)
+        self._marca = json.loads(encabezado)["registro"]
+        self._leido_hasta = len(encabezado)
+        self._firma = None
+
+    def novedades(self) -> Optional[Set[str]]:
+        """
+        Claves anotadas desde la última llamada (vacío si no hubo ninguna, el caso
+        común: solo cuesta un stat). Devuelve None si no se puede saber qué
+        cambió (el registro se reinició o se borró): hay que revisar todo.
+        """
+        try:
+            stat = os.stat(self.ruta)
+            if (stat.st_ino, stat.st_size, stat.st_mtime_ns) == self._firma:
+                return set()
+            with open(self.ruta, "rb") as f:
+                encabezado = f.readline()
+                try:
+                    marca = json.loads(encabezado)["registro"] if encabezado.endswith(b"\n") else None
+                except (ValueError, KeyError, TypeError):
+                    marca = None
+                if marca is None:
+                    return None # Se está creando o está dañado
+                if marca != self._marca:
+                    # Con una marca conocida, el registro se reinició: se perdió lo anotado.
+                    # Sin marca previa, nació después de la última revisión: se lee entero
+                    conocido = self._marca is not None
+                    self._marca, self._leido_hasta = marca, len(encabezado)
+                    if conocido:
+                        self._leido_hasta = f.seek(0, os.SEEK_END)
+                        self._firma = (stat.st_ino, stat.st_size, stat.st_mtime_ns) if self._leido_hasta == stat.st_size else None
+                        return None
+                f.seek(self._leido_hasta)
+                datos = f.read()
+                self._firma = (stat.st_ino, stat.st_size, stat.st_mtime_ns) if f.tell() == stat.st_size else None
+        except FileNotFoundError:
+            conocido = self._marca is not None
+            self._marca, self._leido_hasta, self._firma = None, 0, None
+            return None if conocido else set()
+
+        # Una última línea sin '\n' es una escritura cortada: se vuelve a leer la próxima vez
+        completo = datos[:datos.rfind(b"\n") + 1]
+        if len(completo) < len(datos):
+            self._firma = None
+        self._leido_hasta += len(completo)
+
+        claves = set()
+        for linea in completo.splitlines():
+            try:
+                claves.add(json.loads(linea))
+            except ValueError:
+                continue
+        return claves
@@ -0,0 +1,230 @@
+# --- SERVIDOR LOCAL QUE IMITA A GOOGLE BOOKS (grabar y reproducir) ---
+# Sirve /books/v1/volumes desde una grabación en JSON, para probar y medir el
+# modo API sin conexión:
+#   {"version": 1, "consultas": {<clave_consulta>: {"total": n, "volumenes": [...]}}}
+# La clave es la misma de la caché de cliente_api, sin startIndex ni
+# maxResults: cada consulta guarda todos sus volúmenes en orden y el servidor
+# devuelve el tramo [startIndex, startIndex + maxResults). Con 'url_grabar',
+# las consultas que no están en la grabación se piden a esa URL (la API real)
+# y se agregan. Se puede sumar latencia y errores 503 al azar.
+# Uso:
+#   python src/servidor_api_local.py grabacion.json [--puerto 8765] [--latencia 0.05] [--errores 0.1]
+#   python src/servidor_api_local.py grabacion.json --grabar https://www.googleapis.com/books/v1/volumes
+# y en otra terminal: BIBLIOTECA_API_URL=http://127.0.0.1:8765/books/v1/volumes python src/main.py
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qsl
+from typing import Any, Dict, Iterable, List, Optional
+
+import requests
+
+from cliente_api import clave_consulta, TAMANIO_PAGINA_API
+from almacenamiento import guardar_json_atomico
+
+RUTA_VOLUMENES = "/books/v1/volumes"
+VERSION_GRABACION = 1
+PARAMETROS_DE_PAGINA = ("startIndex", "maxResults", "key")
+
+
+def grabacion_vacia() -> Dict[str, Any]:
+    return {"version": VERSION_GRABACION, "consultas": {}}
+
+
+def cargar_grabacion(ruta: str) -> Dict[str, Any]:
+    """La grabación de esa ruta (vacía si no existe)."""
+    try:
+        with open(ruta, "r", encoding="utf-8") as f:
+            grabacion = json.load(f)
+    except FileNotFoundError:
+        return grabacion_vacia()
+    if grabacion.get("version") != VERSION_GRABACION or not isinstance(grabacion.get("consultas"), dict):
+        raise ValueError(f"Grabación inválida o de otra versión: {ruta}")
+    return grabacion
+
+
+def grabacion_sintetica(consultas: List[str], volumenes_por_consulta: int, semilla: int = 0,
+                        variantes: Iterable[Dict[str, Any]] = ({},)) -> Dict[str, Any]:
+    """
+    Grabación inventada (para mediciones): cada consulta con sus volúmenes
+    completos, una vez por cada juego de parámetros extra de 'variantes'
+    (ej. {"printType": "books", "langRestrict": "es"} para mostrar_libros_api).
+    """
+    azar = random.Random(semilla)
+    variantes = list(variantes)
+    grabacion = grabacion_vacia()
+    for consulta in consultas:
+        volumenes = [{
+            "id": f"{consulta}-{i}",
+            "volumeInfo": {
+                "title": f"{consulta} {i}",
+                "authors": [f"Autor {azar.randrange(50)}"],
+                "categories": [f"Genero {azar.randrange(10)}"],
+                "pageCount": azar.randrange(50, 900),
+                "publishedDate": str(azar.randrange(1900, 2024)),
+            },
+        } for i in range(volumenes_por_consulta)]
+        for extras in variantes:
+            grabacion["consultas"][clave_consulta({"q": consulta, **extras})] = {"total": len(volumenes), "volumenes": volumenes}
+    return grabacion
+
+
+class ServidorApiLocal:
+    """Servidor HTTP en un hilo aparte; 'url' apunta a su /books/v1/volumes."""
+
+    def __init__(self, grabacion: Dict[str, Any], latencia: float = 0.0, variacion: float = 0.0,
+                 tasa_errores: float = 0.0, url_grabar: Optional[str] = None, ruta_grabacion: Optional[str] = None,
+                 puerto: int = 0, semilla: Optional[int] = None):
+        self.grabacion = grabacion
+        self.latencia = latencia
+        self.variacion = variacion
+        self.tasa_errores = tasa_errores
+        self.url_grabar = url_grabar
+        self.ruta_grabacion = ruta_grabacion
+        self.peticiones = 0
+        self.errores_inyectados = 0
+        self._azar = random.Random(semilla)
+        self._candado = threading.Lock()
+        self._servidor = ThreadingHTTPServer(("127.0.0.1", puerto), self._manejador())
+        self._servidor.daemon_threads = True
+        self._hilo: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._servidor.server_port}{RUTA_VOLUMENES}"
+
+    def iniciar(self) -> "ServidorApiLocal":
+        self._hilo = threading.Thread(target=self._servidor.serve_forever, name="servidor-api-local", daemon=True)
+        self._hilo.start()
+        return self
+
+    def atender(self):
+        """Atiende peticiones en este hilo hasta Ctrl+C."""
+        try:
+            self._servidor.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._servidor.server_close()
+
+    def detener(self):
+        self._servidor.shutdown()
+        self._servidor.server_close()
+
+    def __enter__(self) -> "ServidorApiLocal":
+        return self.iniciar()
+
+    def __exit__(self, *_):
+        self.detener()
+
+    # --- Respuestas ---
+
+    def _grabar(self, clave: str, params: Dict[str, str], desde: int) -> Optional[Dict[str, Any]]:
+        """Pide el tramo a la API real y lo agrega a la grabación (guardándola en disco)."""
+        respuesta = requests.get(self.url_grabar, params=params, timeout=10)
+        respuesta.raise_for_status()
+        datos = respuesta.json()
+        with self._candado:
+            consulta = self.grabacion["consultas"].setdefault(clave, {"total": 0, "volumenes": []})
+            consulta["total"] = datos.get("totalItems", 0)
+            volumenes = consulta["volumenes"]
+            for i, item in enumerate(datos.get("items", []), start=desde):
+                if i < len(volumenes):
+                    volumenes[i] = item
+                elif i == len(volumenes):
+                    volumenes.append(item) # Solo tramos contiguos: no quedan huecos en la lista
+            if self.ruta_grabacion:
+                guardar_json_atomico(self.ruta_grabacion, self.grabacion)
+        return datos
+
+    def responder(self, params: Dict[str, str]) -> Dict[str, Any]:
+        """La respuesta JSON de la API para esos parámetros de consulta."""
+        desde = int(params.get("startIndex", 0))
+        cantidad = min(int(params.get("maxResults", 10)), TAMANIO_PAGINA_API)
+        clave = clave_consulta({k: v for k, v in params.items() if k not in PARAMETROS_DE_PAGINA})
+
+        with self._candado:
+            consulta = self.grabacion["consultas"].get(clave)
+            grabado = consulta is not None and (desde + cantidad <= len(consulta["volumenes"])
+                                                or len(consulta["volumenes"]) >= consulta["total"])
+        if not grabado and self.url_grabar:
+            return self._grabar(clave, params, desde)
+        if consulta is None:
+            return {"kind": "books#volumes", "totalItems": 0}
+
+        items = consulta["volumenes"][desde:desde + cantidad]
+        respuesta: Dict[str, Any] = {"kind": "books#volumes", "totalItems": consulta["total"]}
+        if items:
+            respuesta["items"] = items # Como la API real: sin resultados no hay 'items'
+        return respuesta
+
+    def _manejador(self):
+        servidor = self
+
+        class Manejador(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1" # Conexiones persistentes, como la API real
+
+            def _enviar(self, estado: int, cuerpo: bytes):
+                self.send_response(estado)
+                self.send_header("Content-Type", "application/json; charset=UTF-8")
+                self.send_header("Content-Length", str(len(cuerpo)))
+                self.end_headers()
+                self.wfile.write(cuerpo)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                with servidor._candado:
+                    servidor.peticiones += 1
+                    espera = servidor.latencia + servidor._azar.uniform(0, servidor.variacion)
+                    falla = servidor._azar.random() < servidor.tasa_errores
+                    if falla:
+                        servidor.errores_inyectados += 1
+                if espera > 0:
+                    time.sleep(espera)
+
+                if url.path != RUTA_VOLUMENES:
+                    self._enviar(404, b'{"error": {"code": 404, "message": "Not Found"}}')
+                elif falla:
+                    self._enviar(503, b'{"error": {"code": 503, "message": "Backend Error"}}')
+                else:
+                    try:
+                        respuesta = servidor.responder(dict(parse_qsl(url.query)))
+                    except (ValueError, requests.RequestException) as e:
+                        self._enviar(502, json.dumps({"error": {"code": 502, "message": str(e)}}).encode("utf-8"))
+                        return
+                    self._enviar(200, json.dumps(respuesta, ensure_ascii=False).encode("utf-8"))
+
+            def log_message(self, *args):
+                pass # Sin una línea por petición en la consola
+
+        return Manejador
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor local que imita la API de Google Books")
+    parser.add_argument("grabacion", help="Archivo JSON con las respuestas grabadas (se crea al grabar)")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--latencia", type=float, default=0.0, help="Segundos de espera por respuesta")
+    parser.add_argument("--variacion", type=float, default=0.0, help="Segundos extra al azar (0..variacion)")
+    parser.add_argument("--errores", type=float, default=0.0, help="Fracción de respuestas 503 (0..1)")
+    parser.add_argument("--grabar", metavar="URL", default=None, help="Pedir a esa URL lo que no esté grabado y guardarlo")
+    args = parser.parse_args()
+
+    try:
+        grabacion = cargar_grabacion(args.grabacion)
+    except (OSError, ValueError) as e:
+        print(f"❌ No se pudo leer la grabación: {e}")
+        return
+    servidor = ServidorApiLocal(grabacion, args.latencia, args.variacion, args.errores,
+                                url_grabar=args.grabar, ruta_grabacion=args.grabacion, puerto=args.puerto)
+    print(f"🛰️ Sirviendo {len(grabacion['consultas'])} consultas grabadas en {servidor.url}")
+    print(f"   Usalo con: BIBLIOTECA_API_URL={servidor.url}")
+    servidor.atender()
+    print(f"\n{servidor.peticiones} peticiones atendidas ({servidor.errores_inyectados} errores inyectados)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# --- NORMALIZACIÓN DE TEXTO Y SIMILITUD (compartido por las búsquedas) ---
+import unicodedata
+from functools import lru_cache
+from difflib import SequenceMatcher
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+@lru_cache(maxsize=65536)
+def normalizar_texto(texto: str) -> str:
+    """Convierte texto a minúsculas y elimina acentos (memoizado)."""
+    if texto.isascii():
+        return texto.lower() # Sin acentos que quitar: NFKD no cambia nada
+    texto = texto.lower()
+    texto = unicodedata.normalize('NFKD', texto)
+    return ''.join(c for c in texto if not unicodedata.combining(c))
+
+
+def son_similares(a: str, b: str, umbral: float = 0.6) -> bool:
+    """Devuelve True si los textos son suficientemente parecidos (más flexible)."""
+    a_norm, b_norm = normalizar_texto(a), normalizar_texto(b)
+    return similitud_normalizada(a_norm, b_norm) >= umbral
+
+
+def similitud_normalizada(a_norm: str, b_norm: str) -> float:
+    """
+    Puntaje 0..1 entre dos textos ya normalizados: 1.0 si uno contiene al otro
+    (coincidencia directa o parcial), si no el ratio de SequenceMatcher.
+    """
+    if a_norm in b_norm or b_norm in a_norm:
+        return 1.0
+    return SequenceMatcher(None, a_norm, b_norm).ratio()
+
+
+def trigramas(texto_norm: str) -> Set[str]:
+    """Trigramas de caracteres de un texto normalizado (el texto entero si es más corto)."""
+    if len(texto_norm) < 3:
+        return {texto_norm} if texto_norm else set()
+    return {texto_norm[i:i + 3] for i in range(len(texto_norm) - 2)}
+
+
+class ComparadorConsulta:
+    """
+    Compara una consulta fija contra muchos textos con el criterio de
+    similitud_normalizada (mismos puntajes), pero más barato: la consulta se
+    normaliza una sola vez y antes del ratio se descarta lo que no puede llegar
+    al umbral
+    por longitud (cota 2*min/suma) ni por la subsecuencia común más larga: los
+    bloques de SequenceMatcher no se cruzan, así que nunca suman más que ella,
+    y se calcula con operaciones de bits en O(largo del texto).
+    Cada texto distinto se puntúa una vez (los resultados de la API repiten
+    títulos entre ediciones). No es seguro entre hilos: uno por búsqueda.
+    """
+
+    def __init__(self, consulta: str, umbral: float):
+        self.consulta_norm = normalizar_texto(consulta.strip())
+        self.umbral = umbral
+        self._comparador = SequenceMatcher(None)
+        self._comparador.set_seq1(self.consulta_norm) # Mismo orden que similitud_normalizada
+        self._mascaras: Dict[str, int] = {} # Carácter -> bits de las posiciones donde aparece en la consulta
+        for i, caracter in enumerate(self.consulta_norm):
+            self._mascaras[caracter] = self._mascaras.get(caracter, 0) | (1 << i)
+        self._puntajes: Dict[str, Optional[float]] = {}
+
+    def puntaje(self, texto: str) -> Optional[float]:
+        """Puntaje 0..1 del texto si llega al umbral, o None si no llega."""
+        texto_norm = normalizar_texto(texto)
+        try:
+            return self._puntajes[texto_norm]
+        except KeyError:
+            puntaje = self._puntajes[texto_norm] = self._puntuar(texto_norm)
+            return puntaje
+
+    def _subsecuencia_comun(self, texto_norm: str) -> int:
+        """Largo de la subsecuencia común más larga con la consulta (algoritmo de bits de Hyyrö)."""
+        todos = (1 << len(self.consulta_norm)) - 1
+        fila = todos
+        for caracter in texto_norm:
+            coincidencias = fila & self._mascaras.get(caracter, 0)
+            fila = ((fila + coincidencias) | (fila - coincidencias)) & todos
+        return len(self.consulta_norm) - bin(fila).count("1")
+
+    def _puntuar(self, texto_norm: str) -> Optional[float]:
+        consulta_norm = self.consulta_norm
+        if consulta_norm in texto_norm or texto_norm in consulta_norm:
+            return 1.0
+        largo_texto, largo_consulta = len(texto_norm), len(consulta_norm)
+        if 2 * min(largo_texto, largo_consulta) < self.umbral * (largo_texto + largo_consulta):
+            return None # Ni coincidiendo todo el más corto llega al umbral
+        if 2 * self._subsecuencia_comun(texto_norm) < self.umbral * (largo_texto + largo_consulta):
+            return None
+        self._comparador.set_seq2(texto_norm)
+        puntaje = self._comparador.ratio()
+        return puntaje if puntaje >= self.umbral else None
+
+
+def rankear(consulta: str, candidatos: Iterable[T], texto: Callable[[T], str], umbral: float,
+            descartados: Optional[List[T]] = None) -> List[Tuple[T, float]]:
+    """
+    Candidatos que se parecen a la consulta, de mayor a menor puntaje (a igual
+    puntaje, en el orden recibido), en una sola pasada. Si se pasa la lista
+    'descartados', ahí quedan los que no llegaron al umbral, en orden.
+    """
+    comparador = ComparadorConsulta(consulta, umbral)
+    puntuados = []
+    for candidato in candidatos:
+        puntaje = comparador.puntaje(texto(candidato))
+        if puntaje is not None:
+            puntuados.append((candidato, puntaje))
+        elif descartados is not None:
+            descartados.append(candidato)
+    puntuados.sort(key=lambda par: -par[1]) # sort es estable
+    return puntuados
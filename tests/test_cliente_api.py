@@ -0,0 +1,95 @@
+# --- PRUEBA DEL CLIENTE DE LA API CONTRA EL SERVIDOR LOCAL ---
+# Levanta servidor_api_local en un puerto libre (puerto 0) con una grabación
+# inventada y comprueba la paginación en paralelo, el límite de consultas por
+# segundo y los aciertos de la caché (en memoria y en disco).
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from cliente_api import ClienteLibros, CacheRespuestas, LimitadorTasa, TAMANIO_PAGINA_API # noqa: E402
+from servidor_api_local import ServidorApiLocal, grabacion_sintetica # noqa: E402
+
+VOLUMENES = 150 # 4 páginas de TAMANIO_PAGINA_API
+LATENCIA = 0.2 # segundos por petición: pedir las páginas una tras otra tardaría 4 veces esto
+CONSULTAS_LIMITADAS = [f"consulta {i}" for i in range(10)]
+POR_SEGUNDO = 20
+
+
+class ClienteApiTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        grabacion = grabacion_sintetica(["dune"] + CONSULTAS_LIMITADAS, VOLUMENES, semilla=1)
+        self.servidor = ServidorApiLocal(grabacion, puerto=0, semilla=1).iniciar()
+
+    def tearDown(self):
+        self.servidor.detener()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _cliente(self, **opciones) -> ClienteLibros:
+        opciones.setdefault("cache", CacheRespuestas(directorio=None))
+        cliente = ClienteLibros(url=self.servidor.url, **opciones)
+        self.addCleanup(cliente.cerrar)
+        return cliente
+
+    def test_paginas_en_paralelo(self):
+        self.servidor.latencia = LATENCIA
+        paginas = -(-VOLUMENES // TAMANIO_PAGINA_API)
+        cliente = self._cliente()
+
+        inicio = time.perf_counter()
+        volumenes, total = cliente.consultar_paginas({"q": "dune"}, VOLUMENES)
+        duracion = time.perf_counter() - inicio
+
+        self.assertEqual(total, VOLUMENES)
+        self.assertEqual([volumen["id"] for volumen in volumenes], [f"dune-{i}" for i in range(VOLUMENES)])
+        self.assertEqual(self.servidor.peticiones, paginas)
+        # La primera página sola y después las otras a la vez: ~2 latencias y no 4
+        self.assertLess(duracion, LATENCIA * (paginas - 1))
+
+    def test_limite_de_consultas_por_segundo(self):
+        cliente = self._cliente(limitador=LimitadorTasa(POR_SEGUNDO))
+
+        def buscar_todas():
+            with ThreadPoolExecutor(max_workers=len(CONSULTAS_LIMITADAS)) as executor:
+                list(executor.map(lambda consulta: cliente.consultar({"q": consulta}), CONSULTAS_LIMITADAS))
+
+        inicio = time.perf_counter()
+        buscar_todas()
+        duracion = time.perf_counter() - inicio
+        self.assertEqual(self.servidor.peticiones, len(CONSULTAS_LIMITADAS))
+        # Con ráfaga de 1: la primera sale enseguida y cada una de las demás espera su turno
+        self.assertGreaterEqual(duracion, (len(CONSULTAS_LIMITADAS) - 1) / POR_SEGUNDO * 0.95)
+
+        # Las respuestas de la caché no pasan por el limitador
+        inicio = time.perf_counter()
+        buscar_todas()
+        self.assertLess(time.perf_counter() - inicio, (len(CONSULTAS_LIMITADAS) - 1) / POR_SEGUNDO / 2)
+        self.assertEqual(self.servidor.peticiones, len(CONSULTAS_LIMITADAS))
+
+    def test_aciertos_de_cache(self):
+        directorio = os.path.join(self.tmp, "cache")
+        cliente = self._cliente(cache=CacheRespuestas(directorio=directorio))
+        esperados = cliente.consultar_paginas({"q": "dune"}, VOLUMENES)
+        peticiones = self.servidor.peticiones
+
+        # Misma búsqueda (salvo mayúsculas y espacios): sale toda de memoria
+        self.assertEqual(cliente.consultar_paginas({"q": "  DUNE "}, VOLUMENES), esperados)
+        self.assertEqual(cliente.cache.aciertos_memoria, peticiones)
+        self.assertEqual(self.servidor.peticiones, peticiones)
+
+        # Otro cliente (como otra ejecución del programa): sale del disco
+        otro = self._cliente(cache=CacheRespuestas(directorio=directorio))
+        self.assertEqual(otro.consultar_paginas({"q": "dune"}, VOLUMENES), esperados)
+        self.assertEqual((otro.cache.aciertos_disco, otro.cache.fallos), (peticiones, 0))
+        self.assertEqual(self.servidor.peticiones, peticiones)
+
+
+if __name__ == "__main__":
+    unittest.main()
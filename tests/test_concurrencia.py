@@ -0,0 +1,125 @@
+# --- PRUEBA DE ESCRITURAS CONCURRENTES DESDE VARIOS PROCESOS ---
+# Varios procesos dan de alta, modifican y eliminan libros sobre los mismos
+# items.csv (con compactaciones en el medio). Al final cada items.csv debe
+# tener exactamente los libros que resultan de aplicar todas las operaciones.
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import multiprocessing
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import almacenamiento # noqa: E402
+from modelo_libro import Libro # noqa: E402
+from motores_almacenamiento import MotorCSV # noqa: E402
+
+PROCESOS = 4
+OPERACIONES_POR_PROCESO = 60
+HOJAS = 3
+COMPACTAR_CADA = 20 # El proceso 0 compacta el diario mientras los demás escriben
+
+# (tipo, hoja, título, páginas, título nuevo): tipo es alta, modificacion o baja
+Operacion = Tuple[str, int, str, int, Optional[str]]
+
+
+def _autor(hoja: int) -> str:
+    return f"Autor {hoja}"
+
+
+def _ruta_hoja(base: str, hoja: int) -> str:
+    return os.path.join(base, "Concurrencia", _autor(hoja), "2000", "items.csv")
+
+
+def _operaciones(numero: int) -> List[Operacion]:
+    """Operaciones del proceso 'numero': altas, y cada tanto una modificación o una baja de un libro propio."""
+    operaciones: List[Operacion] = []
+    vigentes: Dict[int, Tuple[int, str, int]] = {} # i -> (hoja, título actual, páginas)
+    for i in range(OPERACIONES_POR_PROCESO):
+        hoja, titulo = i % HOJAS, f"p{numero}-{i}"
+        operaciones.append(("alta", hoja, titulo, i + 1, None))
+        vigentes[i] = (hoja, titulo, i + 1)
+        if i % 5 == 4 and i - 4 in vigentes:
+            hoja_mod, titulo_mod, paginas = vigentes[i - 4]
+            operaciones.append(("modificacion", hoja_mod, titulo_mod, paginas, titulo_mod + "*"))
+            vigentes[i - 4] = (hoja_mod, titulo_mod + "*", paginas)
+        if i % 7 == 6 and i - 6 in vigentes:
+            hoja_baja, titulo_baja, paginas = vigentes.pop(i - 6)
+            operaciones.append(("baja", hoja_baja, titulo_baja, paginas, None))
+    return operaciones
+
+
+def _esperados() -> Dict[int, Counter]:
+    """Filas (título, páginas) que debe tener cada hoja después de todos los procesos."""
+    por_hoja: Dict[int, Counter] = {hoja: Counter() for hoja in range(HOJAS)}
+    for numero in range(PROCESOS):
+        for tipo, hoja, titulo, paginas, titulo_nuevo in _operaciones(numero):
+            if tipo != "alta":
+                por_hoja[hoja][(titulo, paginas)] -= 1
+            if tipo != "baja":
+                por_hoja[hoja][(titulo_nuevo or titulo, paginas)] += 1
+    return {hoja: +filas for hoja, filas in por_hoja.items()}
+
+
+def _escritor(base: str, numero: int, barrera):
+    """Proceso escritor: aplica sus operaciones con el motor CSV (diario + bloqueos)."""
+    motor = MotorCSV(base)
+    motor.abrir()
+    motor.obtener_por_id("") # Arma las estructuras derivadas: cada cambio también las actualiza
+    barrera.wait()
+    for n, (tipo, hoja, titulo, paginas, titulo_nuevo) in enumerate(_operaciones(numero)):
+        if tipo == "alta":
+            motor.insertar({"genero": "Concurrencia", "autor": _autor(hoja), "anio": "2000",
+                            "titulo": titulo, "paginas": paginas})
+            continue
+        libro = Libro("Concurrencia", _autor(hoja), "2000", titulo, paginas, _ruta_hoja(base, hoja))
+        hecho = motor.actualizar(libro, titulo_nuevo, paginas) if tipo == "modificacion" else motor.eliminar(libro)
+        if not hecho:
+            raise AssertionError(f"{tipo} de {titulo}: el libro no estaba")
+        if numero == 0 and n % COMPACTAR_CADA == 0:
+            almacenamiento.compactar_diario(base)
+
+
+class EscriturasConcurrentesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.base = os.path.join(self.tmp, "data")
+        for hoja in range(HOJAS):
+            os.makedirs(os.path.dirname(_ruta_hoja(self.base, hoja)))
+            with open(_ruta_hoja(self.base, hoja), "w", encoding="utf-8") as f:
+                f.write("titulo,paginas\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _filas_por_hoja(self, leer) -> Dict[int, Counter]:
+        return {hoja: Counter(tuple(fila) for fila in leer(_ruta_hoja(self.base, hoja))) for hoja in range(HOJAS)}
+
+    def test_no_se_pierden_ni_duplican_escrituras(self):
+        contexto = multiprocessing.get_context("spawn")
+        barrera = contexto.Barrier(PROCESOS)
+        procesos = [contexto.Process(target=_escritor, args=(self.base, numero, barrera)) for numero in range(PROCESOS)]
+        for proceso in procesos:
+            proceso.start()
+        for proceso in procesos:
+            proceso.join(timeout=300)
+        self.assertEqual([proceso.exitcode for proceso in procesos], [0] * PROCESOS)
+
+        esperados = _esperados()
+        # Antes de compactar: las filas del disco más lo que quedó en el diario
+        vigentes = self._filas_por_hoja(almacenamiento.leer_filas_items_csv)
+        self.assertEqual({hoja: sum(filas.values()) for hoja, filas in vigentes.items()},
+                         {hoja: sum(filas.values()) for hoja, filas in esperados.items()})
+        self.assertEqual(vigentes, esperados)
+
+        # Después de compactar: los items.csv solos, sin diario
+        almacenamiento.compactar_diario(self.base)
+        self.assertEqual(self._filas_por_hoja(almacenamiento._leer_filas_csv), esperados)
+
+
+if __name__ == "__main__":
+    unittest.main()